@@ -0,0 +1,63 @@
+"""
+Analytics result caching.
+
+Each poll creator has a generation counter that is bumped whenever a vote or
+view lands on one of their polls, or a poll of theirs is created or deleted.
+Cached analytics include the generation in their keys, so new activity makes
+the next request refresh them, while idle dashboards stay cached for
+ANALYTICS_CACHE_SECONDS. The TTL only bounds how long sliding periods ("last
+30 days") can lag behind the clock when nothing happens.
+
+Busy creators bump their generation constantly, so every result is also kept
+under a key without it (`fallback_key`). After activity, the previous result is
+served from there as stale while a single task recomputes it (see
+apps/core/swr.py), rather than every request missing at once.
+"""
+
+from typing import Any
+
+from django.core.cache import cache
+from django.db import transaction
+
+GENERATION_KEY = "analytics_generation:{user_id}"
+RESULT_KEY = "analytics:{kind}:{user_id}:{period}:{generation}"
+FALLBACK_KEY = "analytics:{kind}:{user_id}:{period}:latest"
+
+
+def generation_key(user_id: Any) -> str:
+    return GENERATION_KEY.format(user_id=user_id)
+
+
+def result_key(kind: str, user_id: Any, period: str, **options: Any) -> str:
+    """
+    The cache key of a creator's `kind` analytics (stats, trends...) for `period`
+    and any further options.
+    """
+    generation = cache.get(generation_key(user_id), 0)
+    key = RESULT_KEY.format(kind=kind, user_id=user_id, period=period, generation=generation)
+    return ":".join([key, *(f"{name}={value}" for name, value in sorted(options.items()))])
+
+
+def fallback_key(kind: str, user_id: Any, period: str, **options: Any) -> str:
+    """
+    The key holding the latest result of `result_key`, whatever its generation.
+    """
+    key = FALLBACK_KEY.format(kind=kind, user_id=user_id, period=period)
+    return ":".join([key, *(f"{name}={value}" for name, value in sorted(options.items()))])
+
+
+def bump_generation(user_id: Any) -> None:
+    key = generation_key(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # First change since the counter was evicted (or ever)
+        cache.set(key, 1, timeout=None)
+
+
+def creator_changed(user_id: Any) -> None:
+    """
+    Bumps the creator's generation once the current transaction commits,
+    so a recompute can't cache numbers without the change under the new key.
+    """
+    transaction.on_commit(lambda: bump_generation(user_id))
@@ -0,0 +1,173 @@
+"""
+Per-poll conversion funnels, computed incrementally by a periodic batch job.
+
+A poll's funnel for one UTC day counts, in order:
+
+- arrivals, per distribution channel (link opens, QR scans, embed loads,
+  social share clicks), from the daily distribution rollups
+- views, from the daily poll stats
+- first votes: users whose first vote on the poll was that day
+- completed ballots: users whose vote that day first answered every question
+  of the poll (later votes, e.g. on multiple choice questions, do not count)
+
+Distribution events, views and votes share no visitor identity, so only
+arrivals can be split by channel; later stages are per poll.
+
+Each run recomputes the days touched since the previous run (its watermark,
+minus `ANALYTICS_FUNNEL_LATENESS_SECONDS` for events drained late) and rewrites
+their rows, so runs are idempotent and dashboards read only `PollFunnel`.
+"""
+
+import logging
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min, QuerySet, Sum
+from django.utils import timezone
+
+from apps.distribution.models import DistributionEvent, DistributionRollup, RollupGranularity
+from apps.polls.models import Poll, Vote
+
+from .models import BatchWatermark, PollDailyStats, PollFunnel
+from .rollups import day_bounds, utc_day
+
+logger = logging.getLogger(__name__)
+
+WATERMARK = "poll_funnels"
+
+CHANNEL_FIELDS: dict[str, str] = {
+    DistributionEvent.LINK_OPEN: "link_opens",
+    DistributionEvent.QR_SCAN: "qr_scans",
+    DistributionEvent.EMBED_LOAD: "embed_loads",
+    DistributionEvent.SOCIAL_SHARE: "social_shares",
+}
+
+
+def _ballots(since: datetime | None) -> list[tuple[int, datetime, datetime | None]]:
+    """
+    One (poll_id, first vote, completion) row per voter and poll, for voters who
+    voted since `since` (default all). A ballot completes with the vote that
+    first answered every question of the poll, None if it has not yet.
+    """
+    votes = Vote.objects.all()
+    pairs = None
+    if since is not None:
+        # Only the voters and polls with recent votes, never the whole table
+        pairs = set(
+            Vote.objects.filter(created_at__gte=since)
+            .values_list("question__poll_id", "user_id")
+            .distinct()
+        )
+        if not pairs:
+            return []
+        votes = votes.filter(
+            question__poll_id__in={poll_id for poll_id, _ in pairs},
+            user_id__in={user_id for _, user_id in pairs},
+        )
+
+    # When each voter first answered each question
+    answered: dict[tuple[int, Any], list[datetime]] = defaultdict(list)
+    for poll_id, user_id, answered_at in (
+        votes.values("question__poll_id", "user_id", "question_id")
+        .annotate(answered_at=Min("created_at"))
+        .values_list("question__poll_id", "user_id", "answered_at")
+        .order_by()
+    ):
+        answered[poll_id, user_id].append(answered_at)
+
+    question_counts = dict(
+        Poll.objects.filter(id__in={poll_id for poll_id, _ in answered})
+        .annotate(questions_count=Count("questions"))
+        .values_list("id", "questions_count")
+    )
+    ballots = []
+    for (poll_id, user_id), times in answered.items():
+        # The filter above also matches voters' votes on each other's polls
+        if pairs is not None and (poll_id, user_id) not in pairs:
+            continue
+        times.sort()
+        questions = question_counts.get(poll_id, 0)
+        completed = times[questions - 1] if 0 < questions <= len(times) else None
+        ballots.append((poll_id, times[0], completed))
+    return ballots
+
+
+def compute_funnels(since: date | None = None) -> dict[tuple[int, date], dict[str, Any]]:
+    """
+    Computes the funnel rows of every day from `since` (default all days),
+    keyed by (poll_id, day).
+    """
+    start = day_bounds(since)[0] if since is not None else None
+    rows: dict[tuple[int, date], dict[str, Any]] = {}
+
+    def row(poll_id: int, day: date) -> dict[str, Any]:
+        return rows.setdefault((poll_id, day), {"poll_id": poll_id, "day": day})
+
+    arrivals = DistributionRollup.objects.filter(granularity=RollupGranularity.DAY)
+    stats = PollDailyStats.objects.filter(views__gt=0)
+    if start is not None:
+        arrivals = arrivals.filter(bucket__gte=start)
+        stats = stats.filter(day__gte=since)
+    for poll_id, event_type, bucket, count in arrivals.values_list(
+        "poll_id", "event_type", "bucket", "count"
+    ).iterator():
+        row(poll_id, utc_day(bucket))[CHANNEL_FIELDS[event_type]] = count
+    for poll_id, day, views in stats.values_list("poll_id", "day", "views").iterator():
+        row(poll_id, day)["views"] = views
+
+    for poll_id, first, completed in _ballots(start):
+        # Earlier days are not being rewritten
+        if start is None or first >= start:
+            counts = row(poll_id, utc_day(first))
+            counts["first_votes"] = counts.get("first_votes", 0) + 1
+        if completed is not None and (start is None or completed >= start):
+            counts = row(poll_id, utc_day(completed))
+            counts["completed_ballots"] = counts.get("completed_ballots", 0) + 1
+    return rows
+
+
+def _write(rows: Iterable[dict[str, Any]], since: date | None) -> int:
+    funnels = PollFunnel.objects.all()
+    if since is not None:
+        funnels = funnels.filter(day__gte=since)
+    with transaction.atomic():
+        funnels.delete()
+        created = PollFunnel.objects.bulk_create(
+            (PollFunnel(**row) for row in rows), batch_size=1000
+        )
+    return len(created)
+
+
+def update_funnels(full: bool = False) -> int:
+    """
+    Recomputes the funnel days touched since the last run (all of them on the
+    first run, or if `full`) and moves the watermark. Returns the number of
+    rows written.
+    """
+    # Taken first, so that activity during the run is picked up by the next one
+    now = timezone.now()
+    watermark = BatchWatermark.objects.filter(name=WATERMARK).first()
+    since = None
+    if watermark is not None and not full:
+        lateness = timedelta(seconds=settings.ANALYTICS_FUNNEL_LATENESS_SECONDS)
+        since = utc_day(watermark.position - lateness)
+
+    written = _write(compute_funnels(since).values(), since)
+    BatchWatermark.objects.update_or_create(name=WATERMARK, defaults={"position": now})
+    logger.info(f"Wrote {written} poll funnel rows since {since or 'the beginning'}")
+    return written
+
+
+def funnel_totals(polls: QuerySet[Poll], start: datetime | None = None) -> dict[str, int]:
+    """
+    Sums the funnels of `polls` over the days from `start` (default all).
+    """
+    funnels = PollFunnel.objects.filter(poll__in=polls)
+    if start is not None:
+        funnels = funnels.filter(day__gte=utc_day(start))
+    fields = [*CHANNEL_FIELDS.values(), "views", "first_votes", "completed_ballots"]
+    return funnels.aggregate(**{field: Sum(field, default=0) for field in fields})
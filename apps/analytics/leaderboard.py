@@ -0,0 +1,115 @@
+"""
+All-time top polls per creator, as Redis sorted sets.
+
+`top_polls:<user_id>` scores each of the creator's polls by its vote count. New
+polls are added with 0, every committed vote adds 1 (deleted votes subtract
+it), so the top N reads with one ZREVRANGE in O(log n + N) whatever the number
+of polls and votes. A missing set (never built, or evicted) is rebuilt from the
+daily rollups on the next read. Without Redis nothing is recorded and readers
+fall back to the rollups.
+
+Increments are not serialized with rebuilds: a vote committed before the
+rollups are read but incremented before the rebuilt set is swapped in lands
+on the old set and is lost, and one incremented on the new set after being
+read is counted twice. Sets therefore expire `ANALYTICS_LEADERBOARD_TTL_SECONDS`
+after being built (increments do not extend them), so such drift lasts at most
+that long before the next read rebuilds from the rollups.
+"""
+
+import logging
+from typing import Any, cast
+
+import redis
+from django.conf import settings
+from django.db.models import Sum
+
+from apps.core.redis_client import get_redis
+from apps.polls.models import Poll
+
+logger = logging.getLogger(__name__)
+
+LEADERBOARD_KEY = "top_polls:{user_id}"
+
+
+def leaderboard_key(user_id: Any) -> str:
+    return LEADERBOARD_KEY.format(user_id=user_id)
+
+
+def add_votes(user_id: Any, poll_id: int, amount: int) -> None:
+    """
+    Adds `amount` votes to the poll's score, if the creator's set exists
+    (otherwise it is built with them included when next read).
+    """
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        # XX: only update polls already in the set, never create a partial set
+        client.zadd(leaderboard_key(user_id), {str(poll_id): amount}, xx=True, incr=True)
+    except redis.RedisError as e:
+        logger.warning(f"Failed to update top polls of {user_id}: {e}")
+
+
+def add_poll(user_id: Any, poll_id: int) -> None:
+    client = get_redis()
+    if client is None:
+        return
+    key = leaderboard_key(user_id)
+    try:
+        # A missing set is built with the poll included when next read
+        if client.exists(key):
+            client.zadd(key, {str(poll_id): 0}, nx=True)
+    except redis.RedisError as e:
+        logger.warning(f"Failed to update top polls of {user_id}: {e}")
+
+
+def remove_poll(user_id: Any, poll_id: int) -> None:
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        client.zrem(leaderboard_key(user_id), str(poll_id))
+    except redis.RedisError as e:
+        logger.warning(f"Failed to update top polls of {user_id}: {e}")
+
+
+def rebuild_leaderboard(user_id: Any, client: redis.Redis) -> None:
+    """
+    Builds the creator's set from the daily rollups, swapping it in atomically
+    with a fresh TTL.
+    """
+    scores = dict(
+        Poll.objects.filter(created_by_id=user_id)
+        .annotate(votes=Sum("daily_stats__votes", default=0))
+        .values_list("id", "votes")
+    )
+    key = leaderboard_key(user_id)
+    if not scores:
+        client.delete(key)
+        return
+    staging = f"{key}:rebuild"
+    pipe = client.pipeline()
+    pipe.delete(staging)
+    pipe.zadd(staging, {str(poll_id): votes for poll_id, votes in scores.items()})
+    pipe.rename(staging, key)
+    pipe.expire(key, settings.ANALYTICS_LEADERBOARD_TTL_SECONDS)
+    pipe.execute()
+
+
+def get_top_poll_ids(user_id: Any, limit: int) -> list[tuple[int, int]] | None:
+    """
+    Returns the creator's `limit` most voted polls as (poll_id, votes), most
+    voted first. None without Redis.
+    """
+    client = get_redis()
+    if client is None or limit <= 0:
+        return None
+    key = leaderboard_key(user_id)
+    try:
+        if not client.exists(key):
+            rebuild_leaderboard(user_id, client)
+        top = cast(list[tuple[bytes, float]], client.zrevrange(key, 0, limit - 1, withscores=True))
+    except redis.RedisError as e:
+        logger.warning(f"Failed to read top polls of {user_id}: {e}")
+        return None
+    return [(int(member), int(score)) for member, score in top]
@@ -0,0 +1,50 @@
+import statistics
+import time
+from typing import Any
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.analytics.services import AnalyticsService
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Times get_stats cache misses (AnalyticsService.compute_stats) against the "
+        "current database (seed it first with seed_analytics)"
+    )
+
+    def add_arguments(self, parser: Any) -> None:
+        parser.add_argument(
+            "--user",
+            type=str,
+            default="demo@example.com",
+            help="Email of the poll creator to compute stats for",
+        )
+        parser.add_argument("--period", type=str, default="30d")
+        parser.add_argument("--runs", type=int, default=20)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        try:
+            user = User.objects.get(email=options["user"])
+        except User.DoesNotExist as e:
+            raise CommandError(f"No user with email {options['user']}") from e
+
+        timings = []
+        for _ in range(options["runs"]):
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                AnalyticsService.compute_stats(user, options["period"])
+                timings.append((time.perf_counter() - start) * 1000)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"get_stats: {len(queries)} queries, "
+                f"median {statistics.median(timings):.2f} ms, "
+                f"min {min(timings):.2f} ms over {len(timings)} runs"
+            )
+        )
@@ -0,0 +1,23 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from apps.analytics.rollups import rebuild_daily_stats
+from apps.core.partitioning import retained_since
+from apps.polls.models import Poll, PollView
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the daily per-poll engagement stats from raw votes and poll views"
+
+    def add_arguments(self, parser: Any) -> None:
+        parser.add_argument("--poll", type=str, help="Only rebuild the poll with this slug")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        polls = Poll.objects.filter(slug=options["poll"]) if options["poll"] else None
+        # Older raw views may have been dropped: their stats are all that is left
+        since = retained_since(PollView._meta.db_table)
+        if since is not None:
+            self.stdout.write(f"Keeping stats before {since:%Y-%m-%d}, older views are dropped")
+        created = rebuild_daily_stats(polls, since.date() if since is not None else None)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {created} daily poll stats"))
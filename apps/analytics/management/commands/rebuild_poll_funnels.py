@@ -0,0 +1,13 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from apps.analytics.funnels import update_funnels
+
+
+class Command(BaseCommand):
+    help = "Recomputes every daily poll funnel and resets the incremental job's watermark"
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        written = update_funnels(full=True)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} daily poll funnels"))
@@ -9,6 +9,8 @@ from django.db import transaction
 from django.utils import timezone
 from faker import Faker
 
+from apps.analytics.funnels import update_funnels
+from apps.analytics.rollups import rebuild_daily_stats
 from apps.polls.models import Option, Poll, PollView, Question, Vote
 
 User = get_user_model()
@@ -184,4 +186,8 @@ class Command(BaseCommand):
 
             self.stdout.write(self.style.SUCCESS(f"Created {votes_created} votes"))
 
+            # Timestamps were backdated after the rollups were recorded
+            rebuild_daily_stats(Poll.objects.filter(id__in=[poll.id for poll in polls]))
+            update_funnels(full=True)
+
         self.stdout.write(self.style.SUCCESS("Analytics seeding completed successfully!"))
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('polls', '0011_partition_pollview'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PollDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('votes', models.PositiveIntegerField(default=0)),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('unique_voters', models.PositiveIntegerField(default=0)),
+                ('poll', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='polls.poll')),
+            ],
+            options={
+                'verbose_name': 'Poll Daily Stats',
+                'verbose_name_plural': 'Poll Daily Stats',
+                'indexes': [models.Index(fields=['day'], name='analytics_p_day_5fa8e0_idx')],
+                'constraints': [models.UniqueConstraint(fields=('poll', 'day'), name='unique_poll_daily_stats')],
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+from datetime import UTC
+from typing import Any
+
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def backfill_daily_stats(apps: Any, schema_editor: Any) -> None:
+    Vote = apps.get_model("polls", "Vote")
+    PollView = apps.get_model("polls", "PollView")
+    PollDailyStats = apps.get_model("analytics", "PollDailyStats")
+
+    rows: dict[tuple[int, Any], dict[str, Any]] = {}
+    votes = (
+        Vote.objects.annotate(day=TruncDate("created_at", tzinfo=UTC))
+        .values("question__poll_id", "day")
+        .annotate(votes=Count("id"), unique_voters=Count("user_id", distinct=True))
+        .order_by()
+    )
+    for row in votes.iterator():
+        poll_id = row.pop("question__poll_id")
+        rows[(poll_id, row["day"])] = {"poll_id": poll_id, **row}
+    views = (
+        PollView.objects.annotate(day=TruncDate("created_at", tzinfo=UTC))
+        .values("poll_id", "day")
+        .annotate(views=Count("id"))
+        .order_by()
+    )
+    for row in views.iterator():
+        rows.setdefault((row["poll_id"], row["day"]), {}).update(row)
+
+    PollDailyStats.objects.bulk_create(
+        (PollDailyStats(**row) for row in rows.values()), batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analytics", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_daily_stats, reverse_code=migrations.RunPython.noop),
+    ]
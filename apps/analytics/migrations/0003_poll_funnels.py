@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0002_backfill_poll_daily_stats'),
+        ('polls', '0011_partition_pollview'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BatchWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, unique=True)),
+                ('position', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Batch Watermark',
+                'verbose_name_plural': 'Batch Watermarks',
+            },
+        ),
+        migrations.CreateModel(
+            name='PollFunnel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('link_opens', models.PositiveIntegerField(default=0)),
+                ('qr_scans', models.PositiveIntegerField(default=0)),
+                ('embed_loads', models.PositiveIntegerField(default=0)),
+                ('social_shares', models.PositiveIntegerField(default=0)),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('first_votes', models.PositiveIntegerField(default=0)),
+                ('completed_ballots', models.PositiveIntegerField(default=0)),
+                ('poll', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='funnels', to='polls.poll')),
+            ],
+            options={
+                'verbose_name': 'Poll Funnel',
+                'verbose_name_plural': 'Poll Funnels',
+                'indexes': [models.Index(fields=['day'], name='analytics_p_day_0c1261_idx')],
+                'constraints': [models.UniqueConstraint(fields=('poll', 'day'), name='unique_poll_funnel')],
+            },
+        ),
+    ]
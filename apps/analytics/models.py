@@ -1 +1,72 @@
-# No models needed yet, PollView is in polls.models
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class PollDailyStats(models.Model):
+    """
+    Per-poll engagement for one UTC day, maintained as votes and views are recorded.
+    """
+
+    poll = models.ForeignKey("polls.Poll", on_delete=models.CASCADE, related_name="daily_stats")
+    day = models.DateField()
+    votes = models.PositiveIntegerField(default=0)
+    views = models.PositiveIntegerField(default=0)
+    # Distinct users who voted on the poll that day
+    unique_voters = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = _("Poll Daily Stats")
+        verbose_name_plural = _("Poll Daily Stats")
+        constraints = [
+            models.UniqueConstraint(fields=["poll", "day"], name="unique_poll_daily_stats")
+        ]
+        indexes = [models.Index(fields=["day"])]
+
+    def __str__(self) -> str:
+        return f"{self.poll_id} {self.day}: {self.votes} votes, {self.views} views"
+
+
+class PollFunnel(models.Model):
+    """
+    Per-poll conversion funnel for one UTC day, computed by a periodic batch job
+    (see funnels.py): arrivals by distribution channel, views, new voters and
+    completed ballots.
+    """
+
+    poll = models.ForeignKey("polls.Poll", on_delete=models.CASCADE, related_name="funnels")
+    day = models.DateField()
+    # Arrivals by channel (distribution events)
+    link_opens = models.PositiveIntegerField(default=0)
+    qr_scans = models.PositiveIntegerField(default=0)
+    embed_loads = models.PositiveIntegerField(default=0)
+    social_shares = models.PositiveIntegerField(default=0)
+    views = models.PositiveIntegerField(default=0)
+    # Users whose first vote on the poll was that day
+    first_votes = models.PositiveIntegerField(default=0)
+    # Users who answered the poll's last remaining question that day
+    completed_ballots = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = _("Poll Funnel")
+        verbose_name_plural = _("Poll Funnels")
+        constraints = [models.UniqueConstraint(fields=["poll", "day"], name="unique_poll_funnel")]
+        indexes = [models.Index(fields=["day"])]
+
+    def __str__(self) -> str:
+        return f"{self.poll_id} {self.day}: {self.first_votes} voters"
+
+
+class BatchWatermark(models.Model):
+    """
+    How far an incremental batch job has processed its input.
+    """
+
+    name = models.CharField(max_length=64, unique=True)
+    position = models.DateTimeField()
+
+    class Meta:
+        verbose_name = _("Batch Watermark")
+        verbose_name_plural = _("Batch Watermarks")
+
+    def __str__(self) -> str:
+        return f"{self.name}: {self.position}"
@@ -0,0 +1,156 @@
+"""
+Daily per-poll engagement rollups.
+
+Every recorded vote and poll view increments its poll's `PollDailyStats` row for
+the UTC day, so analytics read at most one small row per poll and day instead
+of counting raw votes and views through their joins. Raw rows can then expire
+(see apps.core.partitioning) without changing any total.
+"""
+
+from collections import Counter
+from collections.abc import Iterable
+from datetime import UTC, date, datetime, time, timedelta
+from typing import Any
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, QuerySet, Sum
+from django.db.models.functions import Greatest, TruncDate
+
+from apps.polls.models import Poll, PollView, Vote
+
+from .models import PollDailyStats
+
+
+def utc_day(timestamp: datetime) -> date:
+    return timestamp.astimezone(UTC).date()
+
+
+def day_bounds(day: date) -> tuple[datetime, datetime]:
+    start = datetime.combine(day, time(), tzinfo=UTC)
+    return start, start + timedelta(days=1)
+
+
+def _increment(poll_id: int, day: date, **amounts: int) -> None:
+    rows = PollDailyStats.objects.filter(poll_id=poll_id, day=day)
+    # Clamped, in case the rows being removed predate the rollup
+    changes = {field: Greatest(F(field) + amount, 0) for field, amount in amounts.items()}
+    if rows.update(**changes) or all(amount <= 0 for amount in amounts.values()):
+        return
+    try:
+        with transaction.atomic():
+            PollDailyStats.objects.create(
+                poll_id=poll_id,
+                day=day,
+                **{field: max(amount, 0) for field, amount in amounts.items()},
+            )
+    except IntegrityError:
+        # Created concurrently by another writer
+        rows.update(**changes)
+
+
+def _votes_on_day(vote: Vote, poll_id: int) -> QuerySet[Vote]:
+    """
+    The voter's other votes on the same poll during the vote's UTC day.
+    """
+    start, end = day_bounds(utc_day(vote.created_at))
+    return Vote.objects.filter(
+        user_id=vote.user_id,
+        question__poll_id=poll_id,
+        created_at__gte=start,
+        created_at__lt=end,
+    ).exclude(pk=vote.pk)
+
+
+def record_vote(vote: Vote) -> None:
+    """
+    Adds a new vote to its poll's day, counting the voter once per day.
+    """
+    poll_id = vote.question.poll_id
+    # Only the voter's first vote of the day counts them
+    first = not _votes_on_day(vote, poll_id).filter(pk__lt=vote.pk).exists()
+    _increment(poll_id, utc_day(vote.created_at), votes=1, unique_voters=int(first))
+
+
+def remove_vote(vote: Vote) -> None:
+    """
+    Removes a deleted vote from its poll's day.
+    """
+    poll_id = vote.question.poll_id
+    last = not _votes_on_day(vote, poll_id).exists()
+    _increment(poll_id, utc_day(vote.created_at), votes=-1, unique_voters=-int(last))
+
+
+def record_views(views: Iterable[PollView]) -> None:
+    """
+    Adds poll views to their days, one update per distinct poll and day.
+    """
+    increments: Counter[tuple[int, date]] = Counter(
+        (view.poll_id, utc_day(view.created_at)) for view in views
+    )
+    # A stable order keeps concurrent writers from deadlocking on each other's rows
+    for (poll_id, day), amount in sorted(increments.items()):
+        _increment(poll_id, day, views=amount)
+
+
+def rebuild_daily_stats(polls: QuerySet[Poll] | None = None, since: date | None = None) -> int:
+    """
+    Recomputes the daily stats of `polls` (default all) from raw votes and views,
+    for the UTC days from `since` (default all). Returns the number of rows written.
+    """
+    votes = Vote.objects.all()
+    views = PollView.objects.all()
+    stats = PollDailyStats.objects.all()
+    if since is not None:
+        start = day_bounds(since)[0]
+        votes = votes.filter(created_at__gte=start)
+        views = views.filter(created_at__gte=start)
+        stats = stats.filter(day__gte=since)
+    if polls is not None:
+        votes = votes.filter(question__poll__in=polls)
+        views = views.filter(poll__in=polls)
+        stats = stats.filter(poll__in=polls)
+
+    rows: dict[tuple[int, date], dict[str, Any]] = {}
+    vote_counts = (
+        votes.annotate(day=TruncDate("created_at", tzinfo=UTC))
+        .values("question__poll_id", "day")
+        .annotate(votes=Count("id"), unique_voters=Count("user_id", distinct=True))
+        .order_by()
+    )
+    for votes_row in vote_counts.iterator():
+        poll_id, day = votes_row["question__poll_id"], votes_row["day"]
+        rows[(poll_id, day)] = {
+            "poll_id": poll_id,
+            "day": day,
+            "votes": votes_row["votes"],
+            "unique_voters": votes_row["unique_voters"],
+        }
+    view_counts = (
+        views.annotate(day=TruncDate("created_at", tzinfo=UTC))
+        .values("poll_id", "day")
+        .annotate(views=Count("id"))
+        .order_by()
+    )
+    for views_row in view_counts.iterator():
+        poll_id, day = views_row["poll_id"], views_row["day"]
+        row = rows.setdefault((poll_id, day), {"poll_id": poll_id, "day": day})
+        row["views"] = views_row["views"]
+
+    with transaction.atomic():
+        stats.delete()
+        created = PollDailyStats.objects.bulk_create(
+            (PollDailyStats(**row) for row in rows.values()), batch_size=1000
+        )
+    return len(created)
+
+
+def is_rolled_up(start: datetime, end: datetime) -> bool:
+    """
+    Whether every raw poll view in [start, end) is counted by the daily stats,
+    i.e. whether the raw rows can be dropped without losing totals.
+    """
+    raw = PollView.objects.filter(created_at__gte=start, created_at__lt=end).count()
+    rolled_up = PollDailyStats.objects.filter(
+        day__gte=utc_day(start), day__lt=utc_day(end)
+    ).aggregate(total=Sum("views"))["total"]
+    return (rolled_up or 0) >= raw
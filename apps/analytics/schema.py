@@ -1,7 +1,6 @@
 from typing import Any
 
 import strawberry
-from django.db.models import Count
 from strawberry.permission import BasePermission
 from strawberry.types import Info
 
@@ -26,6 +25,8 @@ class AnalyticsStats:
     responses_change: float
     total_views: int
     views_change: float
+    unique_visitors: int | None
+    unique_voters: int | None
     avg_response_rate: float
     response_rate_change: float
 
@@ -38,10 +39,30 @@ class TrendDataPoint:
 
 @strawberry.type
 class AnalyticsTrends:
+    granularity: str
+    timezone: str
     poll_creation: list[TrendDataPoint]
     response_rate: list[TrendDataPoint]
 
 
+@strawberry.type
+class ChannelArrivals:
+    channel: str
+    arrivals: int
+
+
+@strawberry.type
+class AnalyticsFunnel:
+    channels: list[ChannelArrivals]
+    arrivals: int
+    views: int
+    first_votes: int
+    completed_ballots: int
+    view_rate: float
+    vote_rate: float
+    completion_rate: float
+
+
 @strawberry.type
 class TopPollNode:
     id: strawberry.ID
@@ -66,24 +87,40 @@ class AnalyticsQuery:
         return AnalyticsStats(**stats_data)
 
     @strawberry.field(permission_classes=[IsAuthenticated])
-    def analytics_trends(self, info: Info, period: str = "30d") -> AnalyticsTrends:
+    def analytics_trends(
+        self,
+        info: Info,
+        period: str = "30d",
+        granularity: str | None = None,
+        timezone: str = "UTC",
+    ) -> AnalyticsTrends:
+        # Zero-filled series, one point per hour, day, week or month (by default
+        # chosen from the period) in the given IANA timezone
         user = info.context.request.user
-        trends_data = AnalyticsService.get_trends(user, period)
+        trends_data = AnalyticsService.get_trends(user, period, granularity, timezone)
         return AnalyticsTrends(
+            granularity=trends_data["granularity"],
+            timezone=trends_data["timezone"],
             poll_creation=[TrendDataPoint(**p) for p in trends_data["poll_creation"]],
             response_rate=[TrendDataPoint(**r) for r in trends_data["response_rate"]],
         )
 
     @strawberry.field(permission_classes=[IsAuthenticated])
-    def top_polls(self, info: Info, period: str = "30d", limit: int = 5) -> list[TopPollNode]:
+    def analytics_funnel(
+        self, info: Info, period: str = "30d", poll_slug: str | None = None
+    ) -> AnalyticsFunnel:
+        # Read from the daily funnels, so lags the batch job by a few minutes
         user = info.context.request.user
-        # Logic to find top polls based on engagement (votes + views)
-        polls = (
-            Poll.objects.filter(created_by=user)
-            .annotate(votes_count=Count("questions__votes"), views_count=Count("views"))
-            .order_by("-votes_count")[:limit]
+        funnel = AnalyticsService.get_funnel(user, period, poll_slug)
+        return AnalyticsFunnel(
+            **{**funnel, "channels": [ChannelArrivals(**c) for c in funnel["channels"]]}
         )
 
+    @strawberry.field(permission_classes=[IsAuthenticated])
+    def top_polls(self, info: Info, period: str = "all", limit: int = 5) -> list[TopPollNode]:
+        user = info.context.request.user
+        polls = AnalyticsService.get_top_polls(user, period, limit)
+
         def get_status(poll: Poll) -> str:
             if not poll.is_active:
                 return "Closed"
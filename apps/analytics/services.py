@@ -2,13 +2,22 @@ import logging
 from datetime import timedelta
 from typing import Any, cast
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.core.cache import cache
-from django.db.models import Count
-from django.db.models.functions import TruncDay, TruncMonth
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
-from apps.polls.models import Poll, PollView, Vote
+from apps.core.swr import get_or_compute
+from apps.polls.models import Poll, Vote
+
+from .cache import fallback_key, result_key
+from .funnels import CHANNEL_FIELDS, funnel_totals
+from .leaderboard import get_top_poll_ids
+from .models import PollDailyStats
+from .rollups import utc_day
+from .trends import GRANULARITIES, HOUR, default_granularity, get_timezone, series
+from .uniques import VISITORS, VOTERS, count_uniques
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +27,8 @@ User = get_user_model()
 class AnalyticsService:
     """
     Service for calculating poll analytics, trends, and engagement metrics.
-    Includes Redis caching for performance.
+    Results are cached per creator generation (see cache.py) and refreshed in
+    the background once stale (see apps/core/swr.py).
     """
 
     @staticmethod
@@ -31,45 +41,68 @@ class AnalyticsService:
         }
         return periods.get(period, timedelta(days=30))
 
+    @classmethod
+    def _cached(cls, kind: str, user: Any, period: str, **options: Any) -> Any:
+        """
+        Serves `compute_<kind>` results from the cache, stale while a task refreshes them.
+        """
+        from .tasks import refresh_analytics_task
+
+        key = result_key(kind, user.id, period, **options)
+        return get_or_compute(
+            key,
+            lambda: getattr(cls, f"compute_{kind}")(user, period, **options),
+            ttl=settings.ANALYTICS_CACHE_SECONDS,
+            stale_ttl=settings.ANALYTICS_STALE_SECONDS,
+            refresh=lambda: refresh_analytics_task.delay(kind, str(user.id), period, key, options),
+            fallback_key=fallback_key(kind, user.id, period, **options),
+        )
+
     @classmethod
     def get_stats(cls, user: Any, period: str = "30d") -> dict[str, Any]:
+        """
+        Returns the creator's stats for the period (see compute_stats), cached.
+        """
+        return cast(dict[str, Any], cls._cached("stats", user, period))
+
+    @classmethod
+    def compute_stats(cls, user: Any, period: str = "30d") -> dict[str, Any]:
         """
         Calculates total polls, responses, views, and response rate.
         Includes percentage change from the previous equivalent period.
         """
-        cache_key = f"analytics:stats:{user.id}:{period}"
-        cached_data = cache.get(cache_key)
-        if cached_data:
-            return cast(dict[str, Any], cached_data)
-
         now = timezone.now()
         delta = cls.get_period_delta(period)
         start_date = now - delta
         prev_start_date = start_date - delta
 
-        # Current Period Data
+        # Polls are counted directly, votes and views from the daily rollups.
+        # Each takes one query covering both periods, with filtered aggregates.
         polls = Poll.objects.filter(created_by=user)
-        current_polls_count = polls.filter(created_at__gte=start_date).count()
-
-        # Responses (Votes)
-        current_votes = Vote.objects.filter(
-            question__poll__created_by=user, created_at__gte=start_date
-        ).count()
-
-        # Views
-        current_views = PollView.objects.filter(
-            poll__created_by=user, created_at__gte=start_date
-        ).count()
-
-        # Previous Period Data (for % change)
-        prev_polls_count = polls.filter(created_at__range=(prev_start_date, start_date)).count()
-        prev_votes = Vote.objects.filter(
-            question__poll__created_by=user,
-            created_at__range=(prev_start_date, start_date),
-        ).count()
-        prev_views = PollView.objects.filter(
-            poll__created_by=user, created_at__range=(prev_start_date, start_date)
-        ).count()
+        poll_counts = polls.aggregate(
+            total=Count("id"),
+            current=Count("id", filter=Q(created_at__gte=start_date)),
+            previous=Count("id", filter=Q(created_at__range=(prev_start_date, start_date))),
+        )
+        current = Q(day__gte=utc_day(start_date))
+        previous = Q(day__gte=utc_day(prev_start_date), day__lt=utc_day(start_date))
+        engagement = PollDailyStats.objects.filter(
+            poll__created_by=user, day__gte=utc_day(prev_start_date)
+        ).aggregate(
+            current_votes=Sum("votes", filter=current, default=0),
+            prev_votes=Sum("votes", filter=previous, default=0),
+            current_views=Sum("views", filter=current, default=0),
+            prev_views=Sum("views", filter=previous, default=0),
+        )
+        current_polls_count, prev_polls_count = poll_counts["current"], poll_counts["previous"]
+        current_votes, prev_votes = engagement["current_votes"], engagement["prev_votes"]
+        current_views, prev_views = engagement["current_views"], engagement["prev_views"]
+
+        # Approximate, from the per-poll HyperLogLog sketches (None without Redis).
+        # The ids are only fetched if Redis is there, once for both counts.
+        poll_ids = polls.values_list("id", flat=True)
+        unique_visitors = count_uniques(VISITORS, poll_ids, start_date, now)
+        unique_voters = count_uniques(VOTERS, poll_ids, start_date, now)
 
         def calc_change(current: int, prev: int) -> float:
             if prev == 0:
@@ -77,12 +110,14 @@ class AnalyticsService:
             return round(((current - prev) / prev) * 100, 2)
 
         stats = {
-            "total_polls": polls.count(),
+            "total_polls": poll_counts["total"],
             "polls_change": calc_change(current_polls_count, prev_polls_count),
             "total_responses": current_votes,
             "responses_change": calc_change(current_votes, prev_votes),
             "total_views": current_views,
             "views_change": calc_change(current_views, prev_views),
+            "unique_visitors": unique_visitors,
+            "unique_voters": unique_voters,
             "avg_response_rate": round((current_votes / current_views * 100), 2)
             if current_views > 0
             else 0.0,
@@ -91,53 +126,149 @@ class AnalyticsService:
                 int((prev_votes / prev_views * 100) if prev_views > 0 else 0.0),
             ),
         }
-
-        cache.set(cache_key, stats, timeout=600)  # 10 minutes
-        return cast(dict[str, Any], stats)
+        return stats
 
     @classmethod
-    def get_trends(cls, user: Any, period: str = "30d") -> dict[str, list[dict[str, Any]]]:
+    def get_trends(
+        cls,
+        user: Any,
+        period: str = "30d",
+        granularity: str | None = None,
+        tz_name: str = "UTC",
+    ) -> dict[str, Any]:
         """
-        Returns time-series data for poll creation and response rates.
+        Returns the creator's trends for the period (see compute_trends), cached.
         """
-        cache_key = f"analytics:trends:{user.id}:{period}"
-        cached_data = cache.get(cache_key)
-        if cached_data:
-            return cast(dict[str, list[dict[str, Any]]], cached_data)
+        return cast(
+            dict[str, Any],
+            cls._cached("trends", user, period, granularity=granularity, tz_name=tz_name),
+        )
 
-        now = timezone.now()
+    @classmethod
+    def compute_trends(
+        cls,
+        user: Any,
+        period: str = "30d",
+        granularity: str | None = None,
+        tz_name: str = "UTC",
+    ) -> dict[str, Any]:
+        """
+        Returns dense time series of poll creations and votes over the period,
+        one point per bucket of `granularity` (by default chosen from the period)
+        in the `tz_name` timezone. Raises ValueError for unknown granularities
+        or timezones, and for series too long to return.
+        """
+        tz = get_timezone(tz_name)
         delta = cls.get_period_delta(period)
+        granularity = granularity or default_granularity(delta)
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity: {granularity}")
+        now = timezone.now()
         start_date = now - delta
 
-        # Decision: Use Day truncation for <= 30d, Month for > 30d
-        trunc_func = TruncDay if delta.days <= 30 else TruncMonth
-
-        # Poll Creation Trend
-        poll_trends = (
-            Poll.objects.filter(created_by=user, created_at__gte=start_date)
-            .annotate(date=trunc_func("created_at"))
-            .values("date")
-            .annotate(value=Count("id"))
-            .order_by("date")
-        )
-
-        # Vote Trend
-        vote_trends = (
-            Vote.objects.filter(question__poll__created_by=user, created_at__gte=start_date)
-            .annotate(date=trunc_func("created_at"))
-            .values("date")
-            .annotate(value=Count("id"))
-            .order_by("date")
+        poll_trends = series(
+            Poll.objects.filter(created_by=user),
+            "created_at",
+            Count("id"),
+            start_date,
+            now,
+            granularity,
+            tz,
         )
+        # The daily rollups only hold whole UTC days
+        if granularity != HOUR and tz.key == "UTC":
+            vote_trends = series(
+                PollDailyStats.objects.filter(poll__created_by=user),
+                "day",
+                Sum("votes"),
+                start_date,
+                now,
+                granularity,
+                tz,
+            )
+        else:
+            vote_trends = series(
+                Vote.objects.filter(question__poll__created_by=user),
+                "created_at",
+                Count("id"),
+                start_date,
+                now,
+                granularity,
+                tz,
+            )
 
-        trends = {
+        return {
+            "granularity": granularity,
+            "timezone": tz.key,
             "poll_creation": [
-                {"date": str(t["date"]), "value": float(t["value"])} for t in poll_trends
+                {"date": str(bucket), "value": value} for bucket, value in poll_trends
             ],
             "response_rate": [
-                {"date": str(t["date"]), "value": float(t["value"])} for t in vote_trends
+                {"date": str(bucket), "value": value} for bucket, value in vote_trends
             ],
         }
 
-        cache.set(cache_key, trends, timeout=900)  # 15 minutes
-        return cast(dict[str, list[dict[str, Any]]], trends)
+    @classmethod
+    def get_funnel(
+        cls, user: Any, period: str = "30d", poll_slug: str | None = None
+    ) -> dict[str, Any]:
+        """
+        Returns the arrivals → views → first votes → completed ballots funnel
+        of the creator's polls (or only `poll_slug`) over the period, summed
+        from the precomputed daily funnels (see funnels.py).
+        """
+        polls = Poll.objects.filter(created_by=user)
+        if poll_slug is not None:
+            polls = polls.filter(slug=poll_slug)
+        totals = funnel_totals(polls, timezone.now() - cls.get_period_delta(period))
+
+        def rate(count: int, total: int) -> float:
+            return round(count / total * 100, 2) if total > 0 else 0.0
+
+        arrivals = sum(totals[field] for field in CHANNEL_FIELDS.values())
+        return {
+            "channels": [
+                {"channel": str(channel), "arrivals": totals[field]}
+                for channel, field in CHANNEL_FIELDS.items()
+            ],
+            "arrivals": arrivals,
+            "views": totals["views"],
+            "first_votes": totals["first_votes"],
+            "completed_ballots": totals["completed_ballots"],
+            "view_rate": rate(totals["views"], arrivals),
+            "vote_rate": rate(totals["first_votes"], totals["views"]),
+            "completion_rate": rate(totals["completed_ballots"], totals["first_votes"]),
+        }
+
+    @classmethod
+    def get_top_polls(cls, user: Any, period: str = "all", limit: int = 5) -> list[Any]:
+        """
+        Returns the creator's most voted polls over the period (by default all
+        time), annotated with `votes_count` and `views_count`.
+
+        Votes and views are summed from the daily rollups by two independent
+        subqueries, so neither multiplies the other. The all-time ranking comes
+        from the creator's Redis leaderboard when available; other periods are
+        always ranked from the rollups.
+        """
+        daily_stats = PollDailyStats.objects.filter(poll=OuterRef("pk"))
+        if period != "all":
+            daily_stats = daily_stats.filter(
+                day__gte=utc_day(timezone.now() - cls.get_period_delta(period))
+            )
+
+        def total(field: str) -> Coalesce:
+            return Coalesce(
+                Subquery(daily_stats.values("poll").annotate(total=Sum(field)).values("total")),
+                0,
+            )
+
+        polls = Poll.objects.filter(created_by=user).annotate(
+            votes_count=total("votes"), views_count=total("views")
+        )
+        ranking = get_top_poll_ids(user.id, limit) if period == "all" else None
+        if ranking is None:
+            return list(polls.order_by("-votes_count", "-created_at")[:limit])
+
+        by_id = {poll.id: poll for poll in polls.filter(id__in=[poll_id for poll_id, _ in ranking])}
+        return [by_id[poll_id] for poll_id, _ in ranking if poll_id in by_id]
@@ -0,0 +1,65 @@
+from typing import Any
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.polls.models import Poll, PollView, Vote
+
+from .cache import bump_generation, creator_changed
+from .leaderboard import add_poll, add_votes, remove_poll
+from .rollups import record_views, record_vote, remove_vote
+
+
+def poll_activity(poll_id: int, votes: int = 0) -> None:
+    """
+    Once the current transaction commits, bumps the analytics generation of the
+    poll's creator and adds `votes` to the poll's leaderboard score.
+    """
+
+    def _commit() -> None:
+        user_id = Poll.objects.filter(pk=poll_id).values_list("created_by_id", flat=True).first()
+        if user_id is None:
+            return
+        bump_generation(user_id)
+        if votes:
+            add_votes(user_id, poll_id, votes)
+
+    transaction.on_commit(_commit)
+
+
+@receiver(post_save, sender=Vote)
+def roll_up_vote(sender: type[Vote], instance: Vote, created: bool, **kwargs: Any) -> None:
+    if created:
+        record_vote(instance)
+        poll_activity(instance.question.poll_id, votes=1)
+
+
+@receiver(post_delete, sender=Vote)
+def roll_back_vote(sender: type[Vote], instance: Vote, **kwargs: Any) -> None:
+    # Deleting a poll deletes its daily stats too
+    if not isinstance(kwargs.get("origin"), Poll):
+        remove_vote(instance)
+        poll_activity(instance.question.poll_id, votes=-1)
+
+
+@receiver(post_save, sender=PollView)
+def roll_up_view(sender: type[PollView], instance: PollView, created: bool, **kwargs: Any) -> None:
+    if created:
+        record_views([instance])
+        poll_activity(instance.poll_id)
+
+
+@receiver(post_save, sender=Poll)
+def poll_created(sender: type[Poll], instance: Poll, created: bool, **kwargs: Any) -> None:
+    if created:
+        user_id, poll_id = instance.created_by_id, instance.pk
+        creator_changed(user_id)
+        transaction.on_commit(lambda: add_poll(user_id, poll_id))
+
+
+@receiver(post_delete, sender=Poll)
+def poll_deleted(sender: type[Poll], instance: Poll, **kwargs: Any) -> None:
+    user_id, poll_id = instance.created_by_id, instance.pk
+    creator_changed(user_id)
+    transaction.on_commit(lambda: remove_poll(user_id, poll_id))
@@ -0,0 +1,56 @@
+import logging
+from typing import Any
+
+from celery import shared_task
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from apps.core.swr import recompute
+
+from .cache import fallback_key
+from .funnels import update_funnels
+from .services import AnalyticsService
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+FUNNEL_LOCK_KEY = "analytics_funnel_lock"
+FUNNEL_LOCK_TIMEOUT = 30 * 60
+
+
+@shared_task
+def refresh_analytics_task(
+    kind: str, user_id: str, period: str, key: str, options: dict[str, Any] | None = None
+) -> None:
+    """
+    Recomputes a creator's stale cached analytics.
+    """
+    compute = {"stats": AnalyticsService.compute_stats, "trends": AnalyticsService.compute_trends}
+    user = User.objects.filter(pk=user_id).first()
+    if user is None:
+        logger.info(f"Not refreshing {key}: user {user_id} no longer exists")
+        return
+    recompute(
+        key,
+        lambda: compute[kind](user, period, **(options or {})),
+        ttl=settings.ANALYTICS_CACHE_SECONDS,
+        stale_ttl=settings.ANALYTICS_STALE_SECONDS,
+        fallback_key=fallback_key(kind, user_id, period, **(options or {})),
+    )
+
+
+@shared_task
+def update_funnels_task() -> None:
+    """
+    Recomputes the poll funnels touched since the last run.
+    """
+    # Beat may queue a run while the previous one is still going
+    if not cache.add(FUNNEL_LOCK_KEY, 1, timeout=FUNNEL_LOCK_TIMEOUT):
+        logger.info("Poll funnels are already being updated")
+        return
+    try:
+        update_funnels()
+    finally:
+        cache.delete(FUNNEL_LOCK_KEY)
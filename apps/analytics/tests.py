@@ -39,5 +39,6 @@ class AnalyticsServiceTests(TestCase):
         assert "response_rate" in trends
         assert len(trends["poll_creation"]) > 0
         assert len(trends["response_rate"]) > 0
-        assert trends["poll_creation"][0]["value"] == 1
-        assert trends["response_rate"][0]["value"] == 1
+        # Series are dense, today is the last point
+        assert trends["poll_creation"][-1]["value"] == 1
+        assert trends["response_rate"][-1]["value"] == 1
@@ -0,0 +1,143 @@
+"""
+Dense time series for analytics trends.
+
+A series has one point per bucket (hour, day, week or month, in the caller's
+timezone) from the start of the period to now, with 0 for empty buckets, so
+clients can plot it as is. On PostgreSQL the aggregated buckets are LEFT JOINed
+onto a `generate_series` of bucket starts, so gaps are filled by the database;
+elsewhere the same series is filled in Python.
+
+Buckets are truncated in local wall-clock time, like Postgres' date_trunc on
+`AT TIME ZONE` values, and weeks start on Monday.
+"""
+
+from datetime import date, datetime, timedelta, tzinfo
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.db import connection
+from django.db.models import Aggregate, QuerySet
+from django.db.models.functions import Trunc
+
+from apps.core.partitioning import add_months
+
+HOUR = "hour"
+DAY = "day"
+WEEK = "week"
+MONTH = "month"
+GRANULARITIES = (HOUR, DAY, WEEK, MONTH)
+
+# Longer series are refused rather than built (e.g. a year of hours)
+MAX_POINTS = 1000
+
+
+def get_timezone(name: str) -> ZoneInfo:
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError) as e:
+        raise ValueError(f"Unknown timezone: {name}") from e
+
+
+def default_granularity(period: timedelta) -> str:
+    """
+    The coarsest granularity still giving a useful number of points.
+    """
+    if period <= timedelta(days=2):
+        return HOUR
+    if period <= timedelta(days=31):
+        return DAY
+    if period <= timedelta(days=180):
+        return WEEK
+    return MONTH
+
+
+def truncate(moment: datetime, granularity: str) -> datetime:
+    """
+    Truncates a naive wall-clock time to the start of its bucket.
+    """
+    moment = moment.replace(minute=0, second=0, microsecond=0)
+    if granularity == HOUR:
+        return moment
+    moment = moment.replace(hour=0)
+    if granularity == WEEK:
+        return moment - timedelta(days=moment.weekday())
+    if granularity == MONTH:
+        return moment.replace(day=1)
+    return moment
+
+
+def next_bucket(bucket: datetime, granularity: str) -> datetime:
+    if granularity == MONTH:
+        month = add_months(bucket.date(), 1)
+        return datetime(month.year, month.month, 1)
+    step = {HOUR: timedelta(hours=1), DAY: timedelta(days=1), WEEK: timedelta(weeks=1)}
+    return bucket + step[granularity]
+
+
+def bucket_starts(start: datetime, end: datetime, granularity: str, tz: tzinfo) -> list[datetime]:
+    """
+    Returns the naive local starts of the buckets from `start` to `end`, inclusive.
+    """
+    bucket = truncate(start.astimezone(tz).replace(tzinfo=None), granularity)
+    last = truncate(end.astimezone(tz).replace(tzinfo=None), granularity)
+    buckets = []
+    while bucket <= last:
+        buckets.append(bucket)
+        if len(buckets) > MAX_POINTS:
+            raise ValueError(f"Too many {granularity} buckets, use a coarser granularity")
+        bucket = next_bucket(bucket, granularity)
+    return buckets
+
+
+def _naive(bucket: date | datetime, tz: tzinfo) -> datetime:
+    if isinstance(bucket, datetime):
+        return bucket.astimezone(tz).replace(tzinfo=None) if bucket.tzinfo else bucket
+    return datetime(bucket.year, bucket.month, bucket.day)
+
+
+def series(
+    queryset: QuerySet,
+    field: str,
+    value: Aggregate,
+    start: datetime,
+    end: datetime,
+    granularity: str,
+    tz: tzinfo,
+) -> list[tuple[datetime, float]]:
+    """
+    Aggregates `value` over `queryset` per bucket of `field` between `start`
+    and `end`, returning every bucket as (aware local start, value). The first
+    bucket is whole: it starts before `start`.
+
+    `field` may be a DateField holding UTC days (a daily rollup), in which case
+    `tz` must be UTC and the granularity at least a day.
+    """
+    buckets = bucket_starts(start, end, granularity, tz)
+    is_date = not queryset.model._meta.get_field(field).get_internal_type().startswith("DateTime")
+    first = buckets[0].replace(tzinfo=tz)
+    aggregated = (
+        queryset.filter(**{f"{field}__gte": first.date() if is_date else first})
+        .annotate(
+            bucket=Trunc(field, granularity, tzinfo=None if is_date else tz),
+        )
+        .values("bucket")
+        .annotate(value=value)
+        .order_by()
+    )
+
+    if connection.vendor == "postgresql":
+        sql, params = aggregated.query.sql_with_params()
+        with connection.cursor() as cursor:
+            # The subquery is compiled by Django, its values are parameters
+            cursor.execute(
+                "SELECT series.bucket, COALESCE(data.value, 0) "  # noqa: S608
+                "FROM generate_series(%s::timestamp, %s::timestamp, %s::interval) "
+                "AS series(bucket) "
+                f"LEFT JOIN ({sql}) AS data ON data.bucket = series.bucket "
+                "ORDER BY series.bucket",
+                [buckets[0], buckets[-1], f"1 {granularity}", *params],
+            )
+            rows = cursor.fetchall()
+        return [(bucket.replace(tzinfo=tz), float(total)) for bucket, total in rows]
+
+    totals = {_naive(row["bucket"], tz): row["value"] for row in aggregated}
+    return [(bucket.replace(tzinfo=tz), float(totals.get(bucket) or 0)) for bucket in buckets]
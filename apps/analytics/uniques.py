@@ -0,0 +1,123 @@
+"""
+Approximate distinct visitor and voter counts.
+
+Each poll gets one HyperLogLog sketch per UTC day and kind in Redis
+(`hll:<kind>:<poll_id>:<YYYYMMDD>`, at most ~12 KB each). PFCOUNT over a set
+of sketches estimates the distinct members of their union with ~0.8% standard
+error, so "unique visitors in the last 30 days across all my polls" costs one
+command instead of a COUNT(DISTINCT ...) over raw rows. Unions of more than
+`UNIQUES_MAX_KEYS` sketches (many polls over long periods) are merged into a
+temporary sketch that many at a time, so no single command blocks Redis for long.
+
+Members are user ids when known, otherwise a salted hash of IP and user agent,
+so raw addresses never reach Redis. Without Redis nothing is recorded and the
+counts are None.
+"""
+
+import hashlib
+import logging
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import UTC, date, datetime, timedelta
+from itertools import batched
+from uuid import UUID, uuid4
+
+import redis
+from django.conf import settings
+from django.utils import timezone
+
+from apps.core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+VISITORS = "visitors"
+VOTERS = "voters"
+
+
+def sketch_key(kind: str, poll_id: int, day: date) -> str:
+    return f"hll:{kind}:{poll_id}:{day:%Y%m%d}"
+
+
+def visitor_id(
+    user_id: UUID | int | None = None, ip_address: str | None = None, user_agent: str | None = None
+) -> str:
+    """
+    Identifies a visitor by user id, or by a salted hash of IP and user agent.
+    """
+    if user_id is not None:
+        return f"u:{user_id}"
+    fingerprint = f"{settings.SECRET_KEY}|{ip_address or ''}|{user_agent or ''}"
+    return f"a:{hashlib.sha256(fingerprint.encode()).hexdigest()[:16]}"
+
+
+def record_uniques(kind: str, members: Iterable[tuple[int, datetime, str]]) -> None:
+    """
+    Adds (poll_id, timestamp, member) entries to their daily sketches,
+    in one round trip however many polls and days they span.
+    """
+    client = get_redis()
+    if client is None:
+        return
+
+    grouped: defaultdict[str, set[str]] = defaultdict(set)
+    for poll_id, timestamp, member in members:
+        grouped[sketch_key(kind, poll_id, timestamp.astimezone(UTC).date())].add(member)
+    if not grouped:
+        return
+
+    ttl = timedelta(days=settings.UNIQUES_RETENTION_DAYS)
+    pipe = client.pipeline(transaction=False)
+    for key, batch in grouped.items():
+        pipe.pfadd(key, *batch)
+        pipe.expire(key, ttl)
+    try:
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Failed to record unique {kind}: {e}")
+
+
+def _count_merged(client: redis.Redis, keys: list[str]) -> int:
+    """
+    Estimates the union of more sketches than one command should take, by
+    merging them into a temporary sketch a chunk at a time.
+    """
+    union = f"hll:union:{uuid4().hex}"
+    chunks = list(batched(keys, settings.UNIQUES_MAX_KEYS))
+    pipe = client.pipeline(transaction=False)
+    pipe.pfmerge(union, *chunks[0])
+    # In case the rest of the pipeline never runs
+    pipe.expire(union, 60)
+    for chunk in chunks[1:]:
+        pipe.pfmerge(union, *chunk)
+    pipe.pfcount(union)
+    pipe.delete(union)
+    return int(pipe.execute()[-2])
+
+
+def count_uniques(
+    kind: str, poll_ids: Iterable[int], start: datetime, end: datetime | None = None
+) -> int | None:
+    """
+    Estimates the distinct members seen by any of the polls between the UTC days
+    of `start` and `end` (inclusive, default today). None without Redis.
+    """
+    client = get_redis()
+    if client is None:
+        return None
+
+    last = (end or timezone.now()).astimezone(UTC).date()
+    # Older sketches have expired
+    first = max(
+        start.astimezone(UTC).date(), last - timedelta(days=settings.UNIQUES_RETENTION_DAYS)
+    )
+    days = [first + timedelta(days=offset) for offset in range((last - first).days + 1)]
+    keys = [sketch_key(kind, poll_id, day) for poll_id in poll_ids for day in days]
+    if not keys:
+        return 0
+    try:
+        if len(keys) > settings.UNIQUES_MAX_KEYS:
+            return _count_merged(client, keys)
+        return int(client.pfcount(*keys))
+    except redis.RedisError as e:
+        logger.warning(f"Failed to count unique {kind}: {e}")
+        return None
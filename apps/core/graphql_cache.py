@@ -0,0 +1,136 @@
+"""
+Opt-in response cache for public GraphQL queries.
+
+Root query fields opt in with the `CachedResult` field extension. When every root
+field of a query operation is cacheable, the whole result is cached under a key
+derived from the normalized document, the operation name, the variables and the
+current values of the version counters the fields depend on. Bumping a version
+(e.g. when a poll changes) therefore invalidates every cached response using it,
+and repeated anonymous queries skip the resolvers entirely.
+
+Only mark fields whose result is the same for every caller.
+"""
+
+import hashlib
+import json
+from collections.abc import Awaitable, Callable, Iterator
+from typing import Any
+
+from django.core.cache import cache
+from graphql import (
+    ExecutionResult,
+    FieldNode,
+    GraphQLField,
+    OperationType,
+    get_operation_ast,
+    print_ast,
+    value_from_ast_untyped,
+)
+from strawberry.extensions import FieldExtension, SchemaExtension
+from strawberry.types import Info
+
+RESPONSE_CACHE_KEY = "graphql:response:{digest}"
+
+
+class CachedResult(FieldExtension):
+    """
+    Marks a root query field as safe to serve from the response cache.
+
+    `versions` maps the field's arguments to the version counter keys its
+    result depends on.
+    """
+
+    def __init__(
+        self,
+        ttl: int = 60,
+        versions: Callable[[dict[str, Any]], list[str]] | None = None,
+    ) -> None:
+        self.ttl = ttl
+        self.versions = versions
+
+    def version_keys(self, arguments: dict[str, Any]) -> list[str]:
+        return self.versions(arguments) if self.versions else []
+
+    def resolve(self, next_: Callable[..., Any], source: Any, info: Info, **kwargs: Any) -> Any:
+        return next_(source, info, **kwargs)
+
+    async def resolve_async(
+        self, next_: Callable[..., Awaitable[Any]], source: Any, info: Info, **kwargs: Any
+    ) -> Any:
+        return await next_(source, info, **kwargs)
+
+
+def _cached_result_marker(field: GraphQLField | None) -> CachedResult | None:
+    definition = field.extensions.get("strawberry-definition") if field else None
+    for extension in getattr(definition, "extensions", None) or []:
+        if isinstance(extension, CachedResult):
+            return extension
+    return None
+
+
+class ResponseCacheExtension(SchemaExtension):
+    """
+    Serves fully cacheable query operations from the Django cache.
+    """
+
+    def on_execute(self) -> Iterator[None]:
+        entry = self._cache_entry()
+        cached_data = cache.get(entry[0]) if entry else None
+        if cached_data is not None:
+            self.execution_context.result = ExecutionResult(data=cached_data, errors=None)
+
+        yield
+
+        result = self.execution_context.result
+        if entry and cached_data is None and result is not None and not result.errors:
+            if result.data is not None:
+                cache.set(entry[0], result.data, timeout=entry[1])
+
+    def _cache_entry(self) -> tuple[str, int] | None:
+        """
+        Returns the (cache key, ttl) for the operation, or None if it is not cacheable.
+        """
+        context = self.execution_context
+        document = context.graphql_document
+        if document is None:
+            return None
+        operation = get_operation_ast(document, context.operation_name)
+        if operation is None or operation.operation != OperationType.QUERY:
+            return None
+
+        query_type = context.schema._schema.query_type
+        variables = context.variables or {}
+        version_keys: list[str] = []
+        ttls: list[int] = []
+        for selection in operation.selection_set.selections:
+            if not isinstance(selection, FieldNode):
+                return None  # Root fragments are not worth analysing
+            if selection.name.value == "__typename":
+                continue
+            field = query_type.fields.get(selection.name.value) if query_type else None
+            marker = _cached_result_marker(field)
+            if field is None or marker is None:
+                return None
+            arguments = {
+                argument.name.value: value_from_ast_untyped(argument.value, variables)
+                for argument in selection.arguments or ()
+            }
+            version_keys.extend(marker.version_keys(arguments))
+            ttls.append(marker.ttl)
+
+        if not ttls:
+            return None
+
+        versions = cache.get_many(version_keys) if version_keys else {}
+        fingerprint = json.dumps(
+            {
+                "document": print_ast(document),
+                "operation": context.operation_name,
+                "variables": variables,
+                "versions": [versions.get(key, 0) for key in sorted(version_keys)],
+            },
+            sort_keys=True,
+            default=str,
+        )
+        digest = hashlib.sha256(fingerprint.encode()).hexdigest()
+        return RESPONSE_CACHE_KEY.format(digest=digest), min(ttls)
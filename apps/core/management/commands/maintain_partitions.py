@@ -0,0 +1,28 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from apps.core.partitioning import maintain_partitions, supports_partitioning
+
+
+class Command(BaseCommand):
+    help = "Creates upcoming monthly partitions and drops those past their retention"
+
+    def add_arguments(self, parser: Any) -> None:
+        parser.add_argument(
+            "--months-ahead", type=int, help="Months to create ahead of the current one"
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if not supports_partitioning():
+            self.stdout.write(self.style.WARNING("This database does not support partitioning"))
+            return
+
+        created, dropped = maintain_partitions(options["months_ahead"])
+        for name in created:
+            self.stdout.write(f"Created {name}")
+        for name in dropped:
+            self.stdout.write(f"Dropped {name}")
+        self.stdout.write(
+            self.style.SUCCESS(f"Created {len(created)} and dropped {len(dropped)} partitions")
+        )
@@ -0,0 +1,21 @@
+from collections.abc import Iterable
+
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.renderers import BaseRenderer
+from rest_framework.request import Request
+
+
+class FormatParamContentNegotiation(DefaultContentNegotiation):
+    """
+    For views whose `?format=` picks their own output format (e.g. the image
+    type of a QR code), not a DRF renderer. Errors use the first renderer.
+    """
+
+    def select_renderer(
+        self,
+        request: Request,
+        renderers: Iterable[BaseRenderer],
+        format_suffix: str | None = None,
+    ) -> tuple[BaseRenderer, str]:
+        renderer = next(iter(renderers))
+        return renderer, renderer.media_type
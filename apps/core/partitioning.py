@@ -0,0 +1,231 @@
+"""
+Monthly range partitioning of append-only event tables (PostgreSQL only).
+
+Partitioned tables are split into one partition per calendar month (UTC), named
+`<table>_pYYYYMM`, plus a `<table>_default` partition catching rows outside
+every range. Queries filtering on the partition column only touch the months
+they cover, and expired months are dropped as whole tables instead of being
+deleted row by row.
+
+Tables are converted by their own migrations, which freeze the DDL they run.
+Postgres requires the primary key of a partitioned table to include the
+partition column, so it becomes (id, <column>). Django keeps addressing rows
+by id alone, which stays unique because it is drawn from a single sequence.
+
+On other databases (the SQLite test settings) every function is a no-op.
+"""
+
+import logging
+import re
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, date, datetime
+
+from django.conf import settings
+from django.db import connection as default_connection
+from django.db import transaction
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PartitionPolicy:
+    table: str
+    column: str
+    # Months of raw rows kept (None keeps everything)
+    retention_months: int | None = None
+    # Called with a month's (start, end); its partition is only dropped if true
+    is_rolled_up: Callable[[datetime, datetime], bool] | None = None
+
+
+def add_months(month: date, months: int) -> date:
+    """
+    Returns the first day of the month `months` after `month`.
+    """
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_bounds(month: date) -> tuple[datetime, datetime]:
+    start = datetime(month.year, month.month, 1, tzinfo=UTC)
+    end_month = add_months(month, 1)
+    return start, datetime(end_month.year, end_month.month, 1, tzinfo=UTC)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def supports_partitioning(connection: BaseDatabaseWrapper = default_connection) -> bool:
+    return connection.vendor == "postgresql"
+
+
+def is_partitioned(table: str, connection: BaseDatabaseWrapper = default_connection) -> bool:
+    if not supports_partitioning(connection):
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)", [table]
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions(
+    table: str, connection: BaseDatabaseWrapper = default_connection
+) -> dict[date, str]:
+    """
+    Returns the monthly partitions of `table` by month.
+    """
+    if not is_partitioned(table, connection):
+        return {}
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(%s)",
+            [table],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    pattern = re.compile(rf"^{re.escape(table)}_p(\d{{4}})(\d{{2}})$")
+    partitions = {}
+    for name in names:
+        if match := pattern.match(name):
+            partitions[date(int(match[1]), int(match[2]), 1)] = name
+    return partitions
+
+
+def retained_since(
+    table: str, connection: BaseDatabaseWrapper = default_connection
+) -> datetime | None:
+    """
+    Returns the start of the oldest monthly partition of `table`. Retention may
+    have dropped raw rows before it, so rollups of earlier months must be kept
+    rather than rebuilt. None if the table is not partitioned.
+    """
+    partitions = list_partitions(table, connection)
+    if not partitions:
+        return None
+    return month_bounds(min(partitions))[0]
+
+
+def create_partition(
+    table: str,
+    column: str,
+    month: date,
+    connection: BaseDatabaseWrapper = default_connection,
+    parent: str | None = None,
+) -> str:
+    """
+    Creates the partition of `table` holding `month`, moving any of its rows
+    out of the default partition first (Postgres refuses to attach otherwise).
+    """
+    parent = parent or table
+    name = partition_name(table, month)
+    start, end = month_bounds(month)
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TABLE {qn(name)} (LIKE {qn(parent)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+        cursor.execute("SELECT to_regclass(%s)", [f"{table}_default"])
+        if cursor.fetchone()[0] is not None:
+            # Identifiers are quoted, values are parameters
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {qn(f'{table}_default')} "  # noqa: S608
+                f"WHERE {qn(column)} >= %s AND {qn(column)} < %s RETURNING *) "
+                f"INSERT INTO {qn(name)} SELECT * FROM moved",
+                [start, end],
+            )
+        cursor.execute(
+            f"ALTER TABLE {qn(parent)} ATTACH PARTITION {qn(name)} FOR VALUES FROM (%s) TO (%s)",
+            [start, end],
+        )
+    return name
+
+
+def ensure_partitions(
+    table: str,
+    column: str,
+    months_ahead: int,
+    today: date | None = None,
+    connection: BaseDatabaseWrapper = default_connection,
+) -> list[str]:
+    """
+    Creates the partitions for the current month and `months_ahead` following
+    months that don't exist yet. Returns the names of the new partitions.
+    """
+    if not is_partitioned(table, connection):
+        return []
+    current = (today or datetime.now(UTC).date()).replace(day=1)
+    existing = list_partitions(table, connection)
+    return [
+        create_partition(table, column, month, connection)
+        for month in (add_months(current, offset) for offset in range(months_ahead + 1))
+        if month not in existing
+    ]
+
+
+def drop_expired_partitions(
+    policy: PartitionPolicy,
+    today: date | None = None,
+    connection: BaseDatabaseWrapper = default_connection,
+) -> list[str]:
+    """
+    Drops the monthly partitions that ended more than `retention_months` ago
+    and have been rolled up. Returns the names of the dropped partitions.
+    """
+    if policy.retention_months is None or not is_partitioned(policy.table, connection):
+        return []
+    current = (today or datetime.now(UTC).date()).replace(day=1)
+    cutoff = add_months(current, -policy.retention_months)
+    qn = connection.ops.quote_name
+
+    dropped = []
+    for month, name in sorted(list_partitions(policy.table, connection).items()):
+        if month >= cutoff:
+            break
+        if policy.is_rolled_up is not None and not policy.is_rolled_up(*month_bounds(month)):
+            logger.warning(f"Keeping partition {name}: its rows have not been rolled up")
+            continue
+        with connection.cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {qn(policy.table)} DETACH PARTITION {qn(name)}")
+            cursor.execute(f"DROP TABLE {qn(name)}")
+        dropped.append(name)
+    return dropped
+
+
+def get_partition_policies() -> list[PartitionPolicy]:
+    """
+    Builds the policies configured in settings.PARTITIONED_TABLES.
+    """
+    policies = []
+    for table, options in settings.PARTITIONED_TABLES.items():
+        check = options.get("is_rolled_up")
+        policies.append(
+            PartitionPolicy(
+                table=table,
+                column=options["column"],
+                retention_months=options.get("retention_months"),
+                is_rolled_up=import_string(check) if check else None,
+            )
+        )
+    return policies
+
+
+def maintain_partitions(months_ahead: int | None = None) -> tuple[list[str], list[str]]:
+    """
+    Creates upcoming partitions and drops expired ones for every configured
+    table. Returns the created and dropped partition names.
+    """
+    if months_ahead is None:
+        months_ahead = settings.PARTITION_MONTHS_AHEAD
+    created: list[str] = []
+    dropped: list[str] = []
+    for policy in get_partition_policies():
+        with transaction.atomic():
+            created += ensure_partitions(policy.table, policy.column, months_ahead)
+        with transaction.atomic():
+            dropped += drop_expired_partitions(policy)
+    return created, dropped
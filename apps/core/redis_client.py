@@ -0,0 +1,36 @@
+"""
+Access to the raw Redis connection behind the default cache.
+
+Features such as pub/sub need Redis primitives that Django's cache API does not
+expose. These helpers return ``None`` when the default cache is not Redis-backed
+(e.g. LocMemCache in tests and local development) so callers can degrade gracefully.
+"""
+
+from typing import cast
+
+import redis
+import redis.asyncio as aioredis
+from django.conf import settings
+
+
+def get_redis() -> redis.Redis | None:
+    """
+    Returns the synchronous client used by the default django-redis cache.
+    """
+    from django_redis import get_redis_connection
+
+    try:
+        return cast(redis.Redis, get_redis_connection("default"))
+    except NotImplementedError:
+        # The default cache is not a django-redis backend
+        return None
+
+
+def get_async_redis() -> aioredis.Redis | None:
+    """
+    Returns a new asyncio client for the configured Redis instance.
+    Callers own the client and must close it with ``aclose()``.
+    """
+    if get_redis() is None:
+        return None
+    return aioredis.from_url(settings.REDIS_URL)
@@ -0,0 +1,36 @@
+"""
+Streaming synchronous generators from async (ASGI) responses.
+
+Under ASGI, Django reads a synchronous `StreamingHttpResponse` iterator to the
+end (in a thread) before sending its first byte, so large exports would be
+held in memory whole. `iterate_in_thread` wraps such an iterator so that each
+item is produced by a worker thread as the response is sent.
+"""
+
+from collections.abc import AsyncIterator, Iterator
+from typing import cast
+
+from asgiref.sync import sync_to_async
+
+_DONE = object()
+
+
+async def iterate_in_thread[T](iterator: Iterator[T]) -> AsyncIterator[T]:
+    """
+    Yields the items of a synchronous iterator, producing each in a thread.
+
+    Thread sensitive (asgiref's default), so database cursors opened by the
+    iterator stay on one connection. The iterator is closed when the response
+    is, even if the client went away early.
+    """
+
+    def read() -> T | object:
+        return next(iterator, _DONE)
+
+    try:
+        while (item := await sync_to_async(read)()) is not _DONE:
+            yield cast(T, item)
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            await sync_to_async(close)()
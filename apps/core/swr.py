@@ -0,0 +1,172 @@
+"""
+Stale-while-revalidate caching with single-flight recomputation.
+
+Values are stored with the time they stop being fresh and how long they took
+to compute. Past that soft TTL they are still served, for up to `stale_ttl`
+more seconds, while exactly one caller (whoever takes the key's lock in the
+shared cache) refreshes them, normally by queueing a background task. Cold
+misses are single-flight too: one caller computes, the others wait briefly for
+its result.
+
+Keys that change with their inputs (e.g. a version counter bumped on every
+write) would turn every write into a cold miss. Such callers pass a
+`fallback_key` without the version: each store also writes the value there, and
+a miss on the versioned key serves it as stale while one refresh runs.
+
+To keep popular keys from all going stale at the same instant, a value may be
+refreshed early: each read treats it as stale with a probability that rises as
+its soft expiry nears, and sooner for values that are slow to compute
+("XFetch", Vattani et al., "Optimal Probabilistic Cache Stampede Prevention").
+"""
+
+import logging
+import math
+import random
+import time
+from collections.abc import Callable
+from typing import Any, TypedDict
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+LOCK_KEY = "swr_lock:{key}"
+# Longest a refresh may hold the lock (a crashed worker's lock expires with it)
+LOCK_TIMEOUT = 60
+# How long cold misses wait for another caller's computation
+WAIT_TIMEOUT = 5.0
+WAIT_INTERVAL = 0.05
+
+
+class Entry(TypedDict):
+    value: Any
+    fresh_until: float
+    duration: float
+
+
+def lock_key(key: str) -> str:
+    return LOCK_KEY.format(key=key)
+
+
+def is_stale(entry: Entry, beta: float = 1.0) -> bool:
+    """
+    Whether to refresh an entry now: always past its soft TTL, and before it
+    with a probability growing as the TTL nears (XFetch).
+    """
+    # Not security sensitive, only spreads refreshes out
+    jitter = -math.log(1.0 - random.random())  # noqa: S311
+    return time.time() + entry["duration"] * beta * jitter >= entry["fresh_until"]
+
+
+def store[T](
+    key: str,
+    value: T,
+    ttl: int,
+    stale_ttl: int,
+    duration: float = 0.0,
+    fallback_key: str | None = None,
+) -> T:
+    """
+    Caches a value as fresh for `ttl` seconds, then stale for `stale_ttl` more
+    (also under `fallback_key`, if given).
+    """
+    entry: Entry = {"value": value, "fresh_until": time.time() + ttl, "duration": duration}
+    cache.set(key, entry, timeout=ttl + stale_ttl)
+    if fallback_key is not None:
+        cache.set(fallback_key, entry, timeout=ttl + stale_ttl)
+    return value
+
+
+def recompute[T](
+    key: str,
+    compute: Callable[[], T],
+    ttl: int,
+    stale_ttl: int,
+    fallback_key: str | None = None,
+) -> T:
+    """
+    Computes and caches a value, then releases the refresh locks of the key
+    and its fallback. Background refreshes call this.
+    """
+    try:
+        started = time.monotonic()
+        value = compute()
+        return store(
+            key, value, ttl, stale_ttl, time.monotonic() - started, fallback_key=fallback_key
+        )
+    finally:
+        cache.delete_many([lock_key(name) for name in (key, fallback_key) if name is not None])
+
+
+def _refresh[T](
+    key: str,
+    lock: str,
+    compute: Callable[[], T],
+    ttl: int,
+    stale_ttl: int,
+    refresh: Callable[[], Any] | None,
+    fallback_key: str | None,
+) -> T | None:
+    """
+    Starts a refresh unless `lock` is held. Returns the value if it was
+    recomputed inline, otherwise None.
+    """
+    if not cache.add(lock, 1, timeout=LOCK_TIMEOUT):
+        return None
+    if refresh is None:
+        return recompute(key, compute, ttl, stale_ttl, fallback_key)
+    try:
+        refresh()
+    except Exception as e:
+        cache.delete(lock)
+        logger.warning(f"Failed to schedule refresh of {key}: {e}")
+    return None
+
+
+def get_or_compute[T](
+    key: str,
+    compute: Callable[[], T],
+    ttl: int,
+    stale_ttl: int,
+    refresh: Callable[[], Any] | None = None,
+    beta: float = 1.0,
+    fallback_key: str | None = None,
+) -> T:
+    """
+    Returns the cached value of `key`, computing it on a cold miss.
+
+    Stale values are returned as they are, after starting a refresh unless one
+    is already running: `refresh()` if given (which must end up calling
+    `recompute`, e.g. from a task), otherwise `compute` inline. On a miss, the
+    value last stored under `fallback_key` is served the same way, with one
+    refresh at a time per fallback key. `beta` > 1 favours earlier refreshes.
+    """
+    entry: Entry | None = cache.get(key)
+    if entry is not None:
+        if is_stale(entry, beta):
+            value = _refresh(key, lock_key(key), compute, ttl, stale_ttl, refresh, fallback_key)
+            if value is not None:
+                return value
+        return entry["value"]  # type: ignore[no-any-return]
+
+    fallback: Entry | None = cache.get(fallback_key) if fallback_key is not None else None
+    if fallback_key is not None and fallback is not None:
+        value = _refresh(
+            key, lock_key(fallback_key), compute, ttl, stale_ttl, refresh, fallback_key
+        )
+        return fallback["value"] if value is None else value
+
+    if cache.add(lock_key(key), 1, timeout=LOCK_TIMEOUT):
+        return recompute(key, compute, ttl, stale_ttl, fallback_key)
+
+    # Someone else is computing it: wait for their result rather than pile on
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry["value"]  # type: ignore[no-any-return]
+    logger.warning(f"Timed out waiting for {key}, computing it again")
+    started = time.monotonic()
+    value = compute()
+    return store(key, value, ttl, stale_ttl, time.monotonic() - started, fallback_key=fallback_key)
@@ -0,0 +1,17 @@
+import logging
+
+from celery import shared_task
+
+from apps.core.partitioning import maintain_partitions
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def maintain_partitions_task() -> None:
+    """
+    Periodically creates upcoming monthly partitions and drops expired ones.
+    """
+    created, dropped = maintain_partitions()
+    if created or dropped:
+        logger.info(f"Partitions created: {created}, dropped: {dropped}")
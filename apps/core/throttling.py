@@ -0,0 +1,298 @@
+"""
+Token-bucket rate limiting backed by Redis.
+
+Each scope in settings.THROTTLE_RATES limits requests along up to three
+dimensions, each with its own bucket: the client IP (see `client_ip`), the
+authenticated user and the poll being accessed. A request is allowed only if every applicable bucket
+has a token; all buckets are checked and debited by a single Lua script, so
+concurrent workers never over-admit and a denied request costs no tokens.
+
+Rates use DRF's "<count>/<period>" notation. The count is also the bucket size,
+so a client may burst up to its whole allowance before being paced.
+
+Throttling fails open: without Redis, or if Redis errors, requests are allowed.
+
+GraphQL operations over WebSocket are throttled like HTTP ones, identifying the
+client from the connection's ASGI scope.
+"""
+
+import logging
+import math
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from functools import lru_cache, wraps
+from typing import TYPE_CHECKING, Any
+
+import redis
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.http.response import HttpResponseBase
+from graphql import (
+    ExecutionResult,
+    FieldNode,
+    GraphQLError,
+    get_operation_ast,
+    value_from_ast_untyped,
+)
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+from strawberry.extensions import SchemaExtension
+
+from apps.core.redis_client import get_redis
+
+if TYPE_CHECKING:
+    # rest_framework.views imports the default throttle classes
+    from rest_framework.views import APIView
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_KEY = "throttle:{scope}:{dimension}:{identity}"
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+# KEYS are buckets, ARGV their (capacity, tokens per second) pairs.
+# Returns 0 after taking a token from every bucket, otherwise the milliseconds
+# until all of them have one (and takes nothing).
+TOKEN_BUCKET_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local levels = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local rate = tonumber(ARGV[2 * i])
+    local bucket = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or capacity
+    local elapsed = math.max(0, now - (tonumber(bucket[2]) or now))
+    tokens = math.min(capacity, tokens + elapsed * rate)
+    levels[i] = tokens
+    if tokens < 1 then
+        wait = math.max(wait, (1 - tokens) / rate)
+    end
+end
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local rate = tonumber(ARGV[2 * i])
+    local tokens = levels[i]
+    if wait == 0 then
+        tokens = tokens - 1
+    end
+    redis.call('HSET', key, 'tokens', tokens, 'ts', now)
+    redis.call('EXPIRE', key, math.ceil(capacity / rate) + 1)
+end
+return math.ceil(wait * 1000)
+"""
+
+
+@dataclass(frozen=True)
+class Rate:
+    capacity: int
+    per_second: float
+
+
+@lru_cache(maxsize=64)
+def parse_rate(rate: str) -> Rate:
+    """
+    Parses "<count>/<period>" where the period starts with s, m, h or d.
+    """
+    count, period = rate.split("/")
+    return Rate(int(count), int(count) / PERIODS[period[0]])
+
+
+def client_ip(request: HttpRequest) -> str | None:
+    """
+    The client's address, read from X-Forwarded-For behind the
+    REST_FRAMEWORK["NUM_PROXIES"] trusted proxies (like DRF's `get_ident`).
+    Entries added before the last trusted proxy are client supplied, so ignored.
+    """
+    address: str | None = request.META.get("REMOTE_ADDR")
+    num_proxies: int = api_settings.NUM_PROXIES or 0
+    forwarded: str = request.META.get("HTTP_X_FORWARDED_FOR", "")
+    if num_proxies > 0 and forwarded:
+        addresses = [part.strip() for part in forwarded.split(",") if part.strip()]
+        if addresses:
+            return addresses[-min(num_proxies, len(addresses))]
+    return address
+
+
+def scope_request(scope: dict[str, Any]) -> HttpRequest:
+    """
+    An HttpRequest with the address, X-Forwarded-For header and user of an ASGI
+    connection scope, so `get_buckets` can identify WebSocket clients.
+    """
+    request = HttpRequest()
+    client = scope.get("client")
+    if client:
+        request.META["REMOTE_ADDR"] = client[0]
+    for name, value in scope.get("headers", ()):
+        if name == b"x-forwarded-for":
+            request.META["HTTP_X_FORWARDED_FOR"] = value.decode("latin-1")
+    if "user" in scope:
+        request.user = scope["user"]
+    return request
+
+
+def get_buckets(scope: str, request: HttpRequest, poll: Any = None) -> list[tuple[str, Rate]]:
+    """
+    Returns the (key, rate) of every bucket a request in `scope` draws from.
+    Dimensions without an identity (anonymous user, unknown poll) are skipped.
+    """
+    user = getattr(request, "user", None)
+    identities = {
+        "ip": client_ip(request),
+        "user": user.pk if user is not None and user.is_authenticated else None,
+        "poll": poll,
+    }
+    rates: dict[str, str] = settings.THROTTLE_RATES.get(scope, {})
+    return [
+        (
+            THROTTLE_KEY.format(scope=scope, dimension=dimension, identity=identities[dimension]),
+            parse_rate(rate),
+        )
+        for dimension, rate in rates.items()
+        if identities.get(dimension) is not None
+    ]
+
+
+def consume(buckets: list[tuple[str, Rate]]) -> float:
+    """
+    Takes a token from every bucket if they all have one.
+    Returns 0 if the request is allowed, otherwise the seconds to wait.
+    """
+    client = get_redis()
+    if client is None or not buckets:
+        return 0.0
+
+    args: list[float] = []
+    for _, rate in buckets:
+        args += [rate.capacity, rate.per_second]
+    try:
+        # EVALSHA, loading the script only when Redis doesn't have it cached
+        wait_ms = client.register_script(TOKEN_BUCKET_SCRIPT)(
+            keys=[key for key, _ in buckets], args=args
+        )
+    except redis.RedisError as e:
+        logger.warning(f"Throttling unavailable, allowing request: {e}")
+        return 0.0
+    return int(wait_ms) / 1000
+
+
+def check_throttle(scope: str, request: HttpRequest, poll: Any = None) -> float:
+    """
+    Returns 0 if the request is within the scope's rates, otherwise the seconds to wait.
+    """
+    return consume(get_buckets(scope, request, poll))
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    DRF throttle for views declaring a `throttle_scope`.
+
+    The poll dimension comes from the view's `get_throttle_poll(request)` if it
+    has one, else from the URL kwarg named by `throttle_poll_kwarg`.
+    """
+
+    def __init__(self) -> None:
+        self._wait = 0.0
+
+    def allow_request(self, request: Request, view: "APIView") -> bool:
+        scope: str | None = getattr(view, "throttle_scope", None)
+        if not scope:
+            return True
+
+        if hasattr(view, "get_throttle_poll"):
+            poll = view.get_throttle_poll(request)
+        else:
+            poll_kwarg = getattr(view, "throttle_poll_kwarg", None)
+            poll = view.kwargs.get(poll_kwarg) if poll_kwarg else None
+
+        self._wait = check_throttle(scope, request, poll)
+        return self._wait == 0
+
+    def wait(self) -> float | None:
+        return math.ceil(self._wait) if self._wait else None
+
+
+def throttle(
+    scope: str, poll_kwarg: str | None = None
+) -> Callable[[Callable[..., HttpResponseBase]], Callable[..., HttpResponseBase]]:
+    """
+    Throttles a plain Django view, answering 429 with Retry-After when limited.
+    """
+
+    def decorator(view: Callable[..., HttpResponseBase]) -> Callable[..., HttpResponseBase]:
+        @wraps(view)
+        def wrapper(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponseBase:
+            wait = check_throttle(scope, request, kwargs.get(poll_kwarg) if poll_kwarg else None)
+            if wait:
+                response = HttpResponse("Too many requests.", status=429)
+                response["Retry-After"] = str(math.ceil(wait))
+                return response
+            return view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class GraphQLThrottleExtension(SchemaExtension):
+    """
+    Throttles GraphQL operations.
+
+    Every operation draws from the "graphql" scope, plus "graphql:<field>" for
+    each root field with configured rates (e.g. an expensive mutation). A root
+    field `slug` or `pollSlug` argument identifies the poll.
+
+    Over HTTP a throttled operation answers 429 with Retry-After. The WebSocket
+    consumer's context is a dict holding the consumer as "request"; there the
+    error is raised instead, as Strawberry ignores a preset result when it
+    starts a subscription.
+    """
+
+    def on_execute(self) -> Iterator[None]:
+        context = self.execution_context
+        if isinstance(context.context, dict):
+            consumer = context.context.get("request")
+            request = scope_request(consumer.scope) if consumer is not None else None
+        else:
+            request = getattr(context.context, "request", None)
+        if request is not None:
+            wait = consume(self._buckets(request))
+            if wait:
+                retry_after = math.ceil(wait)
+                error = GraphQLError(
+                    "Too many requests.",
+                    extensions={"code": "THROTTLED", "retryAfter": retry_after},
+                )
+                if isinstance(context.context, dict):
+                    raise error
+                response = getattr(context.context, "response", None)
+                if response is not None:
+                    response["Retry-After"] = str(retry_after)
+                    response.status_code = 429
+                context.result = ExecutionResult(data=None, errors=[error])
+        yield
+
+    def _buckets(self, request: HttpRequest) -> list[tuple[str, Rate]]:
+        buckets = get_buckets("graphql", request)
+        document = self.execution_context.graphql_document
+        operation = (
+            get_operation_ast(document, self.execution_context.operation_name) if document else None
+        )
+        if operation is None:
+            return buckets
+
+        variables = self.execution_context.variables or {}
+        for selection in operation.selection_set.selections:
+            if not isinstance(selection, FieldNode):
+                continue
+            scope = f"graphql:{selection.name.value}"
+            if scope not in settings.THROTTLE_RATES:
+                continue
+            arguments = {
+                argument.name.value: value_from_ast_untyped(argument.value, variables)
+                for argument in selection.arguments or ()
+            }
+            poll = arguments.get("slug") or arguments.get("pollSlug")
+            buckets += get_buckets(scope, request, poll)
+        return buckets
@@ -0,0 +1,70 @@
+"""
+HTTP caching for public distribution endpoints.
+
+Public poll responses are identical for every visitor, so a reverse proxy or CDN
+can serve them. Each response carries a `Surrogate-Key: poll-<slug>` header and
+is purged by that key whenever the poll changes (see tasks.purge_poll_cache_task).
+
+Edge caching is enabled by setting DISTRIBUTION_EDGE_CACHE_SECONDS. Requests
+served from the edge never reach Django, so only responses whose client reports
+its distribution event through the beacon endpoint are cached there: the
+public page and the embed widget's document. Other public endpoints (API
+detail, QR images, embed info) have no client able to beacon, so they keep
+logging their events and use `add_origin_headers`.
+"""
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+from apps.polls.models import Poll
+
+SURROGATE_KEY = "poll-{slug}"
+
+
+def surrogate_key(slug: str) -> str:
+    return SURROGATE_KEY.format(slug=slug)
+
+
+def edge_caching_enabled() -> bool:
+    edge_ttl: int = settings.DISTRIBUTION_EDGE_CACHE_SECONDS
+    return edge_ttl > 0
+
+
+def edge_cache_ttl(poll: Poll) -> int:
+    """
+    Returns how long the edge may cache a poll's public responses.
+    Never outlives the poll's next open/close transition, which no purge announces.
+    """
+    ttl: int = settings.DISTRIBUTION_EDGE_CACHE_SECONDS
+    now = timezone.now()
+    for transition in (poll.start_date, poll.end_date):
+        if transition and transition > now:
+            ttl = min(ttl, int((transition - now).total_seconds()))
+    return max(ttl, 0)
+
+
+def add_cache_headers[ResponseT: HttpResponse](
+    response: ResponseT, poll: Poll, max_ttl: int | None = None
+) -> ResponseT:
+    """
+    Marks a public poll response as cacheable by shared caches only, for at
+    most `max_ttl` seconds if given (for content that no purge refreshes).
+    Browsers always revalidate so purges take effect immediately.
+    """
+    ttl = edge_cache_ttl(poll)
+    if max_ttl is not None:
+        ttl = min(ttl, max_ttl)
+    patch_cache_control(response, public=True, max_age=0, s_maxage=ttl)
+    patch_vary_headers(response, ["Accept-Encoding"])
+    response["Surrogate-Key"] = surrogate_key(poll.slug)
+    return response
+
+
+def add_origin_headers[ResponseT: HttpResponse](response: ResponseT, poll: Poll) -> ResponseT:
+    """
+    Like `add_cache_headers`, but never cached by the edge, for responses that
+    log their distribution event on the origin.
+    """
+    return add_cache_headers(response, poll, max_ttl=0)
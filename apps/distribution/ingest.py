@@ -0,0 +1,247 @@
+"""
+Buffered ingestion of distribution events.
+
+Public endpoints push events onto a capped Redis list (one round trip, no broker
+publish) and a periodic task drains the buffer, writing rows with bulk_create
+and updating the rollups (see rollups.py) and unique visitor sketches
+(see apps/analytics/uniques.py) once per batch.
+
+Batches are read from the head of the list and only trimmed off once their
+rows are committed, so a database error or a crashed worker leaves them to be
+retried by the next run (delivery is at least once). This relies on a single
+drainer at a time, which the drain task's lock ensures.
+
+When the buffer is full new events are dropped and counted rather than letting
+traffic spikes grow Redis memory without bound. Without Redis (tests, local
+development) events fall back to the per-event Celery task.
+
+Bot traffic (link unfurlers, crawlers) is never stored. Events from bot user
+agents, or from an IP exceeding DISTRIBUTION_BOT_IP_RATE events for one poll per
+DISTRIBUTION_BOT_IP_WINDOW seconds, only increment a per-poll counter. The two
+are counted apart, so visitors sharing a NAT that trip the rate check show up
+as rate limited rather than disappearing among the crawlers.
+"""
+
+import json
+import logging
+from typing import Any, cast
+
+import redis
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.analytics.uniques import VISITORS, record_uniques, visitor_id
+from apps.core.redis_client import get_redis
+from apps.polls.models import Poll
+
+from .enrichment import enrich_events, is_bot
+from .models import DistributionAnalytics, DistributionEvent
+from .rollups import record_rollups
+
+logger = logging.getLogger(__name__)
+
+EVENT_BUFFER_KEY = "distribution:events"
+DROPPED_EVENTS_KEY = "distribution:events:dropped"
+# Hashes of filtered events by "<poll_id>:<event_type>": from bot user agents,
+# and over the per-IP rate
+BOT_EVENTS_KEY = "distribution:events:bots"
+RATE_LIMITED_EVENTS_KEY = "distribution:events:rate_limited"
+# Events per IP and poll in the current window
+IP_RATE_KEY = "distribution:ip:{poll_id}:{ip}"
+
+BUFFERED, DROPPED, BOT, RATE_LIMITED = 1, 0, 2, 3
+
+# Counts the event (field ARGV[3]) as a bot's if ARGV[4] is "1", or as rate
+# limited if the IP counter KEYS[4] exceeds ARGV[5] hits (0 disables) within
+# ARGV[6] seconds. Otherwise pushes ARGV[2] unless the buffer already holds
+# ARGV[1] events.
+ENQUEUE_SCRIPT = """
+if ARGV[4] == '1' then
+    redis.call('HINCRBY', KEYS[3], ARGV[3], 1)
+    return 2
+end
+local rate = tonumber(ARGV[5])
+if rate > 0 then
+    local hits = redis.call('INCR', KEYS[4])
+    if hits == 1 then
+        redis.call('EXPIRE', KEYS[4], ARGV[6])
+    end
+    if hits > rate then
+        redis.call('HINCRBY', KEYS[5], ARGV[3], 1)
+        return 3
+    end
+end
+if redis.call('LLEN', KEYS[1]) >= tonumber(ARGV[1]) then
+    redis.call('INCR', KEYS[2])
+    return 0
+end
+redis.call('RPUSH', KEYS[1], ARGV[2])
+return 1
+"""
+
+
+def enqueue_event(
+    poll_id: int,
+    event_type: str,
+    ip_address: str | None = None,
+    user_agent: str | None = None,
+    referrer: str | None = None,
+    metadata: dict | None = None,
+) -> bool:
+    """
+    Buffers a distribution event for the next drain.
+    Returns False if the event was dropped or filtered as bot traffic.
+    """
+    bot = is_bot(user_agent)
+    client = get_redis()
+    if client is None:
+        if bot:
+            return False
+        from .tasks import log_distribution_event_task
+
+        log_distribution_event_task.delay(
+            poll_id,
+            event_type,
+            ip_address=ip_address,
+            user_agent=user_agent,
+            referrer=referrer,
+            metadata=metadata,
+        )
+        return True
+
+    event = {
+        "poll_id": poll_id,
+        "event_type": event_type,
+        "timestamp": timezone.now().isoformat(),
+        "ip_address": ip_address,
+        "user_agent": user_agent or "",
+        "referrer": referrer or "",
+        "metadata": metadata or {},
+    }
+    try:
+        outcome = client.register_script(ENQUEUE_SCRIPT)(
+            keys=[
+                EVENT_BUFFER_KEY,
+                DROPPED_EVENTS_KEY,
+                BOT_EVENTS_KEY,
+                IP_RATE_KEY.format(poll_id=poll_id, ip=ip_address),
+                RATE_LIMITED_EVENTS_KEY,
+            ],
+            args=[
+                settings.DISTRIBUTION_EVENT_BUFFER_LIMIT,
+                json.dumps(event),
+                f"{poll_id}:{event_type}",
+                int(bot),
+                # Events without an address can't be told apart, so skip the rate check
+                settings.DISTRIBUTION_BOT_IP_RATE if ip_address else 0,
+                settings.DISTRIBUTION_BOT_IP_WINDOW,
+            ],
+        )
+    except redis.RedisError as e:
+        logger.warning(f"Failed to buffer distribution event for Poll {poll_id}: {e}")
+        return False
+    return bool(outcome == BUFFERED)
+
+
+def get_bot_event_count(poll_id: int) -> int | None:
+    """
+    Returns the number of bot events filtered out for a poll (None without Redis).
+    """
+    return _filtered_event_count(BOT_EVENTS_KEY, poll_id)
+
+
+def get_rate_limited_event_count(poll_id: int) -> int | None:
+    """
+    Returns the number of a poll's events filtered out by the per-IP rate check
+    (None without Redis).
+    """
+    return _filtered_event_count(RATE_LIMITED_EVENTS_KEY, poll_id)
+
+
+def _filtered_event_count(key: str, poll_id: int) -> int | None:
+    client = get_redis()
+    if client is None:
+        return None
+    fields = [f"{poll_id}:{event_type}" for event_type in DistributionEvent.values]
+    try:
+        counts = cast(list[bytes | None], client.hmget(key, fields))
+    except redis.RedisError as e:
+        logger.warning(f"Failed to read filtered events for Poll {poll_id}: {e}")
+        return None
+    return sum(int(count) for count in counts if count)
+
+
+def _build_rows(events: list[dict[str, Any]]) -> list[DistributionAnalytics]:
+    poll_ids = {event["poll_id"] for event in events}
+    existing = set(Poll.objects.filter(id__in=poll_ids).values_list("id", flat=True))
+    rows = [
+        DistributionAnalytics(
+            poll_id=event["poll_id"],
+            event_type=event["event_type"],
+            timestamp=parse_datetime(event["timestamp"]) or timezone.now(),
+            ip_address=event["ip_address"],
+            user_agent=event["user_agent"],
+            referrer=event["referrer"][:500],
+            metadata=event["metadata"],
+        )
+        for event in events
+        # Polls deleted since the event was buffered
+        if event["poll_id"] in existing
+    ]
+    enrich_events(rows)
+    return rows
+
+
+def record_unique_visitors(rows: list[DistributionAnalytics]) -> None:
+    """
+    Feeds the unique visitor sketches, leaving out known bots.
+    """
+    record_uniques(
+        VISITORS,
+        (
+            (row.poll_id, row.timestamp, visitor_id(None, row.ip_address, row.user_agent))
+            for row in rows
+            if row.device_type != "bot"
+        ),
+    )
+
+
+def drain_events(batch_size: int, max_batches: int) -> int:
+    """
+    Moves buffered events into the database, at most `max_batches` batches per call.
+    Returns the number of rows written.
+    """
+    client = get_redis()
+    if client is None:
+        return 0
+
+    written = 0
+    for _ in range(max_batches):
+        raw_events = cast(list[bytes], client.lrange(EVENT_BUFFER_KEY, 0, batch_size - 1))
+        if not raw_events:
+            break
+
+        events = []
+        for raw in raw_events:
+            try:
+                events.append(json.loads(raw))
+            except ValueError:
+                logger.warning(f"Discarding malformed distribution event: {raw!r}")
+
+        rows = _build_rows(events)
+        with transaction.atomic():
+            DistributionAnalytics.objects.bulk_create(rows, batch_size=batch_size)
+            record_rollups(rows)
+        # Acknowledged only once committed; new events are pushed at the tail
+        client.ltrim(EVENT_BUFFER_KEY, len(raw_events), -1)
+        record_unique_visitors(rows)
+        written += len(rows)
+
+        if len(raw_events) < batch_size:
+            break
+
+    if written:
+        logger.info(f"Drained {written} distribution events")
+    return written
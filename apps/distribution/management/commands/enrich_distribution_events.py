@@ -0,0 +1,47 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from apps.distribution.enrichment import enrich_events
+from apps.distribution.models import DistributionAnalytics
+
+ENRICHED_FIELDS = ["device_type", "browser", "os", "referrer_domain"]
+
+
+class Command(BaseCommand):
+    help = "Fills the device, browser, OS and referrer domain columns of distribution events"
+
+    def add_arguments(self, parser: Any) -> None:
+        parser.add_argument(
+            "--poll", type=str, help="Only enrich events of the poll with this slug"
+        )
+        parser.add_argument("--all", action="store_true", help="Re-enrich already enriched events")
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        events = DistributionAnalytics.objects.only(
+            "id", "user_agent", "referrer", *ENRICHED_FIELDS
+        )
+        if options["poll"]:
+            events = events.filter(poll__slug=options["poll"])
+        if not options["all"]:
+            events = events.filter(device_type="", referrer_domain="").exclude(
+                user_agent="", referrer=""
+            )
+
+        batch_size = options["batch_size"]
+        updated = 0
+        batch: list[DistributionAnalytics] = []
+        for event in events.order_by().iterator(chunk_size=batch_size):
+            batch.append(event)
+            if len(batch) >= batch_size:
+                updated += self._update(batch)
+                batch = []
+        if batch:
+            updated += self._update(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Enriched {updated} distribution events"))
+
+    def _update(self, batch: list[DistributionAnalytics]) -> int:
+        enrich_events(batch)
+        return DistributionAnalytics.objects.bulk_update(batch, ENRICHED_FIELDS)
@@ -0,0 +1,65 @@
+from typing import Any
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.distribution.qr import (
+    QR_DEFAULT_ERROR_CORRECTION,
+    QR_DEFAULT_SIZE,
+    QR_ERROR_CORRECTION_LEVELS,
+    QR_FORMATS,
+)
+from apps.distribution.services import DistributionService
+from apps.polls.models import Poll
+
+
+class Command(BaseCommand):
+    help = "Exports QR codes for many polls into a ZIP archive"
+
+    def add_arguments(self, parser: Any) -> None:
+        parser.add_argument("output", type=str, help="Path of the ZIP archive to write")
+        parser.add_argument("--slug", action="append", default=[], help="Poll slug (repeatable)")
+        parser.add_argument("--creator", type=str, help="Export every poll of this user (email)")
+        parser.add_argument(
+            "--format",
+            action="append",
+            choices=QR_FORMATS,
+            dest="formats",
+            help="Image format (repeatable, default: png)",
+        )
+        parser.add_argument("--size", type=int, default=QR_DEFAULT_SIZE, help="Module size")
+        parser.add_argument(
+            "--ec",
+            choices=list(QR_ERROR_CORRECTION_LEVELS),
+            default=QR_DEFAULT_ERROR_CORRECTION,
+            help="Error correction level",
+        )
+        parser.add_argument("--workers", type=int, help="Render processes")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if not options["slug"] and not options["creator"]:
+            raise CommandError("Pass --slug and/or --creator.")
+
+        polls = Poll.objects.only("id", "slug").order_by("slug")
+        if options["creator"]:
+            creator = get_user_model().objects.filter(email=options["creator"]).first()
+            if creator is None:
+                raise CommandError(f"No user with email {options['creator']}.")
+            polls = polls.filter(created_by=creator)
+        if options["slug"]:
+            polls = polls.filter(slug__in=options["slug"])
+
+        chunks = DistributionService.export_qr_codes(
+            polls.iterator(),
+            img_formats=options["formats"] or ["png"],
+            size=options["size"],
+            error_correction=options["ec"],
+            max_workers=options["workers"],
+        )
+        with open(options["output"], "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Exported {polls.count()} polls to {options['output']}")
+        )
@@ -0,0 +1,48 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from apps.distribution.qr import (
+    QR_DEFAULT_ERROR_CORRECTION,
+    QR_DEFAULT_SIZE,
+    QR_ERROR_CORRECTION_LEVELS,
+    QR_FORMATS,
+)
+from apps.distribution.services import DistributionService
+from apps.polls.models import Poll
+
+
+class Command(BaseCommand):
+    help = "Renders and stores QR code assets for active polls"
+
+    def add_arguments(self, parser: Any) -> None:
+        parser.add_argument("--poll", type=str, help="Only render the poll with this slug")
+        parser.add_argument("--size", type=int, default=QR_DEFAULT_SIZE, help="Module size")
+        parser.add_argument(
+            "--ec",
+            choices=list(QR_ERROR_CORRECTION_LEVELS),
+            default=QR_DEFAULT_ERROR_CORRECTION,
+            help="Error correction level",
+        )
+        parser.add_argument(
+            "--force", action="store_true", help="Re-render assets that already exist"
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        polls = Poll.objects.filter(is_active=True)
+        if options["poll"]:
+            polls = polls.filter(slug=options["poll"])
+
+        count = 0
+        for poll in polls.iterator():
+            for img_format in QR_FORMATS:
+                DistributionService.get_qr_code_asset(
+                    poll,
+                    img_format,
+                    size=options["size"],
+                    error_correction=options["ec"],
+                    force=options["force"],
+                )
+            count += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Generated QR codes for {count} polls"))
@@ -0,0 +1,57 @@
+from datetime import UTC
+from typing import Any
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDay, TruncHour
+
+from apps.core.partitioning import retained_since
+from apps.distribution.models import DistributionAnalytics, DistributionRollup, RollupGranularity
+
+
+class Command(BaseCommand):
+    help = "Rebuilds distribution rollups from the raw distribution events"
+
+    def add_arguments(self, parser: Any) -> None:
+        parser.add_argument("--poll", type=str, help="Only rebuild the poll with this slug")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        events = DistributionAnalytics.objects.all()
+        rollups = DistributionRollup.objects.all()
+        if options["poll"]:
+            events = events.filter(poll__slug=options["poll"])
+            rollups = rollups.filter(poll__slug=options["poll"])
+        # Older raw events may have been dropped: their rollups are all that is left
+        since = retained_since(DistributionAnalytics._meta.db_table)
+        if since is not None:
+            events = events.filter(timestamp__gte=since)
+            rollups = rollups.filter(bucket__gte=since)
+            self.stdout.write(f"Keeping rollups before {since:%Y-%m-%d}, older events are dropped")
+
+        truncations = {
+            RollupGranularity.HOUR: TruncHour("timestamp", tzinfo=UTC),
+            RollupGranularity.DAY: TruncDay("timestamp", tzinfo=UTC),
+        }
+
+        with transaction.atomic():
+            rollups.delete()
+            created = 0
+            for granularity, truncation in truncations.items():
+                rows = (
+                    events.annotate(bucket=truncation)
+                    .values("poll_id", "event_type", "bucket")
+                    .annotate(count=Count("id"))
+                    .order_by()
+                )
+                created += len(
+                    DistributionRollup.objects.bulk_create(
+                        (
+                            DistributionRollup(granularity=granularity, **row)
+                            for row in rows.iterator()
+                        ),
+                        batch_size=1000,
+                    )
+                )
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {created} distribution rollups"))
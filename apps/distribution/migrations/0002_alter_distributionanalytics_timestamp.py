@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('distribution', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='distributionanalytics',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('distribution', '0002_alter_distributionanalytics_timestamp'),
+        ('polls', '0010_enforce_slug_constraints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DistributionRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('LINK_OPEN', 'Link Open'), ('QR_SCAN', 'QR Scan'), ('EMBED_LOAD', 'Embed Load'), ('SOCIAL_SHARE', 'Social Share Click')], max_length=20)),
+                ('granularity', models.CharField(choices=[('HOUR', 'Hour'), ('DAY', 'Day')], max_length=4)),
+                ('bucket', models.DateTimeField()),
+                ('count', models.PositiveBigIntegerField(default=0)),
+                ('poll', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='distribution_rollups', to='polls.poll')),
+            ],
+            options={
+                'verbose_name': 'Distribution Rollup',
+                'verbose_name_plural': 'Distribution Rollups',
+                'constraints': [models.UniqueConstraint(fields=('poll', 'granularity', 'bucket', 'event_type'), name='unique_distribution_rollup')],
+            },
+        ),
+    ]
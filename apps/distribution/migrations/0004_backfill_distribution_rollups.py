@@ -0,0 +1,34 @@
+from datetime import UTC
+from typing import Any
+
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import TruncDay, TruncHour
+
+
+def backfill_rollups(apps: Any, schema_editor: Any) -> None:
+    DistributionAnalytics = apps.get_model("distribution", "DistributionAnalytics")
+    DistributionRollup = apps.get_model("distribution", "DistributionRollup")
+    truncations = {"HOUR": TruncHour("timestamp", tzinfo=UTC), "DAY": TruncDay("timestamp", tzinfo=UTC)}
+    for granularity, truncation in truncations.items():
+        rows = (
+            DistributionAnalytics.objects.annotate(bucket=truncation)
+            .values("poll_id", "event_type", "bucket")
+            .annotate(count=Count("id"))
+            .order_by()
+        )
+        DistributionRollup.objects.bulk_create(
+            (DistributionRollup(granularity=granularity, **row) for row in rows.iterator()),
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("distribution", "0003_distributionrollup"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('distribution', '0004_backfill_distribution_rollups'),
+        ('polls', '0010_enforce_slug_constraints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='distributionanalytics',
+            name='browser',
+            field=models.CharField(blank=True, max_length=32),
+        ),
+        migrations.AddField(
+            model_name='distributionanalytics',
+            name='device_type',
+            field=models.CharField(blank=True, max_length=10),
+        ),
+        migrations.AddField(
+            model_name='distributionanalytics',
+            name='os',
+            field=models.CharField(blank=True, max_length=32),
+        ),
+        migrations.AddField(
+            model_name='distributionanalytics',
+            name='referrer_domain',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='distributionanalytics',
+            index=models.Index(fields=['poll', 'device_type'], name='distributio_poll_id_ef2ca6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='distributionanalytics',
+            index=models.Index(fields=['poll', 'referrer_domain'], name='distributio_poll_id_21be91_idx'),
+        ),
+    ]
@@ -0,0 +1,115 @@
+"""
+Converts distribution_distributionanalytics into monthly range partitions on PostgreSQL, keeping its
+rows, indexes, foreign keys and id sequence (a no-op elsewhere). Partitions are
+maintained afterwards by apps/core/partitioning.py.
+
+The DDL is frozen here rather than imported from that module, so later changes
+to it never change what this migration does.
+"""
+
+from datetime import UTC, date, datetime
+from typing import Any
+
+from django.db import migrations
+
+TABLE = "distribution_distributionanalytics"
+COLUMN = "timestamp"
+MONTHS_AHEAD = 3
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_start(month: date) -> datetime:
+    return datetime(month.year, month.month, 1, tzinfo=UTC)
+
+
+def partition(apps: Any, schema_editor: Any) -> None:
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+    qn = connection.ops.quote_name
+    staging = f"{TABLE}_partitioned"
+    default = f"{TABLE}_default"
+    sequence = f"{TABLE}_id_seq"
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)", [TABLE]
+        )
+        if cursor.fetchone() is not None:
+            return
+        cursor.execute(f"LOCK TABLE {qn(TABLE)} IN ACCESS EXCLUSIVE MODE")
+        # Secondary indexes and foreign keys, recreated on the new table by name
+        cursor.execute(
+            "SELECT pg_get_indexdef(i.indexrelid) FROM pg_index i "
+            "WHERE i.indrelid = to_regclass(%s) AND NOT i.indisprimary AND NOT i.indisunique",
+            [TABLE],
+        )
+        index_definitions = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+            [TABLE],
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute(f"SELECT min({qn(COLUMN)}), max(id) FROM {qn(TABLE)}")  # noqa: S608
+        oldest, max_id = cursor.fetchone()
+
+        cursor.execute(
+            f"CREATE TABLE {qn(staging)} "
+            f"(LIKE {qn(TABLE)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            f"PARTITION BY RANGE ({qn(COLUMN)})"
+        )
+        cursor.execute(f"CREATE TABLE {qn(default)} PARTITION OF {qn(staging)} DEFAULT")
+
+        # One partition per month from the oldest row to MONTHS_AHEAD from now
+        current = datetime.now(UTC).date().replace(day=1)
+        month = oldest.astimezone(UTC).date().replace(day=1) if oldest else current
+        while month <= add_months(current, MONTHS_AHEAD):
+            name = f"{TABLE}_p{month:%Y%m}"
+            cursor.execute(
+                f"CREATE TABLE {qn(name)} "
+                f"(LIKE {qn(staging)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+            )
+            cursor.execute(
+                f"ALTER TABLE {qn(staging)} ATTACH PARTITION {qn(name)} "
+                "FOR VALUES FROM (%s) TO (%s)",
+                [month_start(month), month_start(add_months(month, 1))],
+            )
+            month = add_months(month, 1)
+
+        cursor.execute(f"INSERT INTO {qn(staging)} SELECT * FROM {qn(TABLE)}")  # noqa: S608
+        cursor.execute(f"DROP TABLE {qn(TABLE)}")
+        cursor.execute(f"ALTER TABLE {qn(staging)} RENAME TO {qn(TABLE)}")
+        # Identity columns can't be carried over to a partitioned table, a sequence can
+        cursor.execute(f"CREATE SEQUENCE {qn(sequence)} OWNED BY {qn(TABLE)}.id")
+        cursor.execute(
+            f"ALTER TABLE {qn(TABLE)} ALTER COLUMN id SET DEFAULT nextval(%s::regclass)",
+            [sequence],
+        )
+        cursor.execute("SELECT setval(%s, %s, false)", [sequence, (max_id or 0) + 1])
+        cursor.execute(
+            f"ALTER TABLE {qn(TABLE)} ADD CONSTRAINT {qn(f'{TABLE}_pkey')} "
+            f"PRIMARY KEY (id, {qn(COLUMN)})"
+        )
+        for definition in index_definitions:
+            cursor.execute(definition)
+        for constraint, definition in foreign_keys:
+            cursor.execute(
+                f"ALTER TABLE {qn(TABLE)} ADD CONSTRAINT {qn(constraint)} {definition}"
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("distribution", "0005_distributionanalytics_browser_and_more"),
+    ]
+
+    operations = [
+        # Not reversed (Django is indifferent to partitioning)
+        migrations.RunPython(partition, reverse_code=migrations.RunPython.noop),
+    ]
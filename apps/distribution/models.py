@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 
@@ -18,7 +19,8 @@ class DistributionAnalytics(models.Model):
         "polls.Poll", on_delete=models.CASCADE, related_name="distribution_analytics"
     )
     event_type = models.CharField(max_length=20, choices=DistributionEvent.choices, db_index=True)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the event happens, not when the buffered row is written
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
 
     # Metadata for deep analysis
     ip_address = models.GenericIPAddressField(null=True, blank=True)
@@ -28,10 +30,53 @@ class DistributionAnalytics(models.Model):
     # JSONB for flexible device/browser/location data
     metadata = models.JSONField(default=dict, blank=True)
 
+    # Derived from user_agent and referrer on ingestion (see enrichment.py)
+    device_type = models.CharField(max_length=10, blank=True)
+    browser = models.CharField(max_length=32, blank=True)
+    os = models.CharField(max_length=32, blank=True)
+    referrer_domain = models.CharField(max_length=255, blank=True)
+
     class Meta:
         verbose_name = _("Distribution Analytics")
         verbose_name_plural = _("Distribution Analytics")
         ordering = ["-timestamp"]
+        indexes = [
+            models.Index(fields=["poll", "device_type"]),
+            models.Index(fields=["poll", "referrer_domain"]),
+        ]
 
     def __str__(self) -> str:
         return f"{self.poll.title} - {self.event_type} at {self.timestamp}"
+
+
+class RollupGranularity(models.TextChoices):
+    HOUR = "HOUR", _("Hour")
+    DAY = "DAY", _("Day")
+
+
+class DistributionRollup(models.Model):
+    """
+    Pre-aggregated distribution event counts per poll, event type and time bucket.
+    """
+
+    poll = models.ForeignKey(
+        "polls.Poll", on_delete=models.CASCADE, related_name="distribution_rollups"
+    )
+    event_type = models.CharField(max_length=20, choices=DistributionEvent.choices)
+    granularity = models.CharField(max_length=4, choices=RollupGranularity.choices)
+    # Start of the bucket (UTC)
+    bucket = models.DateTimeField()
+    count = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = _("Distribution Rollup")
+        verbose_name_plural = _("Distribution Rollups")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["poll", "granularity", "bucket", "event_type"],
+                name="unique_distribution_rollup",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.poll_id} - {self.event_type} {self.granularity} {self.bucket}: {self.count}"
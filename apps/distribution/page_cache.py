@@ -0,0 +1,84 @@
+"""
+Cached public renderings of polls: the HTML page and the embed widget's JSON.
+
+The page only depends on the poll and on whether it is currently open, so it is
+rendered once per poll version and state and stored gzipped in the shared cache
+(`public_page:<slug>:<version>:<open|closed>:<beacon|direct>`). Poll changes
+bump the version (see apps/polls/cache.py) and open/close transitions change
+the state, so stale pages are never looked up again and simply expire.
+
+Clients that accept gzip get the stored bytes as they are; the rare others
+get them decompressed.
+
+The embed document includes live tallies, which don't bump the version, so it
+is cached per version for DISTRIBUTION_EMBED_CACHE_SECONDS only.
+"""
+
+import gzip
+from collections.abc import Callable
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+
+from apps.polls.cache import poll_version_key
+from apps.polls.models import Poll
+
+from .caching import edge_caching_enabled
+
+PUBLIC_PAGE_KEY = "public_page:{slug}:{version}:{state}:{logging}"
+EMBED_DATA_KEY = "embed_data:{slug}:{version}:{state}"
+
+
+def public_page_key(poll: Poll) -> str:
+    return PUBLIC_PAGE_KEY.format(
+        slug=poll.slug,
+        version=cache.get(poll_version_key(poll.slug), 0),
+        state="open" if poll.is_open else "closed",
+        # The page embeds the beacon script only while edge caching is on
+        logging="beacon" if edge_caching_enabled() else "direct",
+    )
+
+
+def embed_data_key(poll: Poll) -> str:
+    return EMBED_DATA_KEY.format(
+        slug=poll.slug,
+        version=cache.get(poll_version_key(poll.slug), 0),
+        state="open" if poll.is_open else "closed",
+    )
+
+
+def get_public_page(poll: Poll, render: Callable[[], str]) -> bytes:
+    """
+    Returns the gzipped page of a poll, calling `render` on a cache miss.
+    """
+    key = public_page_key(poll)
+    page: bytes | None = cache.get(key)
+    if page is None:
+        page = gzip.compress(render().encode(), compresslevel=9)
+        cache.set(key, page, timeout=settings.PUBLIC_POLL_PAGE_CACHE_SECONDS)
+    return page
+
+
+def page_response(request: HttpRequest, page: bytes) -> HttpResponse:
+    """
+    Serves a gzipped page, decompressing it for clients that don't accept gzip.
+    """
+    if "gzip" not in request.headers.get("Accept-Encoding", ""):
+        return HttpResponse(gzip.decompress(page), content_type="text/html; charset=utf-8")
+    response = HttpResponse(page, content_type="text/html; charset=utf-8")
+    response["Content-Encoding"] = "gzip"
+    return response
+
+
+def get_embed_data(poll: Poll, build: Callable[[], dict[str, Any]]) -> dict[str, Any]:
+    """
+    Returns the embed document of a poll, calling `build` on a cache miss.
+    """
+    key = embed_data_key(poll)
+    data: dict[str, Any] | None = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, timeout=settings.DISTRIBUTION_EMBED_CACHE_SECONDS)
+    return data
@@ -0,0 +1,82 @@
+"""
+QR code rendering.
+
+This module deliberately does not import Django: bulk exports render codes in
+worker processes started with the "spawn" method, which import it without
+setting up the project.
+"""
+
+import io
+import multiprocessing
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import qrcode
+import qrcode.image.svg
+
+QR_FORMATS = ("png", "svg")
+QR_BORDER = 4
+QR_DEFAULT_SIZE = 10
+QR_MAX_SIZE = 40
+QR_DEFAULT_ERROR_CORRECTION = "M"
+QR_ERROR_CORRECTION_LEVELS = {
+    "L": qrcode.constants.ERROR_CORRECT_L,
+    "M": qrcode.constants.ERROR_CORRECT_M,
+    "Q": qrcode.constants.ERROR_CORRECT_Q,
+    "H": qrcode.constants.ERROR_CORRECT_H,
+}
+
+# (url, img_format, size, error_correction)
+QRJob = tuple[str, str, int, str]
+
+
+def render_qr_image(
+    url: str,
+    img_format: str = "png",
+    size: int = QR_DEFAULT_SIZE,
+    error_correction: str = QR_DEFAULT_ERROR_CORRECTION,
+) -> bytes:
+    """
+    Renders a QR code encoding `url`.
+    `size` is the pixel size of each module, `error_correction` one of L, M, Q, H.
+    """
+    qr = qrcode.QRCode(
+        error_correction=QR_ERROR_CORRECTION_LEVELS[error_correction],
+        box_size=size,
+        border=QR_BORDER,
+    )
+    qr.add_data(url)
+    factory = qrcode.image.svg.SvgImage if img_format == "svg" else None
+    img = qr.make_image(image_factory=factory)
+    stream = io.BytesIO()
+    img.save(stream)
+    return stream.getvalue()
+
+
+def _render_job(job: QRJob) -> bytes:
+    return render_qr_image(*job)
+
+
+def render_qr_images(jobs: Iterable[QRJob], max_workers: int) -> Iterator[bytes]:
+    """
+    Renders jobs across a process pool, yielding images in job order.
+
+    At most 2 x max_workers renders are in flight, so memory stays bounded
+    however many jobs there are and however slowly the results are consumed.
+    With max_workers <= 1 everything is rendered in this process.
+    """
+    if max_workers <= 1:
+        for job in jobs:
+            yield _render_job(job)
+        return
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as pool:
+        pending: deque[Future[bytes]] = deque()
+        for job in jobs:
+            pending.append(pool.submit(_render_job, job))
+            if len(pending) >= 2 * max_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
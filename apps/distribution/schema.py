@@ -5,10 +5,19 @@ import strawberry_django
 from strawberry import auto
 from strawberry.types import Info
 
+from apps.analytics.uniques import VISITORS, count_uniques
+from apps.core.graphql_cache import CachedResult
 from apps.distribution import models
+from apps.distribution.ingest import get_bot_event_count, get_rate_limited_event_count
+from apps.distribution.rollups import get_distribution_summary
 from apps.distribution.services import DistributionService
+from apps.polls.cache import get_public_poll, poll_version_keys
 from apps.polls.schema import PollType
 
+# Public, anonymous fields are served from the response cache.
+# Vote counts nested in a cached publicPoll may lag by up to the TTL.
+PUBLIC_CACHE_TTL = 60
+
 
 @strawberry_django.type(models.DistributionAnalytics)
 class DistributionAnalyticsType:
@@ -32,21 +41,19 @@ class PollDistributionSummary:
     total_link_opens: int
     total_qr_scans: int
     total_embed_loads: int
+    unique_visitors: int | None
+    bot_events: int | None
+    rate_limited_events: int | None
     recent_events: list[DistributionAnalyticsType]
 
 
 @strawberry.type
 class Query:
-    @strawberry.field
+    @strawberry.field(extensions=[CachedResult(ttl=PUBLIC_CACHE_TTL, versions=poll_version_keys)])
     def public_poll(self, slug: str) -> PollType | None:
-        from apps.polls.models import Poll
-
-        try:
-            return cast(PollType, Poll.objects.get(slug=slug, is_active=True))
-        except Poll.DoesNotExist:
-            return None
+        return cast(PollType | None, get_public_poll(slug))
 
-    @strawberry.field
+    @strawberry.field(extensions=[CachedResult(ttl=PUBLIC_CACHE_TTL, versions=poll_version_keys)])
     def poll_distribution_info(self, slug: str) -> DistributionInfo | None:
         from apps.polls.models import Poll
 
@@ -64,7 +71,6 @@ class Query:
     def poll_distribution_analytics(
         self, info: Info, slug: str, limit: int = 50
     ) -> PollDistributionSummary | None:
-        from apps.distribution.models import DistributionEvent
         from apps.polls.models import Poll
 
         user = info.context.request.user
@@ -76,9 +82,10 @@ class Query:
             analytics = models.DistributionAnalytics.objects.filter(poll=poll)
 
             return PollDistributionSummary(
-                total_link_opens=analytics.filter(event_type=DistributionEvent.LINK_OPEN).count(),
-                total_qr_scans=analytics.filter(event_type=DistributionEvent.QR_SCAN).count(),
-                total_embed_loads=analytics.filter(event_type=DistributionEvent.EMBED_LOAD).count(),
+                **get_distribution_summary(poll),
+                unique_visitors=count_uniques(VISITORS, [poll.id], poll.created_at),
+                bot_events=get_bot_event_count(poll.id),
+                rate_limited_events=get_rate_limited_event_count(poll.id),
                 recent_events=cast(
                     list[DistributionAnalyticsType],
                     list(analytics.order_by("-timestamp")[:limit]),
@@ -1,6 +1,13 @@
 from rest_framework import serializers
 
 from apps.distribution.models import DistributionAnalytics
+from apps.distribution.qr import (
+    QR_DEFAULT_ERROR_CORRECTION,
+    QR_DEFAULT_SIZE,
+    QR_ERROR_CORRECTION_LEVELS,
+    QR_FORMATS,
+    QR_MAX_SIZE,
+)
 from apps.polls.models import Poll
 
 
@@ -23,6 +30,28 @@ class PollDistributionInfoSerializer(serializers.Serializer):
     embed_code = serializers.CharField()
 
 
+class QRCodeParamsSerializer(serializers.Serializer):
+    format = serializers.ChoiceField(choices=QR_FORMATS, default="png")
+    size = serializers.IntegerField(min_value=1, max_value=QR_MAX_SIZE, default=QR_DEFAULT_SIZE)
+    ec = serializers.ChoiceField(
+        choices=list(QR_ERROR_CORRECTION_LEVELS), default=QR_DEFAULT_ERROR_CORRECTION
+    )
+
+
+class QRCodeExportSerializer(serializers.Serializer):
+    slugs = serializers.ListField(
+        child=serializers.SlugField(),
+        required=False,
+        allow_empty=False,
+        help_text="Polls to export. Defaults to all of your polls.",
+    )
+    formats = serializers.MultipleChoiceField(choices=QR_FORMATS, default={"png"})
+    size = serializers.IntegerField(min_value=1, max_value=QR_MAX_SIZE, default=QR_DEFAULT_SIZE)
+    ec = serializers.ChoiceField(
+        choices=list(QR_ERROR_CORRECTION_LEVELS), default=QR_DEFAULT_ERROR_CORRECTION
+    )
+
+
 class PublicPollSerializer(serializers.ModelSerializer):
     is_open = serializers.BooleanField(read_only=True)
 
@@ -35,6 +64,9 @@ class DistributionSummarySerializer(serializers.Serializer):
     total_link_opens = serializers.IntegerField()
     total_qr_scans = serializers.IntegerField()
     total_embed_loads = serializers.IntegerField()
+    unique_visitors = serializers.IntegerField(allow_null=True)
+    bot_events = serializers.IntegerField(allow_null=True)
+    rate_limited_events = serializers.IntegerField(allow_null=True)
 
 
 class PollDistributionAnalyticsResponseSerializer(serializers.Serializer):
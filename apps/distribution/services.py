@@ -1,12 +1,95 @@
-import io
-from typing import cast
+import hashlib
+import zipfile
+from collections import deque
+from collections.abc import Iterable, Iterator
+from typing import Any, cast
 
-import qrcode
-import qrcode.image.svg
 from django.conf import settings
 from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.urls import reverse
 
-from apps.polls.models import Poll
+from apps.distribution.qr import (
+    QR_BORDER,
+    QR_DEFAULT_ERROR_CORRECTION,
+    QR_DEFAULT_SIZE,
+    QR_FORMATS,
+    QRJob,
+    render_qr_image,
+    render_qr_images,
+)
+from apps.polls.models import Poll, Question
+from apps.polls.realtime import get_results_snapshot
+
+QR_STORAGE_DIR = "qr"
+# Asset names are one-way hashes, so the parameters each was rendered from are
+# kept in the shared cache. Any web process can then re-render an asset that is
+# missing from its storage (see `restore_qr_code_asset`).
+QR_ASSET_KEY = "qr_asset:{name}"
+# Embed snippets pin a major version of the widget script, which is served
+# immutable: breaking changes ship as a new version file next to the old one.
+EMBED_SCRIPT_VERSION = "v1"
+
+# Exports in progress hold one of QR_EXPORT_MAX_CONCURRENT slots in the shared
+# cache, so concurrent requests across all web processes never start more
+# than that many render pools. Slots expire in case a holder dies.
+QR_EXPORT_SLOT_KEY = "qr_export_slot:{index}"
+QR_EXPORT_SLOT_TIMEOUT = 15 * 60
+
+
+def acquire_export_slot() -> str | None:
+    """
+    Takes a free export slot, returning its key, or None if all are taken.
+    """
+    for index in range(settings.QR_EXPORT_MAX_CONCURRENT):
+        key = QR_EXPORT_SLOT_KEY.format(index=index)
+        if cache.add(key, 1, timeout=QR_EXPORT_SLOT_TIMEOUT):
+            return key
+    return None
+
+
+def release_export_slot(key: str) -> None:
+    cache.delete(key)
+
+
+def _store_asset(path: str, content: bytes) -> None:
+    """
+    Stores `content` at exactly `path`. Storages that would pick another name
+    for an existing file (such as FileSystemStorage) write a suffixed copy when
+    another process stored the same asset concurrently; content addressing
+    makes both files identical, so the copy is removed.
+    """
+    name = default_storage.save(path, ContentFile(content))
+    if name != path:
+        default_storage.delete(name)
+
+
+class _ZipStream:
+    """
+    Write-only file object collecting what ZipFile writes, so it can be streamed.
+    Not seekable: ZipFile then writes sizes after each entry instead of seeking back.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
 
 
 class DistributionService:
@@ -19,41 +102,188 @@ class DistributionService:
         return f"{base_url}/polls/{poll.slug}/"
 
     @classmethod
-    def generate_qr_code(cls, poll: Poll, img_format: str = "png") -> str | bytes:
+    def render_qr_code(
+        cls,
+        poll: Poll,
+        img_format: str = "png",
+        size: int = QR_DEFAULT_SIZE,
+        error_correction: str = QR_DEFAULT_ERROR_CORRECTION,
+    ) -> bytes:
+        """
+        Renders a QR code for the poll's public URL.
+        `size` is the pixel size of each module, `error_correction` one of L, M, Q, H.
+        """
+        return render_qr_image(cls.get_public_url(poll), img_format, size, error_correction)
+
+    @classmethod
+    def get_qr_code_path(
+        cls,
+        poll: Poll,
+        img_format: str = "png",
+        size: int = QR_DEFAULT_SIZE,
+        error_correction: str = QR_DEFAULT_ERROR_CORRECTION,
+    ) -> str:
+        """
+        Returns the storage path of a QR code.
+        The name hashes everything the image depends on, so a stored file never changes.
+        """
+        fingerprint = (
+            f"{cls.get_public_url(poll)}|{img_format}|{size}|{error_correction}|{QR_BORDER}"
+        )
+        digest = hashlib.sha256(fingerprint.encode()).hexdigest()
+        return f"{QR_STORAGE_DIR}/{digest}.{img_format}"
+
+    @classmethod
+    def get_qr_code_asset(
+        cls,
+        poll: Poll,
+        img_format: str = "png",
+        size: int = QR_DEFAULT_SIZE,
+        error_correction: str = QR_DEFAULT_ERROR_CORRECTION,
+        force: bool = False,
+    ) -> str:
+        """
+        Returns the storage path of a QR code, rendering and storing it if missing.
+        """
+        path = cls.get_qr_code_path(poll, img_format, size, error_correction)
+        name = path.rsplit("/", 1)[-1]
+        cache.add(
+            QR_ASSET_KEY.format(name=name),
+            (poll.id, img_format, size, error_correction),
+            timeout=None,
+        )
+        if force or not default_storage.exists(path):
+            content = cls.render_qr_code(poll, img_format, size, error_correction)
+            if force:
+                default_storage.delete(path)
+            _store_asset(path, content)
+        return path
+
+    @classmethod
+    def restore_qr_code_asset(cls, name: str) -> str | None:
         """
-        Generates a QR code for the poll's public URL.
-        Caches the result in Redis to avoid redundant generation.
+        Re-renders a QR code missing from storage by its asset name, returning
+        its path. None if the name was never handed out or no longer matches
+        its poll (deleted, or a different public URL).
+        """
+        params = cache.get(QR_ASSET_KEY.format(name=name))
+        if params is None:
+            return None
+        poll_id, img_format, size, error_correction = params
+        poll = Poll.objects.filter(id=poll_id).first()
+        if poll is None:
+            return None
+        path = cls.get_qr_code_path(poll, img_format, size, error_correction)
+        if path != f"{QR_STORAGE_DIR}/{name}":
+            return None
+        return cls.get_qr_code_asset(poll, img_format, size, error_correction)
+
+    @classmethod
+    def generate_qr_code(
+        cls,
+        poll: Poll,
+        img_format: str = "png",
+        size: int = QR_DEFAULT_SIZE,
+        error_correction: str = QR_DEFAULT_ERROR_CORRECTION,
+    ) -> str | bytes:
         """
-        cache_key = f"poll_qr_{poll.slug}_{img_format}"
-        cached_qr = cache.get(cache_key)
-        if cached_qr:
-            return cast(str | bytes, cached_qr)
+        Returns a QR code for the poll's public URL from the asset storage.
+        Assets are normally pre-rendered when the poll is created.
+        """
+        path = cls.get_qr_code_asset(poll, img_format, size, error_correction)
+        with default_storage.open(path, "rb") as f:
+            content = cast(bytes, f.read())
+        return content.decode() if img_format == "svg" else content
+
+    @classmethod
+    def export_qr_codes(
+        cls,
+        polls: Iterable[Poll],
+        img_formats: Iterable[str] = QR_FORMATS,
+        size: int = QR_DEFAULT_SIZE,
+        error_correction: str = QR_DEFAULT_ERROR_CORRECTION,
+        max_workers: int | None = None,
+    ) -> Iterator[bytes]:
+        """
+        Streams a ZIP archive of QR codes for many polls, one `<slug>.<format>` per code.
+        Codes are rendered across a process pool; only a few images are held at once.
+        """
+        img_formats = list(img_formats)
+        if max_workers is None:
+            max_workers = settings.QR_EXPORT_WORKERS
+
+        # Archive names of submitted jobs, in the order their images come back
+        names: deque[str] = deque()
 
-        url = cls.get_public_url(poll)
+        def jobs() -> Iterator[QRJob]:
+            for poll in polls:
+                url = cls.get_public_url(poll)
+                for img_format in img_formats:
+                    names.append(f"{poll.slug}.{img_format}")
+                    yield url, img_format, size, error_correction
 
-        if img_format == "svg":
-            factory = qrcode.image.svg.SvgImage
-            img = qrcode.make(url, image_factory=factory)
-            stream = io.BytesIO()
-            img.save(stream)
-            qr_content_str = stream.getvalue().decode()
-            cache.set(cache_key, qr_content_str, 86400)
-            return qr_content_str
-        else:
-            png_img = qrcode.make(url)
-            stream = io.BytesIO()
-            png_img.save(stream)
-            qr_content_bytes = stream.getvalue()
-            cache.set(cache_key, qr_content_bytes, 86400)
-            return qr_content_bytes
+        stream = _ZipStream()
+        with zipfile.ZipFile(cast(Any, stream), "w") as archive:
+            for image in render_qr_images(jobs(), max_workers):
+                # Images are already compressed (PNG) or tiny (SVG)
+                archive.writestr(names.popleft(), image, compress_type=zipfile.ZIP_STORED)
+                yield stream.drain()
+        yield stream.drain()
+
+    @staticmethod
+    def get_embed_script_url() -> str:
+        base_url = getattr(settings, "BASE_URL", "http://localhost:8000").rstrip("/")
+        path = reverse("distribution:embed-script", kwargs={"version": EMBED_SCRIPT_VERSION})
+        return f"{base_url}{path}"
+
+    @staticmethod
+    def get_beacon_url(poll: Poll) -> str:
+        """
+        Absolute, since the widget posts to it from third-party pages.
+        """
+        base_url = getattr(settings, "BASE_URL", "http://localhost:8000").rstrip("/")
+        return f"{base_url}{reverse('distribution:poll-beacon', args=[poll.slug])}"
 
     @classmethod
     def get_embed_code(cls, poll: Poll) -> str:
         """
-        Returns the iframe embed snippet for a poll.
+        Returns the embed snippet for a poll: the static widget script, which
+        renders the poll from its embed JSON, with an iframe fallback.
         """
         public_url = cls.get_public_url(poll)
         return (
-            f'<iframe src="{public_url}" width="100%" height="600" '
-            'frameborder="0" allowfullscreen></iframe>'
+            f'<div data-poll-embed="{poll.slug}"></div>'
+            f'<script src="{cls.get_embed_script_url()}" async></script>'
+            f'<noscript><iframe src="{public_url}" width="100%" height="600" '
+            'frameborder="0" allowfullscreen></iframe></noscript>'
         )
+
+    @classmethod
+    def get_embed_data(cls, poll: Poll) -> dict[str, Any]:
+        """
+        Returns the compact structure and results document rendered by the widget.
+        """
+        tallies = get_results_snapshot(poll.id)
+        questions = Question.objects.filter(poll=poll).prefetch_related("options")
+        return {
+            "slug": poll.slug,
+            "title": poll.title,
+            "url": cls.get_public_url(poll),
+            "open": poll.is_open,
+            "questions": [
+                {
+                    "id": question.id,
+                    "text": question.text,
+                    "type": question.question_type,
+                    "options": [
+                        {
+                            "id": option.id,
+                            "text": option.text,
+                            "votes": tallies.get(question.id, {}).get(option.id, 0),
+                        }
+                        for option in question.options.all()
+                    ],
+                }
+                for question in questions
+            ],
+        }
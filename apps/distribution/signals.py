@@ -0,0 +1,41 @@
+from typing import Any
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.polls.models import Poll
+
+from .models import DistributionAnalytics
+from .rollups import record_rollups
+from .tasks import generate_qr_codes_task, purge_poll_cache_task
+
+
+@receiver(post_save, sender=Poll)
+@receiver(post_delete, sender=Poll)
+def purge_public_poll(sender: type[Poll], instance: Poll, **kwargs: Any) -> None:
+    """
+    Evicts the poll's public responses from the CDN once the change is committed.
+    """
+    slug = instance.slug
+    transaction.on_commit(lambda: purge_poll_cache_task.delay(slug))
+
+
+@receiver(post_save, sender=Poll)
+def pre_render_qr_codes(sender: type[Poll], instance: Poll, created: bool, **kwargs: Any) -> None:
+    if created and settings.QR_PRERENDER:
+        poll_id = instance.id
+        transaction.on_commit(lambda: generate_qr_codes_task.delay(poll_id))
+
+
+@receiver(post_save, sender=DistributionAnalytics)
+def roll_up_event(
+    sender: type[DistributionAnalytics],
+    instance: DistributionAnalytics,
+    created: bool,
+    **kwargs: Any,
+) -> None:
+    # Bulk ingestion rolls up its batches itself (bulk_create sends no signals)
+    if created:
+        record_rollups([instance])
@@ -0,0 +1,80 @@
+/*
+ * Poll embed widget, v1.
+ *
+ * Usage: <div data-poll-embed="SLUG"></div><script src=".../embed/v1.js" async></script>
+ *
+ * Served immutable: never change this file in place, add a v2 next to it.
+ * Renders every [data-poll-embed] element from the poll's embed JSON document.
+ */
+(function () {
+    "use strict";
+
+    var script = document.currentScript;
+    var base = script ? script.src : "";
+
+    function el(tag, className, text) {
+        var node = document.createElement(tag);
+        if (className) node.className = className;
+        if (text !== undefined) node.textContent = text;
+        return node;
+    }
+
+    function renderQuestion(question) {
+        var total = question.options.reduce(function (sum, option) {
+            return sum + option.votes;
+        }, 0);
+        var block = el("div", "poll-embed-question");
+        block.appendChild(el("p", "poll-embed-question-text", question.text));
+        question.options.forEach(function (option) {
+            var percent = total ? Math.round((option.votes / total) * 100) : 0;
+            var row = el("div", "poll-embed-option");
+            row.appendChild(el("span", "poll-embed-option-text", option.text));
+            row.appendChild(el("span", "poll-embed-option-percent", " " + percent + "%"));
+            var bar = el("div", "poll-embed-bar");
+            bar.style.cssText = "height:6px;background:#2563eb;border-radius:3px;width:" + percent + "%";
+            row.appendChild(bar);
+            block.appendChild(row);
+        });
+        return block;
+    }
+
+    function render(container, data) {
+        var root = el("div", "poll-embed");
+        root.style.cssText = "font-family:sans-serif;border:1px solid #e5e7eb;border-radius:8px;padding:16px";
+        root.appendChild(el("h3", "poll-embed-title", data.title));
+        data.questions.forEach(function (question) {
+            root.appendChild(renderQuestion(question));
+        });
+        var link = el("a", "poll-embed-link", data.open ? "Vote" : "View results");
+        link.href = data.url;
+        link.target = "_blank";
+        link.rel = "noopener";
+        root.appendChild(link);
+        container.replaceChildren(root);
+
+        if (data.beacon && navigator.sendBeacon) {
+            navigator.sendBeacon(data.beacon, "EMBED_LOAD");
+        }
+    }
+
+    function load(container) {
+        var slug = container.getAttribute("data-poll-embed");
+        if (!slug || container.getAttribute("data-poll-embed-loaded")) return;
+        container.setAttribute("data-poll-embed-loaded", "1");
+
+        var url = new URL("../polls/" + encodeURIComponent(slug) + "/embed.json", base);
+        fetch(url.toString(), { credentials: "omit" })
+            .then(function (response) {
+                if (!response.ok) throw new Error(response.status);
+                return response.json();
+            })
+            .then(function (data) {
+                render(container, data);
+            })
+            .catch(function () {
+                container.textContent = "This poll is unavailable.";
+            });
+    }
+
+    document.querySelectorAll("[data-poll-embed]").forEach(load);
+})();
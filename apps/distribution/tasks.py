@@ -1,7 +1,25 @@
+import logging
+from typing import Any
+
+import requests
 from celery import shared_task
 from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
 
+from apps.distribution.caching import surrogate_key
+from apps.distribution.enrichment import enrich_events
+from apps.distribution.ingest import drain_events, record_unique_visitors
 from apps.distribution.models import DistributionAnalytics
+from apps.distribution.qr import QR_FORMATS
+from apps.distribution.services import DistributionService
+
+logger = logging.getLogger(__name__)
+
+PURGE_TIMEOUT = 10
+
+DRAIN_LOCK_KEY = "distribution_drain_lock"
+DRAIN_LOCK_TIMEOUT = 10 * 60
 
 
 @shared_task
@@ -19,7 +37,7 @@ def log_distribution_event_task(
     Poll = apps.get_model("polls", "Poll")
     try:
         poll = Poll.objects.get(id=poll_id)
-        DistributionAnalytics.objects.create(
+        event = DistributionAnalytics(
             poll=poll,
             event_type=event_type,
             ip_address=ip_address,
@@ -27,5 +45,64 @@ def log_distribution_event_task(
             referrer=referrer or "",
             metadata=metadata or {},
         )
+        enrich_events([event])
+        event.save()
+        record_unique_visitors([event])
     except Poll.DoesNotExist:
         pass
+
+
+@shared_task
+def drain_distribution_events_task() -> int:
+    """
+    Periodically writes buffered distribution events in bulk.
+    """
+    # Batches stay in the buffer until committed, so two drains would write them twice
+    if not cache.add(DRAIN_LOCK_KEY, 1, timeout=DRAIN_LOCK_TIMEOUT):
+        logger.info("Distribution events are already being drained")
+        return 0
+    try:
+        return drain_events(
+            batch_size=settings.DISTRIBUTION_EVENT_BATCH_SIZE,
+            max_batches=settings.DISTRIBUTION_EVENT_MAX_BATCHES,
+        )
+    finally:
+        cache.delete(DRAIN_LOCK_KEY)
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=30)
+def purge_poll_cache_task(self: Any, slug: str) -> None:
+    """
+    Purges a poll's public responses from the CDN by surrogate key.
+    Does nothing unless DISTRIBUTION_PURGE_URL is configured.
+    """
+    if not settings.DISTRIBUTION_PURGE_URL:
+        return
+
+    key = surrogate_key(slug)
+    headers = {"Surrogate-Key": key}
+    if settings.DISTRIBUTION_PURGE_TOKEN:
+        headers["Authorization"] = f"Bearer {settings.DISTRIBUTION_PURGE_TOKEN}"
+    try:
+        response = requests.post(
+            settings.DISTRIBUTION_PURGE_URL.format(key=key),
+            headers=headers,
+            timeout=PURGE_TIMEOUT,
+        )
+        response.raise_for_status()
+    except requests.RequestException as exc:
+        logger.warning(f"Failed to purge {key} from the CDN: {exc}")
+        raise self.retry(exc=exc) from exc
+
+
+@shared_task
+def generate_qr_codes_task(poll_id: int) -> None:
+    """
+    Pre-renders the default QR codes of a poll so no request has to.
+    """
+    Poll = apps.get_model("polls", "Poll")
+    poll = Poll.objects.filter(id=poll_id).first()
+    if poll is None:
+        return
+    for img_format in QR_FORMATS:
+        DistributionService.get_qr_code_asset(poll, img_format)
@@ -1,11 +1,16 @@
-from django.urls import path
+from django.urls import path, re_path
 
 from apps.distribution.views import (
+    EmbedScriptView,
+    PollBeaconView,
     PollDistributionAnalyticsView,
+    PollEmbedDataView,
     PollEmbedView,
     PollQRCodeView,
     PublicPollDetailView,
     PublicPollPageView,
+    QRCodeAssetView,
+    QRCodeExportView,
 )
 
 app_name = "distribution"
@@ -17,6 +22,13 @@ urlpatterns = [
     path("polls/<slug:slug>/public", PublicPollDetailView.as_view(), name="public-poll"),
     path("polls/<slug:slug>/qr", PollQRCodeView.as_view(), name="poll-qr"),
     path("polls/<slug:slug>/embed", PollEmbedView.as_view(), name="poll-embed"),
+    path("polls/<slug:slug>/embed.json", PollEmbedDataView.as_view(), name="poll-embed-data"),
+    re_path(r"^embed/(?P<version>v\d+)\.js$", EmbedScriptView.as_view(), name="embed-script"),
+    path("qr/export", QRCodeExportView.as_view(), name="qr-export"),
+    re_path(
+        r"^qr/(?P<name>[0-9a-f]{64}\.(?:png|svg))$", QRCodeAssetView.as_view(), name="qr-asset"
+    ),
+    path("polls/<slug:slug>/beacon", PollBeaconView.as_view(), name="poll-beacon"),
     path(
         "polls/<slug:slug>/distribution/analytics",
         PollDistributionAnalyticsView.as_view(),
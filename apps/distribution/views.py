@@ -1,44 +1,143 @@
+from collections.abc import Iterator
+from pathlib import Path
 from typing import TYPE_CHECKING
 
-from django.http import HttpRequest, HttpResponse
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpRequest,
+    HttpResponse,
+    HttpResponseBadRequest,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.http.response import HttpResponseBase
 
 if TYPE_CHECKING:
     from rest_framework.request import Request
-from django.shortcuts import get_object_or_404, render
+from django.shortcuts import get_object_or_404
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from django.utils.decorators import method_decorator
 from django.views import View
+from django.views.decorators.cache import never_cache
+from django.views.decorators.csrf import csrf_exempt
 from drf_spectacular.utils import OpenApiTypes, extend_schema
-from rest_framework import views
+from rest_framework import exceptions, status, views
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 
+from apps.analytics.uniques import VISITORS, count_uniques
+from apps.core.negotiation import FormatParamContentNegotiation
+from apps.core.streaming import iterate_in_thread
+from apps.core.throttling import client_ip, throttle
+from apps.distribution.caching import (
+    add_cache_headers,
+    add_origin_headers,
+    edge_caching_enabled,
+)
+from apps.distribution.ingest import (
+    enqueue_event,
+    get_bot_event_count,
+    get_rate_limited_event_count,
+)
 from apps.distribution.models import DistributionAnalytics, DistributionEvent
+from apps.distribution.page_cache import get_embed_data, get_public_page, page_response
+from apps.distribution.rollups import get_distribution_summary
 from apps.distribution.serializers import (
     PollDistributionAnalyticsResponseSerializer,
     PollDistributionInfoSerializer,
     PublicPollSerializer,
+    QRCodeExportSerializer,
+    QRCodeParamsSerializer,
+)
+from apps.distribution.services import (
+    QR_STORAGE_DIR,
+    DistributionService,
+    acquire_export_slot,
+    release_export_slot,
 )
-from apps.distribution.services import DistributionService
-from apps.distribution.tasks import log_distribution_event_task
+from apps.polls.cache import get_public_poll
 from apps.polls.models import Poll
 
+# One year, the longest lifetime caches are expected to honour
+QR_ASSET_MAX_AGE = 365 * 24 * 60 * 60
+# Seconds a client should wait while every QR export slot is busy
+QR_EXPORT_RETRY_AFTER = 30
+
+EMBED_SCRIPTS_DIR = Path(__file__).resolve().parent / "static" / "distribution" / "embed"
+
+
+def _get_public_poll(slug: str) -> Poll:
+    poll = get_public_poll(slug)
+    if poll is None:
+        raise Http404("No Poll matches the given query.")
+    return poll
+
 
+def _log_event(request: HttpRequest, poll: Poll, event_type: str) -> None:
+    """
+    Buffers a distribution event for bulk ingestion.
+    """
+    enqueue_event(
+        poll.id,
+        event_type,
+        # Behind the proxy, not the proxy's own address (which would flag everyone as a bot)
+        ip_address=client_ip(request),
+        user_agent=request.META.get("HTTP_USER_AGENT"),
+        referrer=request.META.get("HTTP_REFERER"),
+    )
+
+
+@method_decorator(throttle("public", poll_kwarg="slug"), name="get")
 class PublicPollPageView(View):
     """
     Template-based view for public poll sharing with social metadata.
+    Pages are served from the full-page cache (see page_cache.py).
     """
 
     def get(self, request: HttpRequest, slug: str) -> HttpResponse:
-        poll = get_object_or_404(Poll, slug=slug, is_active=True)
-
-        # Log event asynchronously
-        log_distribution_event_task.delay(
-            poll.id,
-            DistributionEvent.LINK_OPEN,
-            ip_address=request.META.get("REMOTE_ADDR"),
-            user_agent=request.META.get("HTTP_USER_AGENT"),
-            referrer=request.META.get("HTTP_REFERER"),
+        poll = _get_public_poll(slug)
+
+        # Edge-cached responses are reported by the client through the beacon
+        if not edge_caching_enabled():
+            _log_event(request, poll, DistributionEvent.LINK_OPEN)
+
+        page = get_public_page(
+            poll,
+            lambda: render_to_string(
+                "distribution/public_poll.html",
+                {
+                    "poll": poll,
+                    "page_url": DistributionService.get_public_url(poll),
+                    "log_via_beacon": edge_caching_enabled(),
+                },
+            ),
         )
+        return add_cache_headers(page_response(request, page), poll)
+
+
+@method_decorator([csrf_exempt, never_cache], name="dispatch")
+@method_decorator(throttle("public", poll_kwarg="slug"), name="post")
+class PollBeaconView(View):
+    """
+    Records a distribution event reported by the client.
+    Used when public responses are served from the edge cache.
+    """
+
+    def post(self, request: HttpRequest, slug: str) -> HttpResponse:
+        poll = _get_public_poll(slug)
 
-        return render(request, "distribution/public_poll.html", {"poll": poll})
+        # navigator.sendBeacon() posts the event type as plain text
+        event_type = request.POST.get("event") or request.body.decode(errors="ignore").strip()
+        if event_type not in DistributionEvent.values:
+            return HttpResponseBadRequest("Unknown event type.")
+
+        _log_event(request, poll, event_type)
+        return HttpResponse(status=204)
 
 
 class PublicPollDetailView(views.APIView):
@@ -48,6 +147,10 @@ class PublicPollDetailView(views.APIView):
     """
 
     permission_classes = []  # Public access
+    throttle_scope = "public"
+    throttle_poll_kwarg = "slug"
+    # Always JSON, so public responses never depend on the Accept header
+    renderer_classes = [JSONRenderer]
 
     @extend_schema(
         tags=["Distribution"],
@@ -57,20 +160,14 @@ class PublicPollDetailView(views.APIView):
         responses={200: PublicPollSerializer},
     )
     def get(self, request: "Request", slug: str) -> Response:
-        poll = get_object_or_404(Poll, slug=slug, is_active=True)
-
-        # Log event asynchronously
-        log_distribution_event_task.delay(
-            poll.id,
-            DistributionEvent.LINK_OPEN,
-            ip_address=request.META.get("REMOTE_ADDR"),
-            user_agent=request.META.get("HTTP_USER_AGENT"),
-            referrer=request.META.get("HTTP_REFERER"),
-        )
+        poll = _get_public_poll(slug)
+
+        # API clients have no beacon, so every hit is served and logged here
+        _log_event(request, poll, DistributionEvent.LINK_OPEN)
 
         # We use a specific PublicPollSerializer here for clean structure
         serializer = PublicPollSerializer(poll)
-        return Response(serializer.data)
+        return add_origin_headers(Response(serializer.data), poll)
 
 
 class PollQRCodeView(views.APIView):
@@ -80,33 +177,123 @@ class PollQRCodeView(views.APIView):
     """
 
     permission_classes = []
+    throttle_scope = "public"
+    throttle_poll_kwarg = "slug"
+    # Always JSON, so public responses never depend on the Accept header
+    renderer_classes = [JSONRenderer]
+    # `?format=` is the image type
+    content_negotiation_class = FormatParamContentNegotiation
 
     @extend_schema(
         tags=["Distribution"],
         summary="Generate Poll QR Code",
-        description="Generates a PNG or SVG QR code for the poll's public URL.",
+        description="Generates a PNG or SVG QR code for the poll's public URL.\n"
+        "`size` is the pixel size of each module and `ec` the error correction level.\n"
+        "The immutable asset URL is returned in the `Content-Location` header.",
+        parameters=[QRCodeParamsSerializer],
         responses={
             (200, "image/png"): OpenApiTypes.BINARY,
             (200, "image/svg+xml"): OpenApiTypes.BYTE,
         },
     )
     def get(self, request: "Request", slug: str) -> HttpResponse:
-        poll = get_object_or_404(Poll, slug=slug, is_active=True)
-
-        img_format = request.query_params.get("format", "png")
-        qr_content = DistributionService.generate_qr_code(poll, img_format=img_format)
-
-        # Log event
-        log_distribution_event_task.delay(
-            poll.id,
-            DistributionEvent.QR_SCAN,
-            ip_address=request.META.get("REMOTE_ADDR"),
-            user_agent=request.META.get("HTTP_USER_AGENT"),
-            referrer=request.META.get("HTTP_REFERER"),
+        poll = _get_public_poll(slug)
+
+        params = QRCodeParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        img_format = params.validated_data["format"]
+        size, error_correction = params.validated_data["size"], params.validated_data["ec"]
+        qr_content = DistributionService.generate_qr_code(
+            poll, img_format=img_format, size=size, error_correction=error_correction
         )
+        asset_path = DistributionService.get_qr_code_path(poll, img_format, size, error_correction)
+
+        # An image fetch cannot beacon, so every scan is served and logged here
+        _log_event(request, poll, DistributionEvent.QR_SCAN)
 
         content_type = "image/svg+xml" if img_format == "svg" else "image/png"
-        return HttpResponse(qr_content, content_type=content_type)
+        response = HttpResponse(qr_content, content_type=content_type)
+        response["Content-Location"] = reverse(
+            "distribution:qr-asset", kwargs={"name": asset_path.rsplit("/", 1)[-1]}
+        )
+        return add_origin_headers(response, poll)
+
+
+class QRCodeAssetView(View):
+    """
+    Serves a stored QR code by its content address, re-rendering it if the
+    storage lost it. The name changes whenever the image would, so responses
+    are cached forever.
+    """
+
+    def get(self, request: HttpRequest, name: str) -> FileResponse:
+        path = f"{QR_STORAGE_DIR}/{name}"
+        if not default_storage.exists(path) and not DistributionService.restore_qr_code_asset(name):
+            raise Http404("No QR code matches the given name.")
+
+        content_type = "image/svg+xml" if name.endswith(".svg") else "image/png"
+        response = FileResponse(default_storage.open(path, "rb"), content_type=content_type)
+        patch_cache_control(response, public=True, max_age=QR_ASSET_MAX_AGE, immutable=True)
+        return response
+
+
+class QRCodeExportView(views.APIView):
+    """
+    Streams a ZIP archive of QR codes for many of the user's polls at once.
+    """
+
+    @extend_schema(
+        tags=["Distribution"],
+        summary="Export Poll QR Codes",
+        description="Renders QR codes for the given polls (default: all of yours)\n"
+        "and streams them as a ZIP archive of `<slug>.<format>` files.\n"
+        "Answers 503 while `QR_EXPORT_MAX_CONCURRENT` exports are already running.",
+        request=QRCodeExportSerializer,
+        responses={(200, "application/zip"): OpenApiTypes.BINARY},
+    )
+    def post(self, request: "Request") -> HttpResponseBase:
+        serializer = QRCodeExportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        if not request.user.is_authenticated:
+            raise exceptions.NotAuthenticated()
+
+        polls = Poll.objects.filter(created_by=request.user).only("id", "slug")
+        if "slugs" in data:
+            polls = polls.filter(slug__in=data["slugs"])
+        max_polls = settings.QR_EXPORT_MAX_POLLS
+        if polls.count() > max_polls:
+            return Response(
+                {"detail": f"Exports are limited to {max_polls} polls."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        slot = acquire_export_slot()
+        if slot is None:
+            return Response(
+                {"detail": "Too many QR code exports in progress, try again shortly."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(QR_EXPORT_RETRY_AFTER)},
+            )
+
+        def archive() -> Iterator[bytes]:
+            try:
+                yield from DistributionService.export_qr_codes(
+                    polls.order_by("slug").iterator(),
+                    img_formats=sorted(data["formats"]),
+                    size=data["size"],
+                    error_correction=data["ec"],
+                )
+            finally:
+                release_export_slot(slot)
+
+        # Rendered entry by entry as the response is sent (see apps/core/streaming.py)
+        response = StreamingHttpResponse(
+            iterate_in_thread(archive()), content_type="application/zip"
+        )
+        response["Content-Disposition"] = 'attachment; filename="qr-codes.zip"'
+        return response
 
 
 class PollEmbedView(views.APIView):
@@ -116,26 +303,25 @@ class PollEmbedView(views.APIView):
     """
 
     permission_classes = []
+    throttle_scope = "public"
+    throttle_poll_kwarg = "slug"
+    # Always JSON, so public responses never depend on the Accept header
+    renderer_classes = [JSONRenderer]
 
     @extend_schema(
         tags=["Distribution"],
         summary="Get Poll Embed Details",
-        description="Returns the iframe embed snippet and canonical public URL.",
+        description="Returns the embed snippet (widget script with an iframe fallback)\n"
+        "and canonical public URL.",
         responses={200: PollDistributionInfoSerializer},
     )
     def get(self, request: "Request", slug: str) -> Response:
-        poll = get_object_or_404(Poll, slug=slug, is_active=True)
-
-        # Log event asynchronously
-        log_distribution_event_task.delay(
-            poll.id,
-            DistributionEvent.EMBED_LOAD,
-            ip_address=request.META.get("REMOTE_ADDR"),
-            user_agent=request.META.get("HTTP_USER_AGENT"),
-            referrer=request.META.get("HTTP_REFERER"),
-        )
+        poll = _get_public_poll(slug)
+
+        # API clients have no beacon, so every hit is served and logged here
+        _log_event(request, poll, DistributionEvent.EMBED_LOAD)
 
-        return Response(
+        response = Response(
             PollDistributionInfoSerializer(
                 {
                     "embed_code": DistributionService.get_embed_code(poll),
@@ -144,6 +330,47 @@ class PollEmbedView(views.APIView):
                 }
             ).data
         )
+        return add_origin_headers(response, poll)
+
+
+@method_decorator(throttle("public", poll_kwarg="slug"), name="get")
+class PollEmbedDataView(View):
+    """
+    Returns the compact poll document rendered by the embed widget.
+    Logs an EMBED_LOAD event.
+    """
+
+    def get(self, request: HttpRequest, slug: str) -> JsonResponse:
+        poll = _get_public_poll(slug)
+
+        # Edge-cached responses are reported by the widget through the beacon
+        data = get_embed_data(poll, lambda: DistributionService.get_embed_data(poll))
+        if edge_caching_enabled():
+            data = {**data, "beacon": DistributionService.get_beacon_url(poll)}
+        else:
+            _log_event(request, poll, DistributionEvent.EMBED_LOAD)
+
+        response = JsonResponse(data)
+        # Fetched by the widget from third-party pages; public and credential-free
+        response["Access-Control-Allow-Origin"] = "*"
+        # Votes don't purge the edge, so live tallies are only cached briefly there too
+        return add_cache_headers(response, poll, max_ttl=settings.DISTRIBUTION_EMBED_CACHE_SECONDS)
+
+
+class EmbedScriptView(View):
+    """
+    Serves a version of the embed widget script.
+    Versions never change once published, so responses are cached forever.
+    """
+
+    def get(self, request: HttpRequest, version: str) -> FileResponse:
+        path = EMBED_SCRIPTS_DIR / f"{version}.js"
+        if not path.is_file():
+            raise Http404("No embed script matches the given version.")
+
+        response = FileResponse(path.open("rb"), content_type="text/javascript")
+        patch_cache_control(response, public=True, max_age=QR_ASSET_MAX_AGE, immutable=True)
+        return response
 
 
 class PollDistributionAnalyticsView(views.APIView):
@@ -160,15 +387,17 @@ class PollDistributionAnalyticsView(views.APIView):
     )
     def get(self, request: "Request", slug: str) -> Response:
         poll = get_object_or_404(Poll, slug=slug, created_by=request.user)
-        analytics = DistributionAnalytics.objects.filter(poll=poll)
-
-        summary = {
-            "total_link_opens": analytics.filter(event_type=DistributionEvent.LINK_OPEN).count(),
-            "total_qr_scans": analytics.filter(event_type=DistributionEvent.QR_SCAN).count(),
-            "total_embed_loads": analytics.filter(event_type=DistributionEvent.EMBED_LOAD).count(),
-        }
+        recent_events = DistributionAnalytics.objects.filter(poll=poll)[:100]
 
         serializer = PollDistributionAnalyticsResponseSerializer(
-            {"summary": summary, "recent_events": analytics[:100]}
+            {
+                "summary": {
+                    **get_distribution_summary(poll),
+                    "unique_visitors": count_uniques(VISITORS, [poll.id], poll.created_at),
+                    "bot_events": get_bot_event_count(poll.id),
+                    "rate_limited_events": get_rate_limited_event_count(poll.id),
+                },
+                "recent_events": recent_events,
+            }
         )
         return Response(serializer.data)
@@ -0,0 +1,361 @@
+"""
+Node-local fan-out of live poll results.
+
+A single ResultsBroadcaster runs per event loop (i.e. per ASGI worker). It holds
+one Redis pub/sub connection for every poll watched on this node, accumulates
+tally deltas in memory and, once per tick, pushes one merged frame per poll to
+every local subscriber (SSE streams and GraphQL subscriptions alike).
+
+Pushing is O(polls x subscribers) per tick instead of O(votes x subscribers).
+Subscribers whose queue is full are dropped rather than slowing everyone down;
+clients reconnect and resume from a fresh snapshot.
+
+If the Redis connection fails, the broadcaster resubscribes with exponential
+backoff. Frames published meanwhile are lost, so its subscribers are then
+dropped too, to resync from a snapshot; if Redis stays unreachable they are
+dropped and it stops listening until new subscribers arrive.
+"""
+
+import asyncio
+import json
+import logging
+import time
+import weakref
+from collections import Counter, defaultdict
+from collections.abc import AsyncIterator
+from types import TracebackType
+from typing import Any
+
+import redis
+from django.conf import settings
+
+from apps.core.redis_client import get_async_redis
+
+from .realtime import RESULTS_CHANNEL, RESULTS_CHANNEL_PREFIX, RESULTS_SEQUENCE_KEY
+
+logger = logging.getLogger(__name__)
+
+
+class SlowConsumerError(Exception):
+    """
+    Raised to a subscriber that was dropped, for not keeping up or because the
+    broadcaster lost frames. Its client should reconnect.
+    """
+
+
+class Subscriber:
+    def __init__(self, poll_id: int, queue_size: int) -> None:
+        self.poll_id = poll_id
+        self.queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=queue_size)
+        self.dropped = False
+
+    async def next_frames(self, timeout: float) -> list[dict[str, Any]]:
+        """
+        Waits up to `timeout` seconds for a frame, then drains any queued frames.
+        """
+        if self.dropped:
+            raise SlowConsumerError
+        try:
+            frames = [await asyncio.wait_for(self.queue.get(), timeout)]
+        except TimeoutError:
+            frames = []
+        if self.dropped:
+            raise SlowConsumerError
+        while not self.queue.empty():
+            frames.append(self.queue.get_nowait())
+        return frames
+
+
+class ResultsBroadcaster:
+    """
+    Merges per-poll tally deltas and publishes one frame per poll per tick.
+    """
+
+    # Consecutive Redis failures tolerated before giving up, and the backoff
+    # before each resubscription (doubling up to the maximum), in seconds
+    reconnect_attempts = 5
+    reconnect_backoff = 0.5
+    reconnect_backoff_max = 10.0
+
+    def __init__(self, tick: float, queue_size: int, report_interval: float = 60.0) -> None:
+        self.tick = tick
+        self.queue_size = queue_size
+        self.report_interval = report_interval
+        self._subscribers: dict[int, set[Subscriber]] = defaultdict(set)
+        self._pending_deltas: dict[int, Counter[tuple[int, int]]] = defaultdict(Counter)
+        self._pending_seq: dict[int, int] = {}
+        self._client = get_async_redis()
+        self._pubsub: Any = self._client.pubsub() if self._client is not None else None
+        self._flusher: asyncio.Task[None] | None = None
+        self._listener: asyncio.Task[None] | None = None
+
+        # Fan-out metrics
+        self.frames_published = 0
+        self.messages_delivered = 0
+        self.dropped_consumers = 0
+        self.feed_errors = 0
+        self._rate_window_start = time.monotonic()
+        self._rate_window_frames = 0
+
+    @property
+    def available(self) -> bool:
+        return self._client is not None
+
+    async def sequence(self, poll_id: int) -> int:
+        """
+        Returns the latest published results sequence for a poll.
+        """
+        if self._client is None:
+            return 0
+        value = await self._client.get(RESULTS_SEQUENCE_KEY.format(poll_id=poll_id))
+        return int(value or 0)
+
+    async def subscribe(self, poll_id: int) -> Subscriber:
+        subscriber = Subscriber(poll_id, self.queue_size)
+        if not self._subscribers[poll_id] and self._pubsub is not None:
+            await self._pubsub.subscribe(RESULTS_CHANNEL.format(poll_id=poll_id))
+        self._subscribers[poll_id].add(subscriber)
+        self._start()
+        return subscriber
+
+    async def unsubscribe(self, subscriber: Subscriber) -> None:
+        poll_id = subscriber.poll_id
+        self._subscribers[poll_id].discard(subscriber)
+        if not self._subscribers[poll_id]:
+            del self._subscribers[poll_id]
+            self._pending_deltas.pop(poll_id, None)
+            self._pending_seq.pop(poll_id, None)
+            if self._pubsub is not None:
+                try:
+                    await self._pubsub.unsubscribe(RESULTS_CHANNEL.format(poll_id=poll_id))
+                except redis.RedisError as e:
+                    logger.warning(f"Failed to unsubscribe from Poll {poll_id} results: {e}")
+        if not self._subscribers:
+            self._stop()
+
+    def ingest(self, poll_id: int, frame: dict[str, Any]) -> None:
+        """
+        Accumulates a published frame until the next tick.
+        """
+        if poll_id not in self._subscribers:
+            return
+        pending = self._pending_deltas[poll_id]
+        for change in frame["changes"]:
+            pending[(change["question_id"], change["option_id"])] += change["delta"]
+        self._pending_seq[poll_id] = max(self._pending_seq.get(poll_id, 0), frame["seq"])
+
+    def flush(self) -> None:
+        """
+        Publishes one merged frame per poll with pending deltas to its subscribers.
+        """
+        for poll_id, seq in list(self._pending_seq.items()):
+            deltas = self._pending_deltas.pop(poll_id, Counter())
+            del self._pending_seq[poll_id]
+            frame = {
+                "seq": seq,
+                "changes": [
+                    {"question_id": question_id, "option_id": option_id, "delta": delta}
+                    for (question_id, option_id), delta in deltas.items()
+                    if delta
+                ],
+            }
+            self.frames_published += 1
+            self._rate_window_frames += 1
+            for subscriber in list(self._subscribers.get(poll_id, ())):
+                try:
+                    subscriber.queue.put_nowait(frame)
+                    self.messages_delivered += 1
+                except asyncio.QueueFull:
+                    self._drop(subscriber)
+
+    def metrics(self) -> dict[str, Any]:
+        elapsed = max(time.monotonic() - self._rate_window_start, 1e-9)
+        return {
+            "polls": len(self._subscribers),
+            "subscribers": sum(len(subs) for subs in self._subscribers.values()),
+            "frames_published": self.frames_published,
+            "frames_per_second": round(self._rate_window_frames / elapsed, 2),
+            "messages_delivered": self.messages_delivered,
+            "dropped_consumers": self.dropped_consumers,
+            "feed_errors": self.feed_errors,
+        }
+
+    def _drop(self, subscriber: Subscriber) -> None:
+        subscriber.dropped = True
+        self.dropped_consumers += 1
+        self._subscribers[subscriber.poll_id].discard(subscriber)
+        logger.info(f"Dropped slow results subscriber for Poll {subscriber.poll_id}")
+
+    def _drop_all(self) -> None:
+        """
+        Drops every subscriber, whose clients then reconnect from a snapshot.
+        """
+        for subscribers in self._subscribers.values():
+            for subscriber in subscribers:
+                subscriber.dropped = True
+        self._subscribers.clear()
+        self._pending_deltas.clear()
+        self._pending_seq.clear()
+
+    def _start(self) -> None:
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop())
+        if self._pubsub is not None and (self._listener is None or self._listener.done()):
+            self._listener = asyncio.create_task(self._listen())
+
+    def _stop(self) -> None:
+        for task in (self._flusher, self._listener):
+            if task is not None:
+                task.cancel()
+        self._flusher = self._listener = None
+
+    async def _resubscribe(self) -> None:
+        """
+        Replaces the pub/sub connection, subscribed to every watched poll.
+        """
+        try:
+            await self._pubsub.aclose()
+        except redis.RedisError:
+            pass
+        self._pubsub = self._client.pubsub() if self._client is not None else None
+        channels = [RESULTS_CHANNEL.format(poll_id=poll_id) for poll_id in self._subscribers]
+        if self._pubsub is not None and channels:
+            await self._pubsub.subscribe(*channels)
+
+    async def _listen(self) -> None:
+        failures = 0
+        while True:
+            try:
+                if failures:
+                    await self._resubscribe()
+                    # Frames published while disconnected are lost
+                    self._drop_all()
+                    logger.info("Results feed resubscribed, subscribers will resync")
+                message = await self._pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=1.0
+                )
+            except redis.RedisError as e:
+                failures += 1
+                self.feed_errors += 1
+                if failures > self.reconnect_attempts:
+                    logger.error(f"Results feed lost, dropping all subscribers: {e}")
+                    self._drop_all()
+                    # A fresh connection, subscribed as new subscribers arrive
+                    await self._resubscribe()
+                    return
+                backoff = min(
+                    self.reconnect_backoff * 2 ** (failures - 1), self.reconnect_backoff_max
+                )
+                logger.warning(f"Results feed error, resubscribing in {backoff}s: {e}")
+                await asyncio.sleep(backoff)
+                continue
+            failures = 0
+
+            if message is None or message["type"] != "message":
+                continue
+            channel = message["channel"]
+            if isinstance(channel, bytes):
+                channel = channel.decode()
+            try:
+                poll_id = int(channel.removeprefix(RESULTS_CHANNEL_PREFIX))
+                self.ingest(poll_id, json.loads(message["data"]))
+            except (ValueError, KeyError) as e:
+                logger.warning(f"Ignoring malformed results frame on {channel}: {e}")
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.tick)
+            self.flush()
+            if time.monotonic() - self._rate_window_start >= self.report_interval:
+                logger.info(f"Results broadcaster metrics: {self.metrics()}")
+                self._rate_window_start = time.monotonic()
+                self._rate_window_frames = 0
+
+
+_broadcasters: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, ResultsBroadcaster]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_broadcaster() -> ResultsBroadcaster:
+    """
+    Returns the broadcaster bound to the running event loop, creating it if needed.
+    """
+    loop = asyncio.get_running_loop()
+    broadcaster = _broadcasters.get(loop)
+    if broadcaster is None:
+        broadcaster = ResultsBroadcaster(
+            tick=settings.POLL_RESULTS_TICK_MS / 1000,
+            queue_size=settings.POLL_RESULTS_SUBSCRIBER_QUEUE_SIZE,
+        )
+        _broadcasters[loop] = broadcaster
+    return broadcaster
+
+
+class PollResultsFeed:
+    """
+    Async context manager subscribing to a poll's merged result frames.
+
+    Subscribing happens on enter, so callers can take a snapshot afterwards
+    without missing frames published in between.
+    """
+
+    def __init__(self, poll_id: int) -> None:
+        self.poll_id = poll_id
+        self._broadcaster: ResultsBroadcaster | None = None
+        self._subscriber: Subscriber | None = None
+
+    @property
+    def available(self) -> bool:
+        return self._broadcaster is not None and self._broadcaster.available
+
+    async def __aenter__(self) -> "PollResultsFeed":
+        self._broadcaster = get_broadcaster()
+        if self._broadcaster.available:
+            self._subscriber = await self._broadcaster.subscribe(self.poll_id)
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        if self._broadcaster is not None and self._subscriber is not None:
+            await self._broadcaster.unsubscribe(self._subscriber)
+
+    async def sequence(self) -> int:
+        """
+        Returns the sequence number of the latest published frame.
+        """
+        return await self._broadcaster.sequence(self.poll_id) if self._broadcaster else 0
+
+    async def next_frames(self, timeout: float) -> list[dict[str, Any]]:
+        """
+        Waits up to `timeout` seconds for merged frames.
+        Raises SlowConsumerError if this feed was dropped for falling behind.
+        """
+        if self._subscriber is None:
+            await asyncio.sleep(timeout)
+            return []
+        return await self._subscriber.next_frames(timeout)
+
+    async def __aiter__(self) -> AsyncIterator[dict[str, Any]]:
+        while True:
+            for frame in await self.next_frames(timeout=30):
+                yield frame
+
+
+async def subscribe_poll_results(poll_id: int) -> AsyncIterator[dict[str, Any]]:
+    """
+    Yields merged result frames for a poll until the subscriber is dropped.
+    """
+    async with PollResultsFeed(poll_id) as feed:
+        if not feed.available:
+            logger.warning("Live results requested but Redis is not configured.")
+            return
+        try:
+            async for frame in feed:
+                yield frame
+        except SlowConsumerError:
+            return
@@ -0,0 +1,103 @@
+"""
+Per-poll caches.
+
+Every change to a poll, its questions or its options bumps the poll's version.
+Caches that include the version in their keys are invalidated without having to
+know every key that was derived from the poll.
+
+Public endpoints resolve polls by slug through a read-through cache: a short-lived
+in-process LRU in front of the shared cache, in front of the database.
+"""
+
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from apps.core.local_cache import MISSING, LocalTTLCache
+
+from .models import Poll
+
+POLL_VERSION_KEY = "poll_version:{slug}"
+PUBLIC_POLL_KEY = "public_poll:{slug}"
+
+# Fields needed to render public pages and payloads (including every field
+# PollType exposes), so cached lookups never load a deferred field
+PUBLIC_POLL_FIELDS = (
+    "id",
+    "created_by_id",
+    "slug",
+    "title",
+    "description",
+    "created_at",
+    "updated_at",
+    "start_date",
+    "end_date",
+    "is_active",
+)
+
+_local_public_polls = LocalTTLCache(
+    maxsize=settings.PUBLIC_POLL_LOCAL_CACHE_SIZE,
+    ttl=settings.PUBLIC_POLL_LOCAL_CACHE_SECONDS,
+)
+
+
+def poll_version_key(slug: str) -> str:
+    return POLL_VERSION_KEY.format(slug=slug)
+
+
+def poll_version_keys(arguments: dict[str, Any]) -> list[str]:
+    """
+    Version keys for a GraphQL field taking a poll `slug` argument.
+    """
+    return [poll_version_key(arguments["slug"])]
+
+
+def bump_poll_version(slug: str) -> None:
+    key = poll_version_key(slug)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # First change since the counter was evicted (or ever)
+        cache.set(key, 1, timeout=None)
+
+
+def get_public_poll(slug: str) -> Poll | None:
+    """
+    Returns the active poll with this slug, or None, usually without a database query.
+    Only PUBLIC_POLL_FIELDS are loaded; other fields are deferred.
+    """
+    key = PUBLIC_POLL_KEY.format(slug=slug)
+    fields = _local_public_polls.get(key)
+    if fields is MISSING:
+        fields = cache.get(key, MISSING)
+        if fields is MISSING:
+            fields = (
+                Poll.objects.filter(slug=slug, is_active=True).values(*PUBLIC_POLL_FIELDS).first()
+            )
+            # Unknown slugs are cached too, but briefly, so scans cannot pin them
+            timeout = settings.PUBLIC_POLL_CACHE_SECONDS if fields else 60
+            cache.set(key, fields, timeout=timeout)
+        _local_public_polls.set(key, fields)
+
+    if fields is None:
+        return None
+    # from_db() expects values in model field order
+    names = [f.attname for f in Poll._meta.concrete_fields if f.attname in fields]
+    return Poll.from_db("default", names, [fields[name] for name in names])
+
+
+def invalidate_public_poll(slug: str) -> None:
+    """
+    Drops the cached public poll now and again once the change is committed,
+    so a read racing the transaction cannot re-cache the old row.
+    """
+    key = PUBLIC_POLL_KEY.format(slug=slug)
+
+    def _delete() -> None:
+        _local_public_polls.delete(key)
+        cache.delete(key)
+
+    _delete()
+    transaction.on_commit(_delete)
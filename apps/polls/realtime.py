@@ -0,0 +1,76 @@
+"""
+Live poll results over Redis pub/sub.
+
+Every recorded vote publishes a small tally delta on a per-poll channel.
+Subscribers (GraphQL subscriptions, SSE streams) receive them through the
+node-local broadcaster (see broadcaster.py) instead of re-querying the database,
+so any number of watchers share one change feed.
+
+Frame format (JSON):
+    {"seq": 42, "changes": [{"question_id": 1, "option_id": 3, "delta": 1}]}
+
+``seq`` is a per-poll, monotonically increasing sequence number.
+"""
+
+import json
+import logging
+
+import redis
+from django.db.models import Count
+
+from apps.core.redis_client import get_redis
+
+from .models import Option, Vote
+
+logger = logging.getLogger(__name__)
+
+RESULTS_CHANNEL_PREFIX = "poll_results:"
+RESULTS_CHANNEL = RESULTS_CHANNEL_PREFIX + "{poll_id}"
+RESULTS_SEQUENCE_KEY = "poll_results:{poll_id}:seq"
+
+
+def publish_tally_delta(poll_id: int, question_id: int, option_id: int, delta: int) -> None:
+    """
+    Publishes a single option tally change for a poll.
+    Silently does nothing when Redis is unavailable.
+    """
+    client = get_redis()
+    if client is None:
+        return
+
+    try:
+        seq = client.incr(RESULTS_SEQUENCE_KEY.format(poll_id=poll_id))
+        frame = {
+            "seq": seq,
+            "changes": [{"question_id": question_id, "option_id": option_id, "delta": delta}],
+        }
+        client.publish(RESULTS_CHANNEL.format(poll_id=poll_id), json.dumps(frame))
+    except redis.RedisError as e:
+        logger.warning(f"Failed to publish results delta for Poll {poll_id}: {e}")
+
+
+def publish_vote(vote: Vote, delta: int = 1) -> None:
+    """
+    Publishes the tally change caused by recording (or removing) a vote.
+    """
+    publish_tally_delta(vote.question.poll_id, vote.question_id, vote.option_id, delta)
+
+
+def get_results_snapshot(poll_id: int) -> dict[int, dict[int, int]]:
+    """
+    Returns the current tallies of a poll as { question_id: { option_id: count } }.
+    Options without votes are included with a count of 0.
+    """
+    snapshot: dict[int, dict[int, int]] = {}
+    options = Option.objects.filter(question__poll_id=poll_id).values_list("question_id", "id")
+    for question_id, option_id in options:
+        snapshot.setdefault(question_id, {})[option_id] = 0
+
+    vote_counts = (
+        Vote.objects.filter(question__poll_id=poll_id)
+        .values("question_id", "option_id")
+        .annotate(count=Count("id"))
+    )
+    for row in vote_counts:
+        snapshot.setdefault(row["question_id"], {})[row["option_id"]] = row["count"]
+    return snapshot
@@ -1,4 +1,5 @@
 import logging
+from collections.abc import AsyncGenerator
 
 import strawberry
 import strawberry_django
@@ -9,6 +10,7 @@ from strawberry_django.fields.types import field_type_map
 from apps.core.fields import RandomSlugField
 
 from . import models
+from .broadcaster import subscribe_poll_results
 
 # Register custom field for 'auto' support in strawberry-django
 field_type_map.update({RandomSlugField: str})
@@ -107,3 +109,47 @@ class Query:
         ordering=PollOrder,
     )
     poll: PollType = strawberry_django.field()
+
+
+@strawberry.type
+class OptionTallyDelta:
+    question_id: strawberry.ID
+    option_id: strawberry.ID
+    delta: int
+
+
+@strawberry.type
+class PollResultsFrame:
+    poll_slug: str
+    sequence: int
+    changes: list[OptionTallyDelta]
+
+
+@strawberry.type
+class Subscription:
+    @strawberry.subscription
+    async def poll_results(self, slug: str) -> AsyncGenerator[PollResultsFrame, None]:
+        """
+        Streams tally deltas for a poll as votes are recorded.
+        """
+        poll_id = await (
+            models.Poll.objects.filter(slug=slug, is_active=True)
+            .values_list("id", flat=True)
+            .afirst()
+        )
+        if poll_id is None:
+            return
+
+        async for frame in subscribe_poll_results(poll_id):
+            yield PollResultsFrame(
+                poll_slug=slug,
+                sequence=frame["seq"],
+                changes=[
+                    OptionTallyDelta(
+                        question_id=strawberry.ID(str(change["question_id"])),
+                        option_id=strawberry.ID(str(change["option_id"])),
+                        delta=change["delta"],
+                    )
+                    for change in frame["changes"]
+                ],
+            )
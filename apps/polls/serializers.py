@@ -1,5 +1,6 @@
 from rest_framework import serializers
 
+from .exports import CSV, EXPORT_FORMATS
 from .models import Option, Poll, Question, Vote
 
 
@@ -51,3 +52,7 @@ class VoteSerializer(serializers.ModelSerializer):
     class Meta:
         model = Vote
         fields = ["id", "slug", "user", "question", "option", "created_at"]
+
+
+class PollExportParamsSerializer(serializers.Serializer):
+    format = serializers.ChoiceField(choices=EXPORT_FORMATS, default=CSV)
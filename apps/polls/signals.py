@@ -0,0 +1,64 @@
+from typing import Any
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.analytics.uniques import VOTERS, record_uniques, visitor_id
+
+from .cache import bump_poll_version, invalidate_public_poll
+from .models import Option, Poll, Question, Vote
+from .realtime import publish_vote
+
+
+@receiver(post_save, sender=Vote)
+def publish_recorded_vote(sender: type[Vote], instance: Vote, created: bool, **kwargs: Any) -> None:
+    """
+    Once the vote is committed, pushes the tally change to live result subscribers
+    and adds the voter to the poll's unique voter sketch.
+    """
+    if created:
+        transaction.on_commit(lambda: publish_vote(instance, delta=1))
+        transaction.on_commit(
+            lambda: record_uniques(
+                VOTERS,
+                [(instance.question.poll_id, instance.created_at, visitor_id(instance.user_id))],
+            )
+        )
+
+
+@receiver(post_delete, sender=Vote)
+def publish_removed_vote(sender: type[Vote], instance: Vote, **kwargs: Any) -> None:
+    # Cascades (e.g. deleting the whole poll) have nothing left to watch
+    if isinstance(kwargs.get("origin"), Vote):
+        transaction.on_commit(lambda: publish_vote(instance, delta=-1))
+
+
+def poll_changed(slug: str) -> None:
+    bump_poll_version(slug)
+    invalidate_public_poll(slug)
+
+
+@receiver(post_save, sender=Poll)
+@receiver(post_delete, sender=Poll)
+def bump_version_on_poll_change(sender: type[Poll], instance: Poll, **kwargs: Any) -> None:
+    poll_changed(instance.slug)
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+@receiver(post_save, sender=Option)
+@receiver(post_delete, sender=Option)
+def bump_version_on_content_change(
+    sender: type[Question] | type[Option], instance: Question | Option, **kwargs: Any
+) -> None:
+    # Deleting a poll bumps its version once; skip its cascaded children
+    if isinstance(kwargs.get("origin"), Poll):
+        return
+    if isinstance(instance, Question):
+        polls = Poll.objects.filter(id=instance.poll_id)
+    else:
+        polls = Poll.objects.filter(questions=instance.question_id)
+    slug = polls.values_list("slug", flat=True).first()
+    if slug:
+        poll_changed(slug)
@@ -1,7 +1,14 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import OptionViewSet, PollViewSet, QuestionViewSet, VoteViewSet
+from .views import (
+    OptionViewSet,
+    PollExportView,
+    PollResultsStreamView,
+    PollViewSet,
+    QuestionViewSet,
+    VoteViewSet,
+)
 
 app_name = "polls"
 
@@ -12,5 +19,11 @@ router.register(r"options", OptionViewSet)
 router.register(r"votes", VoteViewSet)
 
 urlpatterns = [
+    path(
+        "polls/<slug:slug>/results/stream",
+        PollResultsStreamView.as_view(),
+        name="poll-results-stream",
+    ),
+    path("polls/<slug:slug>/export", PollExportView.as_view(), name="poll-export"),
     path("", include(router.urls)),
 ]
@@ -1,11 +1,28 @@
-from drf_spectacular.utils import extend_schema
-from rest_framework import exceptions, permissions, serializers, viewsets
-
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404, HttpRequest, StreamingHttpResponse
+from django.views import View
+from drf_spectacular.utils import OpenApiTypes, extend_schema
+from rest_framework import exceptions, permissions, serializers, views, viewsets
+from rest_framework.request import Request
+from rest_framework.throttling import BaseThrottle
+
+from apps.core.negotiation import FormatParamContentNegotiation
 from apps.core.pagination import StandardResultsSetPagination
+from apps.core.streaming import iterate_in_thread
 
+from .broadcaster import PollResultsFeed, SlowConsumerError
+from .exports import CONTENT_TYPES, export_votes
 from .models import Option, Poll, Question, Vote
+from .realtime import get_results_snapshot
 from .serializers import (
     OptionSerializer,
+    PollExportParamsSerializer,
     PollSerializer,
     QuestionSerializer,
     VoteSerializer,
@@ -64,6 +81,20 @@ class VoteViewSet(viewsets.ModelViewSet):
     serializer_class = VoteSerializer
     lookup_field = "slug"
     permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = "vote"
+
+    def get_throttles(self) -> list[BaseThrottle]:
+        # Only casting votes is rate limited
+        return super().get_throttles() if self.action == "create" else []
+
+    def get_throttle_poll(self, request: Request) -> int | None:
+        question = request.data.get("question") if isinstance(request.data, dict) else None
+        if not isinstance(question, str):
+            return None
+        poll_id: int | None = (
+            Question.objects.filter(slug=question).values_list("poll_id", flat=True).first()
+        )
+        return poll_id
 
     def perform_create(self, serializer: serializers.BaseSerializer) -> None:
         question = serializer.validated_data.get("question")
@@ -76,3 +107,121 @@ class VoteViewSet(viewsets.ModelViewSet):
                 {"detail": "You have already voted on this question."}
             )
         serializer.save(user=user)
+
+
+class PollExportView(views.APIView):
+    """
+    Streams every response to one of the user's polls as CSV or NDJSON.
+    """
+
+    # `?format=` is the export format
+    content_negotiation_class = FormatParamContentNegotiation
+
+    @extend_schema(
+        tags=["Polls"],
+        summary="Export Poll Responses",
+        description="Streams one row per vote, with its question and option text,\n"
+        "as CSV (with a header row) or newline-delimited JSON.",
+        parameters=[PollExportParamsSerializer],
+        responses={
+            (200, "text/csv"): OpenApiTypes.STR,
+            (200, "application/x-ndjson"): OpenApiTypes.STR,
+        },
+    )
+    def get(self, request: Request, slug: str) -> StreamingHttpResponse:
+        params = PollExportParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        export_format = params.validated_data["format"]
+
+        poll = Poll.objects.filter(slug=slug).values("id", "created_by_id").first()
+        if poll is None:
+            raise Http404("Poll not found.")
+        if poll["created_by_id"] != request.user.pk:
+            raise exceptions.PermissionDenied("Only the poll's creator can export its responses.")
+
+        response = StreamingHttpResponse(
+            iterate_in_thread(
+                export_votes(poll["id"], export_format, settings.POLL_EXPORT_CHUNK_SIZE)
+            ),
+            content_type=CONTENT_TYPES[export_format],
+        )
+        response["Content-Disposition"] = f'attachment; filename="{slug}.{export_format}"'
+        response["X-Accel-Buffering"] = "no"  # Disable proxy buffering (nginx)
+        return response
+
+
+class PollResultsStreamView(View):
+    """
+    Server-Sent Events stream of live poll results.
+
+    Sends a `snapshot` event with every option count, then `update` events with
+    the counts that changed, coalesced to at most one event per interval.
+    The stream ends if the client falls too far behind; it then reconnects.
+    Event ids are the poll's results sequence, so a reconnecting client sending
+    `Last-Event-ID` only receives a new snapshot if something changed meanwhile.
+    """
+
+    coalesce_interval = 1.0  # seconds between update events
+    heartbeat_interval = 15.0  # seconds between keep-alive comments
+    retry_ms = 5000
+    snapshot_attempts = 3  # snapshots taken while votes keep landing during them
+
+    async def get(self, request: HttpRequest, slug: str) -> StreamingHttpResponse:
+        poll_id = await (
+            Poll.objects.filter(slug=slug, is_active=True).values_list("id", flat=True).afirst()
+        )
+        if poll_id is None:
+            raise Http404("Poll not found.")
+
+        response = StreamingHttpResponse(
+            self.stream(poll_id, request.headers.get("Last-Event-ID")),
+            content_type="text/event-stream",
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"  # Disable proxy buffering (nginx)
+        return response
+
+    @staticmethod
+    def format_event(event: str, seq: int, data: dict[str, Any]) -> str:
+        return f"id: {seq}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+
+    async def stream(self, poll_id: int, last_event_id: str | None) -> AsyncIterator[str]:
+        async with PollResultsFeed(poll_id) as feed:
+            # Subscribed before reading state, so no frame is missed in between.
+            # Votes publish once committed, so one published while the snapshot
+            # is read may or may not be in it: retake it until the sequence
+            # holds still around it, then skip every frame up to that sequence.
+            for _ in range(self.snapshot_attempts):
+                before = await feed.sequence()
+                counts = await sync_to_async(get_results_snapshot)(poll_id)
+                seq = await feed.sequence()
+                if seq == before:
+                    break
+
+            yield f"retry: {self.retry_ms}\n\n"
+            if last_event_id != str(seq) or not feed.available:
+                yield self.format_event("snapshot", seq, {"questions": counts})
+            if not feed.available:
+                return
+
+            while True:
+                try:
+                    received = await feed.next_frames(self.heartbeat_interval)
+                except SlowConsumerError:
+                    return
+                frames = [f for f in received if f["seq"] > seq]
+                if not frames:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                changed: dict[int, dict[int, int]] = {}
+                for frame in frames:
+                    for change in frame["changes"]:
+                        question_id, option_id = change["question_id"], change["option_id"]
+                        question = counts.setdefault(question_id, {})
+                        question[option_id] = question.get(option_id, 0) + change["delta"]
+                        changed.setdefault(question_id, {})[option_id] = question[option_id]
+                    seq = max(seq, frame["seq"])
+
+                yield self.format_event("update", seq, {"questions": changed})
+                await asyncio.sleep(self.coalesce_interval)
@@ -3,8 +3,11 @@ import strawberry
 from apps.ai.schema import Mutation as AIMutation
 from apps.ai.schema import Query as AIQuery
 from apps.analytics.schema import AnalyticsMutation, AnalyticsQuery
+from apps.core.graphql_cache import ResponseCacheExtension
+from apps.core.throttling import GraphQLThrottleExtension
 from apps.distribution.schema import Query as DistributionQuery
 from apps.polls.schema import Query as PollQuery
+from apps.polls.schema import Subscription as PollSubscription
 
 
 @strawberry.type
@@ -17,4 +20,15 @@ class Mutation(AIMutation, AnalyticsMutation):
     pass
 
 
-schema = strawberry.Schema(query=Query, mutation=Mutation)
+@strawberry.type
+class Subscription(PollSubscription):
+    pass
+
+
+schema = strawberry.Schema(
+    query=Query,
+    mutation=Mutation,
+    subscription=Subscription,
+    # Throttling runs last so it also applies to cached responses
+    extensions=[ResponseCacheExtension, GraphQLThrottleExtension],
+)
@@ -141,6 +141,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "config.wsgi.application"
+ASGI_APPLICATION = "config.asgi.application"
 
 
 # Database
@@ -192,6 +193,11 @@ STATIC_URL = "static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
+# Generated files (e.g. QR code assets). Web and worker services must share this
+# storage (e.g. object storage) in production; local disks are per service and ephemeral.
+MEDIA_URL = "media/"
+MEDIA_ROOT = env("MEDIA_ROOT", default=str(BASE_DIR / "media"))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -210,6 +216,32 @@ REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_PAGINATION_CLASS": "apps.core.pagination.StandardResultsSetPagination",
     "PAGE_SIZE": 20,
+    "DEFAULT_THROTTLE_CLASSES": ("apps.core.throttling.TokenBucketThrottle",),
+    # Reverse proxies in front of the app, whose X-Forwarded-For entries are
+    # trusted to find client IPs (0: use REMOTE_ADDR)
+    "NUM_PROXIES": env.int("NUM_PROXIES", default=0),
+}
+
+# Rate Limiting
+# ------------------------------------------------------------------------------
+# Token buckets per scope and dimension (ip, user, poll), see apps/core/throttling.py.
+# "graphql:<rootField>" scopes add limits to single GraphQL operations.
+THROTTLE_RATES = {
+    # Public distribution endpoints (page, detail, embed, QR, beacon)
+    "public": {
+        "ip": env("THROTTLE_PUBLIC_IP_RATE", default="120/min"),
+        "poll": env("THROTTLE_PUBLIC_POLL_RATE", default="6000/min"),
+    },
+    "vote": {
+        "ip": env("THROTTLE_VOTE_IP_RATE", default="60/min"),
+        "user": env("THROTTLE_VOTE_USER_RATE", default="30/min"),
+        "poll": env("THROTTLE_VOTE_POLL_RATE", default="3000/min"),
+    },
+    "graphql": {
+        "ip": env("THROTTLE_GRAPHQL_IP_RATE", default="300/min"),
+        "user": env("THROTTLE_GRAPHQL_USER_RATE", default="600/min"),
+    },
+    "graphql:generateInsight": {"user": env("THROTTLE_INSIGHT_USER_RATE", default="10/min")},
 }
 
 # JWT / Auth
@@ -331,21 +363,125 @@ CELERY_RESULT_BACKEND = CELERY_BROKER_URL
 CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
+CELERY_BEAT_SCHEDULE = {
+    "drain-distribution-events": {
+        "task": "apps.distribution.tasks.drain_distribution_events_task",
+        "schedule": env.float("DISTRIBUTION_EVENT_DRAIN_SECONDS", default=5.0),
+    },
+    "maintain-partitions": {
+        "task": "apps.core.tasks.maintain_partitions_task",
+        "schedule": 6 * 60 * 60,
+    },
+    "update-poll-funnels": {
+        "task": "apps.analytics.tasks.update_funnels_task",
+        "schedule": env.int("ANALYTICS_FUNNEL_INTERVAL_SECONDS", default=10 * 60),
+    },
+}
 # CELERY_TASK_TIME_LIMIT = 5 * 60
 # CELERY_TASK_SOFT_TIME_LIMIT = 60
 
 # Cache Configuration
 # ------------------------------------------------------------------------------
+REDIS_URL = env("REDIS_URL", default="redis://localhost:6379/1")
 CACHES = {
     "default": {
         "BACKEND": "django_redis.cache.RedisCache",
-        "LOCATION": env("REDIS_URL", default="redis://localhost:6379/1"),
+        "LOCATION": REDIS_URL,
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
         },
     }
 }
 
+# Public poll lookups by slug: shared cache, fronted by a per-process LRU
+PUBLIC_POLL_CACHE_SECONDS = env.int("PUBLIC_POLL_CACHE_SECONDS", default=3600)
+PUBLIC_POLL_LOCAL_CACHE_SECONDS = env.float("PUBLIC_POLL_LOCAL_CACHE_SECONDS", default=5.0)
+PUBLIC_POLL_LOCAL_CACHE_SIZE = env.int("PUBLIC_POLL_LOCAL_CACHE_SIZE", default=1024)
+# Rendered public poll pages, keyed by poll version and open state
+PUBLIC_POLL_PAGE_CACHE_SECONDS = env.int("PUBLIC_POLL_PAGE_CACHE_SECONDS", default=86400)
+
+# Creator analytics, invalidated by new activity (see apps/analytics/cache.py).
+# The TTL only bounds how far sliding periods can lag behind when nothing changes.
+ANALYTICS_CACHE_SECONDS = env.int("ANALYTICS_CACHE_SECONDS", default=3600)
+# Past their TTL, results are served for this long while a task refreshes them
+ANALYTICS_STALE_SECONDS = env.int("ANALYTICS_STALE_SECONDS", default=86400)
+# Funnel runs also recompute this much before their last run, for late events
+ANALYTICS_FUNNEL_LATENESS_SECONDS = env.int("ANALYTICS_FUNNEL_LATENESS_SECONDS", default=3600)
+# Top polls sets expire this long after being built, bounding drift from votes that race a rebuild
+ANALYTICS_LEADERBOARD_TTL_SECONDS = env.int("ANALYTICS_LEADERBOARD_TTL_SECONDS", default=3600)
+
+# Unique visitor and voter sketches (HyperLogLog, one per poll and day)
+UNIQUES_RETENTION_DAYS = env.int("UNIQUES_RETENTION_DAYS", default=400)
+# Sketches per PFCOUNT; larger unions are merged into a temporary sketch in chunks
+UNIQUES_MAX_KEYS = env.int("UNIQUES_MAX_KEYS", default=500)
+
+# Live Results
+# ------------------------------------------------------------------------------
+# Deltas are merged and fanned out to subscribers once per tick
+POLL_RESULTS_TICK_MS = env.int("POLL_RESULTS_TICK_MS", default=250)
+# Frames buffered per subscriber before it is dropped as a slow consumer
+POLL_RESULTS_SUBSCRIBER_QUEUE_SIZE = env.int("POLL_RESULTS_SUBSCRIBER_QUEUE_SIZE", default=64)
+
+# Response Exports
+# ------------------------------------------------------------------------------
+# Votes fetched per server-side cursor round trip, and written per response chunk
+POLL_EXPORT_CHUNK_SIZE = env.int("POLL_EXPORT_CHUNK_SIZE", default=2000)
+
+# Distribution Edge Caching
+# ------------------------------------------------------------------------------
+# Shared-cache lifetime of public poll responses; 0 keeps every hit on the origin
+DISTRIBUTION_EDGE_CACHE_SECONDS = env.int("DISTRIBUTION_EDGE_CACHE_SECONDS", default=0)
+# Purge endpoint, formatted with the surrogate key (e.g. ".../purge/{key}")
+DISTRIBUTION_PURGE_URL = env("DISTRIBUTION_PURGE_URL", default="")
+DISTRIBUTION_PURGE_TOKEN = env("DISTRIBUTION_PURGE_TOKEN", default="")
+# Lifetime of cached embed documents, which carry live tallies
+DISTRIBUTION_EMBED_CACHE_SECONDS = env.int("DISTRIBUTION_EMBED_CACHE_SECONDS", default=15)
+
+# QR Code Exports
+# ------------------------------------------------------------------------------
+# Worker processes rendering bulk exports (<= 1 renders in-process)
+QR_EXPORT_WORKERS = env.int("QR_EXPORT_WORKERS", default=4)
+# Polls per QR code export request
+QR_EXPORT_MAX_POLLS = env.int("QR_EXPORT_MAX_POLLS", default=1000)
+# Exports rendering at once across all web processes; more are answered 503
+QR_EXPORT_MAX_CONCURRENT = env.int("QR_EXPORT_MAX_CONCURRENT", default=2)
+# Pre-render new polls' QR codes on the worker. Only useful when the worker and
+# web services share media storage; otherwise codes are rendered on first request.
+QR_PRERENDER = env.bool("QR_PRERENDER", default=True)
+
+# Distribution Event Ingestion
+# ------------------------------------------------------------------------------
+# Events buffered in Redis before new ones are dropped
+DISTRIBUTION_EVENT_BUFFER_LIMIT = env.int("DISTRIBUTION_EVENT_BUFFER_LIMIT", default=200_000)
+# Rows per bulk insert, and bulk inserts per drain run
+DISTRIBUTION_EVENT_BATCH_SIZE = env.int("DISTRIBUTION_EVENT_BATCH_SIZE", default=2_000)
+DISTRIBUTION_EVENT_MAX_BATCHES = env.int("DISTRIBUTION_EVENT_MAX_BATCHES", default=50)
+# Events from one IP for one poll beyond this rate are filtered (0 disables).
+# Generous, as a venue or office NAT can put a whole audience behind one address
+DISTRIBUTION_BOT_IP_RATE = env.int("DISTRIBUTION_BOT_IP_RATE", default=600)
+DISTRIBUTION_BOT_IP_WINDOW = env.int("DISTRIBUTION_BOT_IP_WINDOW", default=60)
+
+# Table Partitioning (PostgreSQL)
+# ------------------------------------------------------------------------------
+# Append-only tables split into monthly partitions, see apps/core/partitioning.py.
+# Raw months older than retention_months are dropped once is_rolled_up confirms
+# their counts are kept elsewhere; None keeps them forever.
+PARTITIONED_TABLES = {
+    "distribution_distributionanalytics": {
+        "column": "timestamp",
+        "retention_months": env.int("DISTRIBUTION_EVENT_RETENTION_MONTHS", default=13),
+        "is_rolled_up": "apps.distribution.rollups.is_rolled_up",
+    },
+    "polls_pollview": {
+        "column": "created_at",
+        # Kept unless configured, some dashboards still read raw poll views
+        "retention_months": env.int("POLL_VIEW_RETENTION_MONTHS", default=None),
+        "is_rolled_up": "apps.analytics.rollups.is_rolled_up",
+    },
+}
+# Monthly partitions created ahead of time
+PARTITION_MONTHS_AHEAD = env.int("PARTITION_MONTHS_AHEAD", default=3)
+
 # AI Configuration
 # ------------------------------------------------------------------------------
 OPENAI_API_KEY = env("OPENAI_API_KEY", default=None)
@@ -1,7 +1,7 @@
 import ssl
 
 from .base import *  # noqa
-from .base import env
+from .base import REST_FRAMEWORK, env
 
 # import dj_database_url # Removed to avoid extra dependency
 
@@ -11,6 +11,8 @@ ALLOWED_HOSTS = env.list(
     "DJANGO_ALLOWED_HOSTS", default=["onrender.com", "plaudepoll.gabcares.xyz"]
 )
 USE_X_FORWARDED_HOST = True
+# Render's load balancer appends the client IP to X-Forwarded-For
+REST_FRAMEWORK = {**REST_FRAMEWORK, "NUM_PROXIES": env.int("NUM_PROXIES", default=1)}
 
 # Ensure Sentry knows this is production
 DJANGO_ENVIRONMENT = "production"
@@ -18,8 +20,17 @@ FRONTEND_URL = env("FRONTEND_URL")
 
 # Database (Neon)
 DATABASES = {"default": env.db("DATABASE_URL")}
-DATABASES["default"]["CONN_MAX_AGE"] = 60
+# Under ASGI each request's sync code runs in a new executor thread, so
+# persistent per-thread connections would never be reused and pile up.
+# Connections come from a per-process psycopg pool instead.
+DATABASES["default"]["CONN_MAX_AGE"] = 0
 DATABASES["default"]["OPTIONS"] = {
+    "pool": {
+        "min_size": env.int("DATABASE_POOL_MIN_SIZE", default=2),
+        "max_size": env.int("DATABASE_POOL_MAX_SIZE", default=10),
+        # Seconds a request waits for a free connection before failing
+        "timeout": env.int("DATABASE_POOL_TIMEOUT", default=10),
+    },
     "sslmode": "require",
     "connect_timeout": 5,
     "keepalives": 1,
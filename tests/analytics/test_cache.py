@@ -0,0 +1,119 @@
+from typing import Any
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from apps.analytics.cache import result_key
+from apps.analytics.services import AnalyticsService
+from apps.analytics.tasks import refresh_analytics_task
+from apps.polls.models import Option, Poll, PollView, Question, Vote
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestAnalyticsGenerations:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self) -> None:
+        cache.clear()
+
+    @pytest.fixture
+    def creator(self) -> Any:
+        return User.objects.create_user(email="creator@example.com", password="x")  # noqa: S106
+
+    @pytest.fixture
+    def question(self, creator: Any, django_capture_on_commit_callbacks: Any) -> Question:
+        with django_capture_on_commit_callbacks(execute=True):
+            poll = Poll.objects.create(title="Poll", created_by=creator)
+        question = Question.objects.create(poll=poll, text="Q1", question_type="single")
+        Option.objects.create(question=question, text="O1")
+        return question
+
+    def vote(self, question: Question) -> Vote:
+        voter = User.objects.create_user(email="voter@example.com", password="x")  # noqa: S106
+        return Vote.objects.create(user=voter, question=question, option=question.options.get())
+
+    def test_committed_vote_refreshes_cached_stats(
+        self, creator: Any, question: Question, django_capture_on_commit_callbacks: Any
+    ) -> None:
+        assert AnalyticsService.get_stats(creator)["total_responses"] == 0
+
+        with django_capture_on_commit_callbacks(execute=True):
+            self.vote(question)
+
+        # The previous result is served while a task (eager here) refreshes it
+        assert AnalyticsService.get_stats(creator)["total_responses"] == 0
+        assert AnalyticsService.get_stats(creator)["total_responses"] == 1
+
+    def test_new_generation_refreshes_once(
+        self,
+        creator: Any,
+        question: Question,
+        mocker: Any,
+        django_capture_on_commit_callbacks: Any,
+    ) -> None:
+        AnalyticsService.get_stats(creator)
+        with django_capture_on_commit_callbacks(execute=True):
+            self.vote(question)
+        delay = mocker.patch("apps.analytics.tasks.refresh_analytics_task.delay")
+        compute = mocker.spy(AnalyticsService, "compute_stats")
+
+        for _ in range(3):
+            assert AnalyticsService.get_stats(creator)["total_responses"] == 0
+
+        compute.assert_not_called()
+        delay.assert_called_once_with(
+            "stats", str(creator.id), "30d", result_key("stats", creator.id, "30d"), {}
+        )
+
+    def test_generation_is_bumped_on_commit_only(
+        self, creator: Any, question: Question, django_capture_on_commit_callbacks: Any
+    ) -> None:
+        key = result_key("stats", creator.id, "30d")
+
+        with django_capture_on_commit_callbacks(execute=False) as callbacks:
+            PollView.objects.create(poll=question.poll)
+        assert result_key("stats", creator.id, "30d") == key
+
+        for callback in callbacks:
+            callback()
+        assert result_key("stats", creator.id, "30d") != key
+
+    def test_other_creators_keep_their_cache(
+        self, creator: Any, question: Question, django_capture_on_commit_callbacks: Any
+    ) -> None:
+        other = User.objects.create_user(email="other@example.com", password="x")  # noqa: S106
+        key = result_key("trends", other.id, "7d")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            self.vote(question)
+
+        assert result_key("trends", other.id, "7d") == key
+
+    def test_new_poll_bumps_generation(
+        self, creator: Any, django_capture_on_commit_callbacks: Any
+    ) -> None:
+        key = result_key("stats", creator.id, "30d")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Poll.objects.create(title="Another", created_by=creator)
+
+        assert result_key("stats", creator.id, "30d") != key
+
+    def test_stale_stats_are_served_then_refreshed_by_task(
+        self, creator: Any, question: Question, mocker: Any
+    ) -> None:
+        AnalyticsService.get_stats(creator)
+        key = result_key("stats", creator.id, "30d")
+        entry = cache.get(key)
+        cache.set(key, {**entry, "fresh_until": 0})
+        # A vote the generation doesn't know about, e.g. one whose bump was lost
+        self.vote(question)
+        delay = mocker.patch("apps.analytics.tasks.refresh_analytics_task.delay")
+
+        assert AnalyticsService.get_stats(creator)["total_responses"] == 0
+        delay.assert_called_once_with("stats", str(creator.id), "30d", key, {})
+
+        refresh_analytics_task(*delay.call_args.args)
+        assert AnalyticsService.get_stats(creator)["total_responses"] == 1
@@ -0,0 +1,157 @@
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.analytics.funnels import WATERMARK, _ballots, update_funnels
+from apps.analytics.models import BatchWatermark, PollFunnel
+from apps.analytics.services import AnalyticsService
+from apps.distribution.models import DistributionEvent, DistributionRollup, RollupGranularity
+from apps.polls.models import Option, Poll, PollView, Question, Vote
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestPollFunnels:
+    @pytest.fixture
+    def user(self) -> Any:
+        return User.objects.create_user(
+            email="funnel@example.com",
+            password="password",  # pragma: allowlist secret  # noqa: S106
+        )
+
+    @pytest.fixture
+    def poll(self, user: Any) -> Poll:
+        return Poll.objects.create(title="Test Poll", created_by=user, slug="funnelpoll")
+
+    @pytest.fixture
+    def questions(self, poll: Poll) -> list[Question]:
+        questions = []
+        for text in ("Q1", "Q2"):
+            question = Question.objects.create(poll=poll, text=text, question_type="single")
+            Option.objects.create(question=question, text="O1")
+            questions.append(question)
+        return questions
+
+    def voter(self, name: str) -> Any:
+        return User.objects.create_user(email=f"{name}@example.com", password="x")  # noqa: S106
+
+    def vote(self, user: Any, question: Question, at: datetime | None = None) -> Vote:
+        vote = Vote.objects.create(user=user, question=question, option=question.options.get())
+        if at is not None:
+            Vote.objects.filter(pk=vote.pk).update(created_at=at)
+        return vote
+
+    def arrivals(self, poll: Poll, event_type: str, count: int, day: datetime) -> None:
+        DistributionRollup.objects.create(
+            poll=poll,
+            event_type=event_type,
+            granularity=RollupGranularity.DAY,
+            bucket=day.replace(hour=0, minute=0, second=0, microsecond=0),
+            count=count,
+        )
+
+    def today(self, poll: Poll) -> PollFunnel:
+        return PollFunnel.objects.get(poll=poll, day=timezone.now().astimezone(UTC).date())
+
+    def test_stages_are_counted(self, poll: Poll, questions: list[Question]) -> None:
+        now = timezone.now()
+        self.arrivals(poll, DistributionEvent.LINK_OPEN, 5, now)
+        self.arrivals(poll, DistributionEvent.QR_SCAN, 2, now)
+        for _ in range(4):
+            PollView.objects.create(poll=poll)
+        complete, partial = self.voter("complete"), self.voter("partial")
+        self.vote(complete, questions[0])
+        self.vote(complete, questions[1])
+        self.vote(partial, questions[0])
+
+        update_funnels()
+
+        funnel = self.today(poll)
+        assert (funnel.link_opens, funnel.qr_scans, funnel.embed_loads) == (5, 2, 0)
+        assert (funnel.views, funnel.first_votes, funnel.completed_ballots) == (4, 2, 1)
+
+    def test_ballots_are_dated_by_first_and_last_vote(
+        self, poll: Poll, questions: list[Question]
+    ) -> None:
+        voter = self.voter("slow")
+        yesterday = timezone.now() - timedelta(days=1)
+        self.vote(voter, questions[0], at=yesterday)
+        self.vote(voter, questions[1])
+
+        update_funnels()
+
+        earlier = PollFunnel.objects.get(poll=poll, day=yesterday.astimezone(UTC).date())
+        assert (earlier.first_votes, earlier.completed_ballots) == (1, 0)
+        assert (self.today(poll).first_votes, self.today(poll).completed_ballots) == (0, 1)
+
+    def test_only_recent_ballots_are_read(self, poll: Poll, questions: list[Question]) -> None:
+        old = datetime(2026, 1, 1, 12, tzinfo=UTC)
+        for name in ("first", "second"):
+            self.vote(self.voter(name), questions[0], at=old)
+        recent = self.voter("recent")
+        self.vote(recent, questions[0], at=old)
+        completing = self.vote(recent, questions[1])
+        completing.refresh_from_db()
+
+        ballots = _ballots(timezone.now() - timedelta(hours=1))
+
+        # Completed by the vote that answered the last remaining question
+        assert ballots == [(poll.id, old, completing.created_at)]
+
+    def test_runs_only_rewrite_days_since_the_watermark(
+        self, poll: Poll, questions: list[Question]
+    ) -> None:
+        old = datetime(2026, 1, 1, 12, tzinfo=UTC)
+        self.vote(self.voter("old"), questions[0], at=old)
+        update_funnels()
+        # Changed behind the job's back, before its watermark
+        PollFunnel.objects.filter(day=old.date()).update(first_votes=7)
+
+        late = self.voter("late")
+        self.vote(late, questions[0], at=old)
+        self.vote(late, questions[1])
+        update_funnels()
+
+        assert PollFunnel.objects.get(poll=poll, day=old.date()).first_votes == 7
+        assert self.today(poll).completed_ballots == 1
+        assert BatchWatermark.objects.get(name=WATERMARK).position <= timezone.now()
+
+    def test_rebuild_recomputes_every_day(self, poll: Poll, questions: list[Question]) -> None:
+        old = datetime(2026, 1, 1, 12, tzinfo=UTC)
+        self.vote(self.voter("old"), questions[0], at=old)
+        update_funnels()
+        PollFunnel.objects.filter(day=old.date()).update(first_votes=7)
+
+        call_command("rebuild_poll_funnels")
+
+        assert PollFunnel.objects.get(poll=poll, day=old.date()).first_votes == 1
+
+    def test_service_sums_the_period(
+        self, user: Any, poll: Poll, questions: list[Question]
+    ) -> None:
+        now = timezone.now()
+        self.arrivals(poll, DistributionEvent.EMBED_LOAD, 8, now)
+        self.arrivals(poll, DistributionEvent.EMBED_LOAD, 100, now - timedelta(days=60))
+        for _ in range(4):
+            PollView.objects.create(poll=poll)
+        voter = self.voter("voter")
+        self.vote(voter, questions[0])
+        self.vote(voter, questions[1])
+        update_funnels()
+
+        funnel = AnalyticsService.get_funnel(user, "30d")
+
+        assert funnel["arrivals"] == 8
+        assert {"channel": "EMBED_LOAD", "arrivals": 8} in funnel["channels"]
+        assert (funnel["views"], funnel["first_votes"], funnel["completed_ballots"]) == (4, 1, 1)
+        assert (funnel["view_rate"], funnel["vote_rate"], funnel["completion_rate"]) == (
+            50.0,
+            25.0,
+            100.0,
+        )
+        assert AnalyticsService.get_funnel(user, "30d", poll_slug="other")["arrivals"] == 0
@@ -0,0 +1,137 @@
+from datetime import timedelta
+from typing import Any
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from apps.analytics.leaderboard import add_votes, get_top_poll_ids, leaderboard_key
+from apps.analytics.models import PollDailyStats
+from apps.analytics.services import AnalyticsService
+from apps.polls.models import Option, Poll, PollView, Question, Vote
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestTopPolls:
+    @pytest.fixture
+    def creator(self) -> Any:
+        return User.objects.create_user(email="top@example.com", password="x")  # noqa: S106
+
+    def poll_with_votes(self, creator: Any, title: str, votes: int, views: int) -> Poll:
+        poll = Poll.objects.create(title=title, created_by=creator)
+        question = Question.objects.create(poll=poll, text="Q1", question_type="single")
+        option = Option.objects.create(question=question, text="O1")
+        for index in range(votes):
+            voter = User.objects.create_user(email=f"{title}{index}@example.com", password="x")  # noqa: S106
+            Vote.objects.create(user=voter, question=question, option=option)
+        for _ in range(views):
+            PollView.objects.create(poll=poll)
+        return poll
+
+    def test_counts_are_not_multiplied(self, creator: Any) -> None:
+        popular = self.poll_with_votes(creator, "popular", votes=3, views=4)
+        quiet = self.poll_with_votes(creator, "quiet", votes=1, views=10)
+
+        top = AnalyticsService.get_top_polls(creator, "30d", limit=5)
+
+        assert [(p.id, p.votes_count, p.views_count) for p in top] == [
+            (popular.id, 3, 4),
+            (quiet.id, 1, 10),
+        ]
+
+    def test_period_filters_old_activity(self, creator: Any) -> None:
+        old = self.poll_with_votes(creator, "old", votes=3, views=0)
+        recent = self.poll_with_votes(creator, "recent", votes=1, views=0)
+        PollDailyStats.objects.filter(poll=old).update(
+            day=timezone.now().date() - timedelta(days=60)
+        )
+
+        assert [p.id for p in AnalyticsService.get_top_polls(creator, "30d")] == [
+            recent.id,
+            old.id,
+        ]
+        assert [p.id for p in AnalyticsService.get_top_polls(creator, "all")] == [
+            old.id,
+            recent.id,
+        ]
+
+    def test_all_time_ranking_reads_leaderboard(self, creator: Any, mocker: Any) -> None:
+        first = self.poll_with_votes(creator, "first", votes=1, views=0)
+        second = self.poll_with_votes(creator, "second", votes=2, views=0)
+        client = mocker.Mock()
+        client.exists.return_value = True
+        client.zrevrange.return_value = [(str(first.id).encode(), 9.0), (b"999999", 5.0)]
+        mocker.patch("apps.analytics.leaderboard.get_redis", return_value=client)
+
+        # All time is the default period
+        top = AnalyticsService.get_top_polls(creator, limit=2)
+
+        # Ranked by the leaderboard, unknown ids skipped
+        assert [p.id for p in top] == [first.id]
+        client.zrevrange.assert_called_once_with(leaderboard_key(creator.id), 0, 1, withscores=True)
+        assert second.id not in [p.id for p in top]
+
+
+class TestLeaderboard:
+    @pytest.fixture
+    def client(self, mocker: Any) -> Any:
+        client = mocker.Mock()
+        mocker.patch("apps.analytics.leaderboard.get_redis", return_value=client)
+        return client
+
+    def test_votes_only_update_existing_sets(self, client: Any) -> None:
+        add_votes("user", 7, 1)
+        client.zadd.assert_called_once_with("top_polls:user", {"7": 1}, xx=True, incr=True)
+
+    @pytest.mark.django_db
+    def test_missing_set_is_rebuilt_from_rollups(self, client: Any) -> None:
+        creator = User.objects.create_user(email="lb@example.com", password="x")  # noqa: S106
+        poll = Poll.objects.create(title="Poll", created_by=creator)
+        PollDailyStats.objects.create(poll=poll, day=timezone.now().date(), votes=4)
+        client.exists.return_value = False
+        client.zrevrange.return_value = [(str(poll.id).encode(), 4.0)]
+
+        assert get_top_poll_ids(creator.id, 5) == [(poll.id, 4)]
+
+        pipe = client.pipeline.return_value
+        pipe.zadd.assert_called_once_with(f"top_polls:{creator.id}:rebuild", {str(poll.id): 4})
+        pipe.rename.assert_called_once_with(
+            f"top_polls:{creator.id}:rebuild", f"top_polls:{creator.id}"
+        )
+
+    @pytest.mark.django_db
+    def test_rebuilt_set_expires(self, client: Any, settings: Any) -> None:
+        settings.ANALYTICS_LEADERBOARD_TTL_SECONDS = 600
+        creator = User.objects.create_user(email="lb@example.com", password="x")  # noqa: S106
+        Poll.objects.create(title="Poll", created_by=creator)
+        client.exists.return_value = False
+        client.zrevrange.return_value = []
+
+        get_top_poll_ids(creator.id, 5)
+
+        # Drift from votes racing the rebuild lasts at most until the next one
+        pipe = client.pipeline.return_value
+        pipe.expire.assert_called_once_with(f"top_polls:{creator.id}", 600)
+        client.expire.assert_not_called()
+
+    def test_no_redis(self, mocker: Any) -> None:
+        mocker.patch("apps.analytics.leaderboard.get_redis", return_value=None)
+        assert get_top_poll_ids("user", 5) is None
+
+    @pytest.mark.django_db
+    def test_committed_vote_scores_its_poll(
+        self, client: Any, django_capture_on_commit_callbacks: Any
+    ) -> None:
+        creator = User.objects.create_user(email="lb@example.com", password="x")  # noqa: S106
+        poll = Poll.objects.create(title="Poll", created_by=creator)
+        question = Question.objects.create(poll=poll, text="Q1", question_type="single")
+        option = Option.objects.create(question=question, text="O1")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Vote.objects.create(user=creator, question=question, option=option)
+
+        client.zadd.assert_called_once_with(
+            f"top_polls:{creator.id}", {str(poll.id): 1}, xx=True, incr=True
+        )
@@ -0,0 +1,127 @@
+from datetime import UTC, date, datetime, timedelta
+from typing import Any
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.analytics.models import PollDailyStats
+from apps.analytics.rollups import is_rolled_up, rebuild_daily_stats
+from apps.analytics.services import AnalyticsService
+from apps.polls.models import Option, Poll, PollView, Question, Vote
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestPollDailyStats:
+    @pytest.fixture
+    def user(self) -> Any:
+        return User.objects.create_user(
+            email="daily@example.com",
+            password="password",  # pragma: allowlist secret  # noqa: S106
+        )
+
+    @pytest.fixture
+    def poll(self, user: Any) -> Poll:
+        return Poll.objects.create(title="Test Poll", created_by=user, slug="dailypoll")
+
+    @pytest.fixture
+    def questions(self, poll: Poll) -> list[Question]:
+        questions = []
+        for text in ("Q1", "Q2"):
+            question = Question.objects.create(poll=poll, text=text, question_type="single")
+            Option.objects.create(question=question, text="O1")
+            questions.append(question)
+        return questions
+
+    def vote(self, user: Any, question: Question) -> Vote:
+        return Vote.objects.create(user=user, question=question, option=question.options.get())
+
+    def today(self, poll: Poll) -> PollDailyStats:
+        return PollDailyStats.objects.get(poll=poll, day=timezone.now().astimezone(UTC).date())
+
+    def test_votes_and_views_are_rolled_up(
+        self, user: Any, poll: Poll, questions: list[Question]
+    ) -> None:
+        other = User.objects.create_user(email="other@example.com", password="x")  # noqa: S106
+        self.vote(user, questions[0])
+        self.vote(user, questions[1])
+        self.vote(other, questions[0])
+        PollView.objects.create(poll=poll)
+        PollView.objects.create(poll=poll, user=user)
+
+        stats = self.today(poll)
+        assert (stats.votes, stats.views, stats.unique_voters) == (3, 2, 2)
+
+    def test_deleted_votes_are_removed(
+        self, user: Any, poll: Poll, questions: list[Question]
+    ) -> None:
+        first = self.vote(user, questions[0])
+        second = self.vote(user, questions[1])
+
+        first.delete()
+        assert (self.today(poll).votes, self.today(poll).unique_voters) == (1, 1)
+        second.delete()
+        assert (self.today(poll).votes, self.today(poll).unique_voters) == (0, 0)
+
+    def test_rebuild_matches_raw_rows(
+        self, user: Any, poll: Poll, questions: list[Question]
+    ) -> None:
+        vote = self.vote(user, questions[0])
+        old = datetime(2026, 1, 1, 12, tzinfo=UTC)
+        Vote.objects.filter(pk=vote.pk).update(created_at=old)
+        for _ in range(2):
+            view = PollView.objects.create(poll=poll)
+            PollView.objects.filter(pk=view.pk).update(created_at=old)
+
+        call_command("rebuild_poll_daily_stats", poll="dailypoll")
+
+        stats = PollDailyStats.objects.get(poll=poll)
+        assert (stats.day, stats.votes, stats.views, stats.unique_voters) == (
+            date(2026, 1, 1),
+            1,
+            2,
+            1,
+        )
+
+    def test_rebuild_keeps_stats_of_dropped_partitions(
+        self, user: Any, poll: Poll, questions: list[Question], mocker: Any
+    ) -> None:
+        mocker.patch(
+            "apps.analytics.management.commands.rebuild_poll_daily_stats.retained_since",
+            return_value=datetime(2026, 2, 1, tzinfo=UTC),
+        )
+        # January's raw views are gone, only their stats remain
+        PollDailyStats.objects.create(poll=poll, day=date(2026, 1, 5), views=40)
+        self.vote(user, questions[0])
+
+        call_command("rebuild_poll_daily_stats")
+
+        assert PollDailyStats.objects.get(poll=poll, day=date(2026, 1, 5)).views == 40
+        assert self.today(poll).votes == 1
+
+    def test_is_rolled_up(self, poll: Poll) -> None:
+        start = timezone.now().astimezone(UTC).replace(hour=0, minute=0, second=0, microsecond=0)
+        end = start + timedelta(days=1)
+        PollView.objects.create(poll=poll)
+        assert is_rolled_up(start, end)
+
+        PollDailyStats.objects.all().delete()
+        assert not is_rolled_up(start, end)
+        rebuild_daily_stats()
+        assert is_rolled_up(start, end)
+
+    def test_trends_read_daily_stats(
+        self, user: Any, poll: Poll, questions: list[Question]
+    ) -> None:
+        self.vote(user, questions[0])
+        self.vote(user, questions[1])
+
+        trends = AnalyticsService.compute_trends(user, period="7d")
+
+        today = timezone.now().astimezone(UTC).date()
+        assert trends["granularity"] == "day"
+        assert len(trends["response_rate"]) == 8
+        assert trends["response_rate"][-1] == {"date": f"{today} 00:00:00+00:00", "value": 2.0}
@@ -6,6 +6,7 @@ import pytest
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 
+from apps.analytics.rollups import rebuild_daily_stats
 from apps.analytics.services import AnalyticsService
 from apps.polls.models import Option, Poll, PollView, Question, Vote
 
@@ -16,7 +17,7 @@ User = get_user_model()
 class TestAnalyticsService:
     @pytest.fixture(autouse=True)
     def mock_cache(self) -> Any:
-        with mock.patch("apps.analytics.services.cache") as mock_cache:
+        with mock.patch("apps.core.swr.cache") as mock_cache:
             mock_cache.get.return_value = None
             yield mock_cache
 
@@ -77,10 +78,47 @@ class TestAnalyticsService:
         mock_cache.set.assert_called()
 
         # Test cache hit
-        mock_cache.get.return_value = stats
+        mock_cache.get.return_value = mock_cache.set.call_args.args[1]
         cached_stats = AnalyticsService.get_stats(user, period="30d")
         assert cached_stats == stats
 
+    def test_get_stats_counts_both_periods(self, user: Any, mock_cache: Any) -> None:
+        poll = Poll.objects.create(title="Poll", created_by=user)
+        question = Question.objects.create(poll=poll, text="Q1", question_type="single")
+        option = Option.objects.create(question=question, text="O1")
+        voter = User.objects.create_user(email="voter@example.com", password="x")  # noqa: S106
+        old = timezone.now() - timedelta(days=40)
+        Poll.objects.filter(pk=poll.pk).update(created_at=old)
+        Vote.objects.create(user=user, question=question, option=option)
+        Vote.objects.create(user=voter, question=question, option=option)
+        Vote.objects.filter(user=voter).update(created_at=old)
+        for created_at in (old, old - timedelta(days=1), timezone.now()):
+            PollView.objects.filter(pk=PollView.objects.create(poll=poll).pk).update(
+                created_at=created_at
+            )
+        # Outside both periods
+        PollView.objects.filter(pk=PollView.objects.create(poll=poll).pk).update(
+            created_at=old - timedelta(days=30)
+        )
+        # Backdating bypasses the rollups
+        rebuild_daily_stats()
+
+        stats = AnalyticsService.get_stats(user, period="30d")
+
+        assert stats["total_polls"] == 1
+        assert stats["polls_change"] == -100.0
+        assert stats["total_responses"] == 1
+        assert stats["responses_change"] == 0.0
+        assert stats["total_views"] == 1
+        assert stats["views_change"] == -50.0
+
+    def test_get_stats_cache_miss_takes_two_queries(
+        self, user: Any, setup_data: Any, django_assert_num_queries: Any
+    ) -> None:
+        # Polls, then votes and views from the daily rollups
+        with django_assert_num_queries(2):
+            AnalyticsService.get_stats(user, period="30d")
+
     def test_get_trends(self, user: Any, setup_data: Any, mock_cache: Any) -> None:
         """Test trend data generation."""
         trends = AnalyticsService.get_trends(user, period="7d")
@@ -0,0 +1,160 @@
+from datetime import UTC, datetime, timedelta
+from typing import Any
+from zoneinfo import ZoneInfo
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db.models import Count
+
+from apps.analytics.services import AnalyticsService
+from apps.analytics.trends import (
+    DAY,
+    HOUR,
+    MONTH,
+    WEEK,
+    bucket_starts,
+    default_granularity,
+    get_timezone,
+    series,
+)
+from apps.polls.models import Option, Poll, Question, Vote
+
+User = get_user_model()
+
+
+class TestBuckets:
+    def test_weeks_start_on_monday(self) -> None:
+        # Wednesday to the next Tuesday
+        buckets = bucket_starts(
+            datetime(2026, 10, 14, 12, tzinfo=UTC),
+            datetime(2026, 10, 20, 12, tzinfo=UTC),
+            WEEK,
+            UTC,
+        )
+        assert buckets == [datetime(2026, 10, 12), datetime(2026, 10, 19)]
+
+    def test_months_cross_years(self) -> None:
+        buckets = bucket_starts(
+            datetime(2025, 11, 30, tzinfo=UTC), datetime(2026, 1, 2, tzinfo=UTC), MONTH, UTC
+        )
+        assert buckets == [datetime(2025, 11, 1), datetime(2025, 12, 1), datetime(2026, 1, 1)]
+
+    def test_days_follow_the_timezone(self) -> None:
+        # 23:30 UTC is already the next day in Paris
+        buckets = bucket_starts(
+            datetime(2026, 10, 18, 23, 30, tzinfo=UTC),
+            datetime(2026, 10, 19, 23, 30, tzinfo=UTC),
+            DAY,
+            ZoneInfo("Europe/Paris"),
+        )
+        assert buckets == [datetime(2026, 10, 19), datetime(2026, 10, 20)]
+
+    def test_too_many_points_are_refused(self) -> None:
+        with pytest.raises(ValueError, match="coarser"):
+            bucket_starts(
+                datetime(2025, 1, 1, tzinfo=UTC), datetime(2026, 1, 1, tzinfo=UTC), HOUR, UTC
+            )
+
+    def test_default_granularity(self) -> None:
+        assert default_granularity(timedelta(days=7)) == DAY
+        assert default_granularity(timedelta(days=90)) == WEEK
+        assert default_granularity(timedelta(days=365)) == MONTH
+
+    def test_unknown_timezone(self) -> None:
+        with pytest.raises(ValueError, match="Unknown timezone"):
+            get_timezone("Mars/Olympus_Mons")
+
+
+@pytest.mark.django_db
+class TestSeries:
+    @pytest.fixture
+    def creator(self) -> Any:
+        return User.objects.create_user(email="trends@example.com", password="x")  # noqa: S106
+
+    @pytest.fixture
+    def question(self, creator: Any) -> Question:
+        poll = Poll.objects.create(title="Poll", created_by=creator)
+        question = Question.objects.create(poll=poll, text="Q1", question_type="single")
+        Option.objects.create(question=question, text="O1")
+        return question
+
+    def vote_at(self, question: Question, moment: datetime) -> None:
+        voter = User.objects.create_user(email=f"{moment:%d%H}@example.com", password="x")  # noqa: S106
+        vote = Vote.objects.create(user=voter, question=question, option=question.options.get())
+        Vote.objects.filter(pk=vote.pk).update(created_at=moment)
+
+    def test_gaps_are_zero_filled(self, question: Question) -> None:
+        self.vote_at(question, datetime(2026, 10, 15, 10, tzinfo=UTC))
+        self.vote_at(question, datetime(2026, 10, 15, 11, tzinfo=UTC))
+        self.vote_at(question, datetime(2026, 10, 17, 9, tzinfo=UTC))
+
+        points = series(
+            Vote.objects.all(),
+            "created_at",
+            Count("id"),
+            datetime(2026, 10, 14, 12, tzinfo=UTC),
+            datetime(2026, 10, 18, 12, tzinfo=UTC),
+            DAY,
+            UTC,
+        )
+
+        assert [(bucket.day, value) for bucket, value in points] == [
+            (14, 0.0),
+            (15, 2.0),
+            (16, 0.0),
+            (17, 1.0),
+            (18, 0.0),
+        ]
+
+    def test_postgres_fills_gaps_with_generate_series(self, mocker: Any) -> None:
+        connection = mocker.MagicMock(vendor="postgresql")
+        mocker.patch("apps.analytics.trends.connection", connection)
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.fetchall.return_value = [(datetime(2026, 10, 14), 0), (datetime(2026, 10, 15), 2)]
+        tz = ZoneInfo("Europe/Paris")
+        votes = Vote.objects.all()
+
+        points = series(
+            votes,
+            "created_at",
+            Count("id"),
+            datetime(2026, 10, 14, 12, tzinfo=UTC),
+            datetime(2026, 10, 15, 12, tzinfo=UTC),
+            DAY,
+            tz,
+        )
+
+        sql, params = cursor.execute.call_args.args
+        assert sql.startswith(
+            "SELECT series.bucket, COALESCE(data.value, 0) "
+            "FROM generate_series(%s::timestamp, %s::timestamp, %s::interval) AS series(bucket) "
+            "LEFT JOIN ("
+        )
+        assert sql.endswith(") AS data ON data.bucket = series.bucket ORDER BY series.bucket")
+        # Naive local bucket starts, then the aggregate's own parameters
+        assert params[:3] == [datetime(2026, 10, 14), datetime(2026, 10, 15), "1 day"]
+        # The joined buckets are truncated in the caller's timezone
+        assert "Europe/Paris" in params[3:]
+        # Rows come back as local wall-clock buckets
+        assert points == [
+            (datetime(2026, 10, 14, tzinfo=tz), 0.0),
+            (datetime(2026, 10, 15, tzinfo=tz), 2.0),
+        ]
+
+    def test_hourly_trends_in_local_time(self, creator: Any, question: Question) -> None:
+        now = datetime.now(UTC)
+        self.vote_at(question, now - timedelta(hours=3))
+
+        trends = AnalyticsService.compute_trends(
+            creator, period="7d", granularity=HOUR, tz_name="Asia/Kolkata"
+        )
+
+        assert trends["granularity"] == HOUR
+        assert trends["timezone"] == "Asia/Kolkata"
+        assert len(trends["response_rate"]) in (7 * 24, 7 * 24 + 1)
+        assert sum(point["value"] for point in trends["response_rate"]) == 1.0
+        assert trends["response_rate"][-1]["date"].endswith("+05:30")
+
+    def test_unknown_granularity(self, creator: Any) -> None:
+        with pytest.raises(ValueError, match="granularity"):
+            AnalyticsService.compute_trends(creator, granularity="fortnight")
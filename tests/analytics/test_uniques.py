@@ -0,0 +1,138 @@
+from datetime import UTC, datetime
+from typing import Any
+
+import pytest
+from django.contrib.auth import get_user_model
+
+from apps.analytics.uniques import (
+    VISITORS,
+    VOTERS,
+    count_uniques,
+    record_uniques,
+    sketch_key,
+    visitor_id,
+)
+from apps.distribution.ingest import record_unique_visitors
+from apps.distribution.models import DistributionAnalytics, DistributionEvent
+from apps.polls.models import Option, Poll, Question, Vote
+
+User = get_user_model()
+
+
+class TestUniques:
+    @pytest.fixture
+    def client(self, mocker: Any) -> Any:
+        client = mocker.Mock()
+        mocker.patch("apps.analytics.uniques.get_redis", return_value=client)
+        return client
+
+    def test_visitor_id(self) -> None:
+        assert visitor_id(42, "1.2.3.4", "UA") == "u:42"
+        anonymous = visitor_id(None, "1.2.3.4", "UA")
+        assert anonymous.startswith("a:")
+        assert "1.2.3.4" not in anonymous
+        assert anonymous == visitor_id(None, "1.2.3.4", "UA")
+        assert anonymous != visitor_id(None, "1.2.3.4", "Other UA")
+
+    def test_record_groups_members_by_daily_sketch(self, client: Any) -> None:
+        morning = datetime(2026, 10, 19, 8, tzinfo=UTC)
+        evening = datetime(2026, 10, 19, 20, tzinfo=UTC)
+        record_uniques(VISITORS, [(1, morning, "a"), (1, evening, "b"), (2, morning, "a")])
+
+        pipe = client.pipeline.return_value
+        added = {call.args[0]: set(call.args[1:]) for call in pipe.pfadd.call_args_list}
+        assert added == {
+            "hll:visitors:1:20261019": {"a", "b"},
+            "hll:visitors:2:20261019": {"a"},
+        }
+        assert pipe.expire.call_count == 2
+        pipe.execute.assert_called_once()
+
+    def test_count_merges_polls_and_days(self, client: Any) -> None:
+        client.pfcount.return_value = 7
+
+        count = count_uniques(
+            VOTERS,
+            [1, 2],
+            datetime(2026, 10, 18, 23, tzinfo=UTC),
+            datetime(2026, 10, 19, 1, tzinfo=UTC),
+        )
+
+        assert count == 7
+        assert set(client.pfcount.call_args.args) == {
+            sketch_key(VOTERS, poll_id, day)
+            for poll_id in (1, 2)
+            for day in (datetime(2026, 10, 18).date(), datetime(2026, 10, 19).date())
+        }
+
+    def test_large_unions_are_merged_in_chunks(self, client: Any, settings: Any) -> None:
+        settings.UNIQUES_MAX_KEYS = 3
+        pipe = client.pipeline.return_value
+        pipe.execute.return_value = [1, True, 1, 1, 9, 1]
+
+        count = count_uniques(
+            VISITORS,
+            [1, 2],
+            datetime(2026, 10, 17, tzinfo=UTC),
+            datetime(2026, 10, 19, tzinfo=UTC),
+        )
+
+        assert count == 9
+        client.pfcount.assert_not_called()
+        merges = [call.args for call in pipe.pfmerge.call_args_list]
+        assert [len(args) - 1 for args in merges] == [3, 3]
+        union = merges[0][0]
+        assert {args[0] for args in merges} == {union}
+        pipe.pfcount.assert_called_once_with(union)
+        pipe.delete.assert_called_once_with(union)
+
+    def test_count_without_redis(self) -> None:
+        assert count_uniques(VISITORS, [1], datetime(2026, 10, 19, tzinfo=UTC)) is None
+
+
+@pytest.mark.django_db
+class TestUniqueFeeds:
+    @pytest.fixture
+    def poll(self) -> Poll:
+        user = User.objects.create_user(
+            email="uniques@example.com",
+            password="password",  # pragma: allowlist secret  # noqa: S106
+        )
+        return Poll.objects.create(title="Test Poll", created_by=user, slug="testpoll")
+
+    def test_bots_are_not_visitors(self, mocker: Any, poll: Poll) -> None:
+        record = mocker.patch("apps.distribution.ingest.record_uniques")
+        timestamp = datetime(2026, 10, 19, tzinfo=UTC)
+        rows = [
+            DistributionAnalytics(
+                poll=poll, event_type=DistributionEvent.LINK_OPEN, timestamp=timestamp, **fields
+            )
+            for fields in (
+                {"user_agent": "Mozilla/5.0", "device_type": "desktop"},
+                {"user_agent": "Googlebot/2.1", "device_type": "bot"},
+            )
+        ]
+
+        record_unique_visitors(rows)
+
+        kind, members = record.call_args.args
+        assert kind == VISITORS
+        assert [(poll_id, member) for poll_id, _, member in members] == [
+            (poll.id, visitor_id(None, None, "Mozilla/5.0"))
+        ]
+
+    def test_vote_feeds_voter_sketch(
+        self, mocker: Any, poll: Poll, django_capture_on_commit_callbacks: Any
+    ) -> None:
+        record = mocker.patch("apps.polls.signals.record_uniques")
+        question = Question.objects.create(poll=poll, text="Q1", question_type="single")
+        option = Option.objects.create(question=question, text="O1")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Vote.objects.create(user=poll.created_by, question=question, option=option)
+
+        kind, members = record.call_args.args
+        assert kind == VOTERS
+        assert [(poll_id, member) for poll_id, _, member in members] == [
+            (poll.id, f"u:{poll.created_by.id}")
+        ]
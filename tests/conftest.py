@@ -11,6 +11,15 @@ from rest_framework.test import APIClient
 User = get_user_model()
 
 
+@pytest.fixture(autouse=True)
+def media_root(settings: Any, tmp_path: Any) -> Any:
+    """
+    Keeps files written by tests (e.g. pre-rendered QR codes) out of the repository.
+    """
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
 @pytest.fixture
 def api_client() -> APIClient:
     """
@@ -0,0 +1,203 @@
+from datetime import UTC, date, datetime
+from importlib import import_module
+from typing import Any
+
+import pytest
+from django.core.management import call_command
+
+from apps.core.partitioning import (
+    PartitionPolicy,
+    add_months,
+    create_partition,
+    drop_expired_partitions,
+    ensure_partitions,
+    get_partition_policies,
+    maintain_partitions,
+    month_bounds,
+    retained_since,
+)
+from apps.distribution.rollups import is_rolled_up
+
+TABLE = "distribution_distributionanalytics"
+
+
+class TestPartitioning:
+    @pytest.fixture
+    def connection(self, mocker: Any) -> Any:
+        connection = mocker.MagicMock()
+        connection.ops.quote_name = lambda name: f'"{name}"'
+        mocker.patch("apps.core.partitioning.is_partitioned", return_value=True)
+        return connection
+
+    def test_month_arithmetic(self) -> None:
+        assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+        assert add_months(date(2026, 1, 1), -13) == date(2024, 12, 1)
+        assert month_bounds(date(2026, 12, 1)) == (
+            datetime(2026, 12, 1, tzinfo=UTC),
+            datetime(2027, 1, 1, tzinfo=UTC),
+        )
+
+    def test_ensure_partitions_creates_missing_months(self, mocker: Any, connection: Any) -> None:
+        mocker.patch(
+            "apps.core.partitioning.list_partitions",
+            return_value={date(2026, 10, 1): f"{TABLE}_p202610"},
+        )
+        create = mocker.patch(
+            "apps.core.partitioning.create_partition", side_effect=lambda t, c, m, conn: str(m)
+        )
+
+        created = ensure_partitions(TABLE, "timestamp", 2, date(2026, 10, 19), connection)
+
+        assert created == ["2026-11-01", "2026-12-01"]
+        assert create.call_count == 2
+
+    def test_drop_expired_partitions_keeps_unrolled_months(
+        self, mocker: Any, connection: Any
+    ) -> None:
+        mocker.patch(
+            "apps.core.partitioning.list_partitions",
+            return_value={
+                date(2025, 8, 1): f"{TABLE}_p202508",
+                date(2025, 9, 1): f"{TABLE}_p202509",
+                date(2025, 10, 1): f"{TABLE}_p202510",
+            },
+        )
+        policy = PartitionPolicy(
+            TABLE,
+            "timestamp",
+            retention_months=12,
+            is_rolled_up=lambda start, end: start.month != 9,
+        )
+
+        dropped = drop_expired_partitions(policy, date(2026, 10, 19), connection)
+
+        assert dropped == [f"{TABLE}_p202508"]
+        cursor = connection.cursor.return_value.__enter__.return_value
+        assert [call.args[0] for call in cursor.execute.call_args_list] == [
+            f'ALTER TABLE "{TABLE}" DETACH PARTITION "{TABLE}_p202508"',
+            f'DROP TABLE "{TABLE}_p202508"',
+        ]
+
+    def test_retained_since_is_the_oldest_partition(self, mocker: Any, connection: Any) -> None:
+        mocker.patch(
+            "apps.core.partitioning.list_partitions",
+            return_value={
+                date(2025, 10, 1): f"{TABLE}_p202510",
+                date(2025, 9, 1): f"{TABLE}_p202509",
+            },
+        )
+
+        assert retained_since(TABLE, connection) == datetime(2025, 9, 1, tzinfo=UTC)
+
+    def statements(self, connection: Any) -> list[str]:
+        cursor = connection.cursor.return_value.__enter__.return_value
+        return [" ".join(call.args[0].split()) for call in cursor.execute.call_args_list]
+
+    def test_create_partition_moves_rows_out_of_the_default(self, connection: Any) -> None:
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.fetchone.return_value = (f"{TABLE}_default",)
+
+        name = create_partition(TABLE, "timestamp", date(2026, 11, 1), connection)
+
+        assert name == f"{TABLE}_p202611"
+        assert self.statements(connection) == [
+            f'CREATE TABLE "{name}" (LIKE "{TABLE}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+            "SELECT to_regclass(%s)",
+            f'WITH moved AS (DELETE FROM "{TABLE}_default" WHERE "timestamp" >= %s '  # noqa: S608
+            f'AND "timestamp" < %s RETURNING *) INSERT INTO "{name}" SELECT * FROM moved',
+            f'ALTER TABLE "{TABLE}" ATTACH PARTITION "{name}" FOR VALUES FROM (%s) TO (%s)',
+        ]
+        assert cursor.execute.call_args.args[1] == [
+            datetime(2026, 11, 1, tzinfo=UTC),
+            datetime(2026, 12, 1, tzinfo=UTC),
+        ]
+
+    @pytest.mark.django_db
+    def test_maintain_partitions_runs_every_policy(self, mocker: Any) -> None:
+        ensure = mocker.patch(
+            "apps.core.partitioning.ensure_partitions", side_effect=lambda t, c, m: [f"{t}_new"]
+        )
+        drop = mocker.patch(
+            "apps.core.partitioning.drop_expired_partitions",
+            side_effect=lambda policy: [f"{policy.table}_old"],
+        )
+
+        created, dropped = maintain_partitions(months_ahead=2)
+
+        assert created == [f"{TABLE}_new", "polls_pollview_new"]
+        assert dropped == [f"{TABLE}_old", "polls_pollview_old"]
+        assert [call.args for call in ensure.call_args_list] == [
+            (TABLE, "timestamp", 2),
+            ("polls_pollview", "created_at", 2),
+        ]
+        assert drop.call_count == 2
+
+    def test_migration_converts_the_table(self, mocker: Any, connection: Any) -> None:
+        migration = import_module("apps.polls.migrations.0011_partition_pollview")
+        connection.vendor = "postgresql"
+        cursor = connection.cursor.return_value.__enter__.return_value
+        # Not partitioned yet, then the oldest row and max id
+        cursor.fetchone.side_effect = [None, (datetime(2026, 9, 20, tzinfo=UTC), 41)]
+        cursor.fetchall.side_effect = [
+            [('CREATE INDEX "views_day" ON public.polls_pollview USING btree (created_at)',)],
+            [("views_poll_fk", "FOREIGN KEY (poll_id) REFERENCES polls_poll(id)")],
+        ]
+        mocker.patch.object(migration, "MONTHS_AHEAD", 0)
+        mocker.patch.object(
+            migration, "datetime", mocker.Mock(now=lambda tz: datetime(2026, 10, 19, tzinfo=tz))
+        )
+
+        migration.partition(None, mocker.Mock(connection=connection))
+
+        statements = self.statements(connection)
+        assert statements == [
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)",
+            'LOCK TABLE "polls_pollview" IN ACCESS EXCLUSIVE MODE',
+            "SELECT pg_get_indexdef(i.indexrelid) FROM pg_index i WHERE i.indrelid = "
+            "to_regclass(%s) AND NOT i.indisprimary AND NOT i.indisunique",
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+            'SELECT min("created_at"), max(id) FROM "polls_pollview"',
+            'CREATE TABLE "polls_pollview_partitioned" (LIKE "polls_pollview" INCLUDING '
+            'DEFAULTS INCLUDING CONSTRAINTS) PARTITION BY RANGE ("created_at")',
+            'CREATE TABLE "polls_pollview_default" PARTITION OF "polls_pollview_partitioned" '
+            "DEFAULT",
+            'CREATE TABLE "polls_pollview_p202609" (LIKE "polls_pollview_partitioned" '
+            "INCLUDING DEFAULTS INCLUDING CONSTRAINTS)",
+            'ALTER TABLE "polls_pollview_partitioned" ATTACH PARTITION "polls_pollview_p202609" '
+            "FOR VALUES FROM (%s) TO (%s)",
+            'CREATE TABLE "polls_pollview_p202610" (LIKE "polls_pollview_partitioned" '
+            "INCLUDING DEFAULTS INCLUDING CONSTRAINTS)",
+            'ALTER TABLE "polls_pollview_partitioned" ATTACH PARTITION "polls_pollview_p202610" '
+            "FOR VALUES FROM (%s) TO (%s)",
+            'INSERT INTO "polls_pollview_partitioned" SELECT * FROM "polls_pollview"',
+            'DROP TABLE "polls_pollview"',
+            'ALTER TABLE "polls_pollview_partitioned" RENAME TO "polls_pollview"',
+            'CREATE SEQUENCE "polls_pollview_id_seq" OWNED BY "polls_pollview".id',
+            'ALTER TABLE "polls_pollview" ALTER COLUMN id SET DEFAULT nextval(%s::regclass)',
+            "SELECT setval(%s, %s, false)",
+            'ALTER TABLE "polls_pollview" ADD CONSTRAINT "polls_pollview_pkey" '
+            'PRIMARY KEY (id, "created_at")',
+            'CREATE INDEX "views_day" ON public.polls_pollview USING btree (created_at)',
+            'ALTER TABLE "polls_pollview" ADD CONSTRAINT "views_poll_fk" '
+            "FOREIGN KEY (poll_id) REFERENCES polls_poll(id)",
+        ]
+
+    def test_migrations_skip_other_databases(self, mocker: Any) -> None:
+        connection = mocker.MagicMock(vendor="sqlite")
+        for module in (
+            "apps.polls.migrations.0011_partition_pollview",
+            "apps.distribution.migrations.0006_partition_distributionanalytics",
+        ):
+            import_module(module).partition(None, mocker.Mock(connection=connection))
+
+        connection.cursor.assert_not_called()
+
+    def test_policies_from_settings(self) -> None:
+        policies = {policy.table: policy for policy in get_partition_policies()}
+        assert policies[TABLE].is_rolled_up is is_rolled_up
+        assert policies["polls_pollview"].column == "created_at"
+
+    def test_command_without_postgres(self, capsys: Any) -> None:
+        call_command("maintain_partitions")
+        assert "does not support partitioning" in capsys.readouterr().out
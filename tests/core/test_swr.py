@@ -0,0 +1,88 @@
+import time
+from typing import Any
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+
+from apps.core import swr
+from apps.core.swr import get_or_compute, is_stale, lock_key, recompute, store
+
+
+class TestStaleWhileRevalidate:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self) -> None:
+        cache.clear()
+
+    def make_stale(self, key: str) -> None:
+        entry = cache.get(key)
+        entry["fresh_until"] = time.time() - 1
+        cache.set(key, entry)
+
+    def test_cold_miss_computes_and_caches(self) -> None:
+        compute = mock.Mock(return_value=1)
+
+        assert get_or_compute("key", compute, ttl=60, stale_ttl=60) == 1
+        assert get_or_compute("key", compute, ttl=60, stale_ttl=60) == 1
+        compute.assert_called_once()
+        assert cache.get(lock_key("key")) is None
+
+    def test_stale_value_is_served_while_one_refresh_runs(self) -> None:
+        store("key", "old", ttl=60, stale_ttl=60)
+        self.make_stale("key")
+        refresh = mock.Mock()
+
+        for _ in range(3):
+            assert get_or_compute("key", lambda: "new", 60, 60, refresh=refresh) == "old"
+
+        # The lock is held until the refresh recomputes
+        refresh.assert_called_once()
+        recompute("key", lambda: "new", ttl=60, stale_ttl=60)
+        assert get_or_compute("key", lambda: "newer", 60, 60, refresh=refresh) == "new"
+
+    def test_stale_value_is_recomputed_inline_without_refresh(self) -> None:
+        store("key", "old", ttl=60, stale_ttl=60)
+        self.make_stale("key")
+
+        assert get_or_compute("key", lambda: "new", ttl=60, stale_ttl=60) == "new"
+        assert cache.get(lock_key("key")) is None
+
+    def test_failed_refresh_releases_lock(self) -> None:
+        store("key", "old", ttl=60, stale_ttl=60)
+        self.make_stale("key")
+
+        refresh = mock.Mock(side_effect=RuntimeError("broker down"))
+        assert get_or_compute("key", lambda: "new", 60, 60, refresh=refresh) == "old"
+        assert cache.get(lock_key("key")) is None
+
+    def test_cold_miss_waits_for_the_lock_holder(self, monkeypatch: Any) -> None:
+        cache.add(lock_key("key"), 1)
+        compute = mock.Mock(return_value="mine")
+
+        def other_worker_finishes(seconds: float) -> None:
+            store("key", "theirs", ttl=60, stale_ttl=60)
+
+        monkeypatch.setattr(swr.time, "sleep", other_worker_finishes)
+        assert get_or_compute("key", compute, ttl=60, stale_ttl=60) == "theirs"
+        compute.assert_not_called()
+
+    def test_miss_serves_the_fallback_while_one_refresh_runs(self) -> None:
+        store("key:1", "old", ttl=60, stale_ttl=60, fallback_key="key")
+        refresh = mock.Mock()
+        compute = mock.Mock(return_value="new")
+
+        for _ in range(3):
+            assert get_or_compute("key:2", compute, 60, 60, refresh, fallback_key="key") == "old"
+
+        refresh.assert_called_once()
+        compute.assert_not_called()
+        recompute("key:2", compute, ttl=60, stale_ttl=60, fallback_key="key")
+        assert cache.get(lock_key("key")) is None
+        assert get_or_compute("key:3", compute, 60, 60, fallback_key="key") == "new"
+
+    def test_early_expiration_grows_near_expiry(self) -> None:
+        fresh = {"value": 1, "fresh_until": time.time() + 3600, "duration": 0.01}
+        expiring = {"value": 1, "fresh_until": time.time() + 0.001, "duration": 10.0}
+
+        assert not any(is_stale(fresh) for _ in range(100))  # type: ignore[arg-type]
+        assert sum(is_stale(expiring) for _ in range(100)) > 90  # type: ignore[arg-type]
@@ -0,0 +1,168 @@
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+import redis
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory
+from django.urls import reverse
+
+from apps.core.throttling import (
+    Rate,
+    check_throttle,
+    client_ip,
+    get_buckets,
+    parse_rate,
+    scope_request,
+)
+from config.schema import schema
+
+
+@pytest.fixture
+def bucket_script(mocker: Any) -> Any:
+    client = mocker.Mock()
+    client.register_script.return_value.return_value = 0
+    mocker.patch("apps.core.throttling.get_redis", return_value=client)
+    return client.register_script.return_value
+
+
+class TestTokenBuckets:
+    def test_parse_rate(self) -> None:
+        assert parse_rate("60/min") == Rate(60, 1.0)
+        assert parse_rate("10/s") == Rate(10, 10.0)
+        assert parse_rate("3600/hour") == Rate(3600, 1.0)
+
+    def test_buckets_skip_unknown_dimensions(self, settings: Any) -> None:
+        settings.THROTTLE_RATES = {"vote": {"ip": "60/min", "user": "30/min", "poll": "9/s"}}
+        request = RequestFactory().get("/", REMOTE_ADDR="10.0.0.1")
+
+        keys = [key for key, _ in get_buckets("vote", request, poll=7)]
+
+        # Anonymous: no user bucket
+        assert keys == ["throttle:vote:ip:10.0.0.1", "throttle:vote:poll:7"]
+        assert get_buckets("unknown", request) == []
+
+    def test_client_ip_behind_proxies(self, settings: Any) -> None:
+        settings.THROTTLE_RATES = {"public": {"ip": "120/min"}}
+        settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK, "NUM_PROXIES": 1}
+        factory = RequestFactory()
+
+        keys = [
+            get_buckets(
+                "public",
+                factory.get("/", REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR=forwarded),
+            )[0][0]
+            # The client can only prepend spoofed entries
+            for forwarded in ("203.0.113.7", "1.2.3.4, 198.51.100.9")
+        ]
+
+        assert keys == ["throttle:public:ip:203.0.113.7", "throttle:public:ip:198.51.100.9"]
+
+    def test_all_buckets_in_one_script_call(self, settings: Any, bucket_script: Any) -> None:
+        settings.THROTTLE_RATES = {"public": {"ip": "120/min", "poll": "10/s"}}
+        request = RequestFactory().get("/", REMOTE_ADDR="10.0.0.1")
+
+        assert check_throttle("public", request, poll="testpoll") == 0
+
+        assert bucket_script.call_args.kwargs["keys"] == [
+            "throttle:public:ip:10.0.0.1",
+            "throttle:public:poll:testpoll",
+        ]
+        assert bucket_script.call_args.kwargs["args"] == [
+            120,
+            2.0,
+            10,
+            10.0,
+        ]
+
+    def test_fails_open(self, bucket_script: Any) -> None:
+        bucket_script.side_effect = redis.ConnectionError("down")
+        request = RequestFactory().get("/", REMOTE_ADDR="10.0.0.1")
+        assert check_throttle("public", request, poll="testpoll") == 0
+
+
+@pytest.mark.django_db
+class TestThrottledEndpoints:
+    def test_vote_is_throttled(self, auth_client: Any, option: Any, bucket_script: Any) -> None:
+        bucket_script.return_value = 2500  # ms until a token is available
+
+        response = auth_client.post(
+            reverse("polls:vote-list"),
+            {"question": option.question.slug, "option": option.slug},
+            format="json",
+        )
+
+        assert response.status_code == 429
+        assert response["Retry-After"] == "3"
+        keys = bucket_script.call_args.kwargs["keys"]
+        assert keys[2] == f"throttle:vote:poll:{option.question.poll_id}"
+
+    def test_reading_votes_is_not_throttled(self, auth_client: Any, bucket_script: Any) -> None:
+        bucket_script.return_value = 2500
+        assert auth_client.get(reverse("polls:vote-list")).status_code == 200
+        bucket_script.assert_not_called()
+
+    def test_public_page_is_throttled(self, api_client: Any, poll: Any, bucket_script: Any) -> None:
+        bucket_script.return_value = 400
+
+        response = api_client.get(
+            reverse("distribution:public-poll-page", kwargs={"slug": poll.slug})
+        )
+
+        assert response.status_code == 429
+        assert response["Retry-After"] == "1"
+
+    def test_graphql_operation_is_throttled(
+        self, graphql_client: Any, bucket_script: Any, settings: Any
+    ) -> None:
+        bucket_script.return_value = 1000
+
+        response = graphql_client('query { publicPoll(slug: "testpoll") { title } }')
+
+        assert response.status_code == 429
+        assert response["Retry-After"] == "1"
+        assert response.json()["errors"][0]["extensions"] == {
+            "code": "THROTTLED",
+            "retryAfter": 1,
+        }
+
+    def test_graphql_field_scope(self, graphql_client: Any, bucket_script: Any) -> None:
+        graphql_client(
+            'mutation { generateInsight(pollSlug: "testpoll", query: "Why?") }',
+        )
+        keys = bucket_script.call_args.kwargs["keys"]
+        assert "throttle:graphql:ip:127.0.0.1" in keys
+        # Anonymous callers have no user bucket for the insight scope
+        assert not any(str(key).startswith("throttle:graphql:generateInsight") for key in keys)
+
+    def test_graphql_subscription_is_throttled(self, bucket_script: Any) -> None:
+        bucket_script.return_value = 1000
+        # Strawberry's WebSocket consumer context
+        consumer = SimpleNamespace(
+            scope={"client": ("10.0.0.9", 5123), "headers": [(b"host", b"testserver")]}
+        )
+        query = 'subscription { pollResults(slug: "testpoll") { sequence } }'
+
+        async def first_frame() -> Any:
+            results = await schema.subscribe(
+                query, context_value={"request": consumer, "ws": consumer}
+            )
+            async for result in results:
+                return result
+
+        result = async_to_sync(first_frame)()
+
+        assert result.errors[0].extensions == {"code": "THROTTLED", "retryAfter": 1}
+        assert "throttle:graphql:ip:10.0.0.9" in bucket_script.call_args.kwargs["keys"]
+
+    def test_websocket_client_behind_proxies(self, settings: Any) -> None:
+        settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK, "NUM_PROXIES": 1}
+        request = scope_request(
+            {
+                "client": ("10.0.0.1", 5123),
+                "headers": [(b"x-forwarded-for", b"1.2.3.4, 198.51.100.9")],
+            }
+        )
+
+        assert client_ip(request) == "198.51.100.9"
+        assert not hasattr(request, "user")
@@ -0,0 +1,93 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from apps.distribution.enrichment import UserAgentInfo, parse_user_agent, referrer_domain
+from apps.distribution.models import DistributionAnalytics, DistributionEvent
+from apps.distribution.tasks import log_distribution_event_task
+from apps.polls.models import Poll
+
+User = get_user_model()
+
+IPHONE_SAFARI = (
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_4 like Mac OS X) AppleWebKit/605.1.15 "
+    "(KHTML, like Gecko) Version/17.4 Mobile/15E148 Safari/604.1"
+)
+WINDOWS_EDGE = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36 Edg/124.0.0.0"
+)
+ANDROID_TABLET_CHROME = (
+    "Mozilla/5.0 (Linux; Android 14; SM-X710) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
+)
+GOOGLEBOT = "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)"
+
+
+class TestParsers:
+    @pytest.mark.parametrize(
+        ("user_agent", "expected"),
+        [
+            (IPHONE_SAFARI, UserAgentInfo("mobile", "Safari", "iOS")),
+            (WINDOWS_EDGE, UserAgentInfo("desktop", "Edge", "Windows")),
+            (ANDROID_TABLET_CHROME, UserAgentInfo("tablet", "Chrome", "Android")),
+            (GOOGLEBOT, UserAgentInfo("bot", "", "")),
+            ("", UserAgentInfo("", "", "")),
+        ],
+    )
+    def test_parse_user_agent(self, user_agent: str, expected: UserAgentInfo) -> None:
+        assert parse_user_agent(user_agent) == expected
+
+    @pytest.mark.parametrize(
+        ("referrer", "expected"),
+        [
+            ("https://www.Google.com/search?q=poll", "google.com"),
+            ("http://t.co/abc", "t.co"),
+            ("", ""),
+            ("not a url", ""),
+        ],
+    )
+    def test_referrer_domain(self, referrer: str, expected: str) -> None:
+        assert referrer_domain(referrer) == expected
+
+
+@pytest.mark.django_db
+class TestEventEnrichment:
+    @pytest.fixture
+    def poll(self) -> Poll:
+        user = User.objects.create_user(
+            email="enrich@example.com",
+            password="password",  # pragma: allowlist secret  # noqa: S106
+        )
+        return Poll.objects.create(title="Test Poll", created_by=user, slug="testpoll")
+
+    def test_logged_event_is_enriched(self, poll: Poll) -> None:
+        log_distribution_event_task(
+            poll.id,
+            DistributionEvent.LINK_OPEN,
+            user_agent=IPHONE_SAFARI,
+            referrer="https://www.facebook.com/",
+        )
+
+        event = DistributionAnalytics.objects.get(poll=poll)
+        assert (event.device_type, event.browser, event.os) == ("mobile", "Safari", "iOS")
+        assert event.referrer_domain == "facebook.com"
+
+    def test_enrich_command_backfills_events(self, poll: Poll) -> None:
+        DistributionAnalytics.objects.bulk_create(
+            [
+                DistributionAnalytics(
+                    poll=poll,
+                    event_type=DistributionEvent.QR_SCAN,
+                    user_agent=WINDOWS_EDGE,
+                    referrer="https://news.ycombinator.com/item",
+                )
+                for _ in range(3)
+            ]
+        )
+
+        call_command("enrich_distribution_events", batch_size=2)
+
+        assert set(
+            DistributionAnalytics.objects.values_list("device_type", "browser", "referrer_domain")
+        ) == {("desktop", "Edge", "news.ycombinator.com")}
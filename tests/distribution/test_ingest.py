@@ -0,0 +1,176 @@
+import json
+from typing import Any
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DatabaseError
+
+from apps.distribution.ingest import (
+    BOT,
+    BOT_EVENTS_KEY,
+    EVENT_BUFFER_KEY,
+    RATE_LIMITED,
+    RATE_LIMITED_EVENTS_KEY,
+    drain_events,
+    enqueue_event,
+    get_bot_event_count,
+    get_rate_limited_event_count,
+)
+from apps.distribution.models import DistributionAnalytics, DistributionEvent
+from apps.distribution.rollups import get_distribution_summary
+from apps.distribution.tasks import DRAIN_LOCK_KEY, drain_distribution_events_task
+from apps.polls.models import Poll
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestDistributionIngest:
+    @pytest.fixture
+    def poll(self) -> Poll:
+        user = User.objects.create_user(
+            email="ingest@example.com",
+            password="password",  # pragma: allowlist secret  # noqa: S106
+        )
+        return Poll.objects.create(title="Test Poll", created_by=user, slug="testpoll")
+
+    def test_enqueue_pushes_to_capped_buffer(self, mocker: Any, settings: Any) -> None:
+        settings.DISTRIBUTION_EVENT_BUFFER_LIMIT = 10
+        settings.DISTRIBUTION_BOT_IP_RATE = 30
+        client = mocker.Mock()
+        script = client.register_script.return_value
+        script.return_value = 1
+        mocker.patch("apps.distribution.ingest.get_redis", return_value=client)
+
+        assert enqueue_event(1, DistributionEvent.QR_SCAN, ip_address="127.0.0.1")
+
+        buffer_key, _, _, ip_key, rate_limited_key = script.call_args.kwargs["keys"]
+        limit, payload, _, bot, rate, _ = script.call_args.kwargs["args"]
+        assert (buffer_key, limit) == (EVENT_BUFFER_KEY, 10)
+        # Scoped to the poll, so a shared NAT is only limited per poll
+        assert (ip_key, bot, rate) == ("distribution:ip:1:127.0.0.1", 0, 30)
+        assert rate_limited_key == RATE_LIMITED_EVENTS_KEY
+        event = json.loads(payload)
+        assert event["poll_id"] == 1
+        assert event["event_type"] == DistributionEvent.QR_SCAN
+        assert event["ip_address"] == "127.0.0.1"
+
+    def test_enqueue_reports_dropped_event(self, mocker: Any) -> None:
+        client = mocker.Mock()
+        client.register_script.return_value.return_value = 0  # Buffer full
+        mocker.patch("apps.distribution.ingest.get_redis", return_value=client)
+
+        assert not enqueue_event(1, DistributionEvent.LINK_OPEN)
+
+    def test_enqueue_flags_bot_user_agents(self, mocker: Any) -> None:
+        client = mocker.Mock()
+        script = client.register_script.return_value
+        script.return_value = BOT
+        mocker.patch("apps.distribution.ingest.get_redis", return_value=client)
+
+        assert not enqueue_event(
+            1, DistributionEvent.LINK_OPEN, user_agent="facebookexternalhit/1.1"
+        )
+
+        assert script.call_args.kwargs["keys"][2] == BOT_EVENTS_KEY
+        assert script.call_args.kwargs["args"][2:5] == [
+            "1:LINK_OPEN",
+            1,
+            0,
+        ]  # No address, no rate check
+
+    def test_bot_events_are_not_logged_without_redis(self, poll: Poll) -> None:
+        enqueue_event(poll.id, DistributionEvent.LINK_OPEN, user_agent="Twitterbot/1.0")
+        assert not DistributionAnalytics.objects.exists()
+
+    def test_enqueue_reports_rate_limited_event(self, mocker: Any) -> None:
+        client = mocker.Mock()
+        client.register_script.return_value.return_value = RATE_LIMITED
+        mocker.patch("apps.distribution.ingest.get_redis", return_value=client)
+
+        assert not enqueue_event(1, DistributionEvent.QR_SCAN, ip_address="127.0.0.1")
+
+    def test_filtered_event_counts(self, mocker: Any) -> None:
+        client = mocker.Mock()
+        client.hmget.return_value = [b"3", None, b"2", None]
+        mocker.patch("apps.distribution.ingest.get_redis", return_value=client)
+
+        assert get_bot_event_count(1) == 5
+        assert client.hmget.call_args.args[0] == BOT_EVENTS_KEY
+        assert client.hmget.call_args.args[1][0] == "1:LINK_OPEN"
+        assert get_rate_limited_event_count(1) == 5
+        assert client.hmget.call_args.args[0] == RATE_LIMITED_EVENTS_KEY
+
+    def test_enqueue_without_redis_logs_directly(self, poll: Poll) -> None:
+        enqueue_event(poll.id, DistributionEvent.EMBED_LOAD, user_agent="TestAgent")
+
+        analytics = DistributionAnalytics.objects.get(poll=poll)
+        assert analytics.event_type == DistributionEvent.EMBED_LOAD
+        assert analytics.user_agent == "TestAgent"
+
+    def test_drain_bulk_creates_rows(self, mocker: Any, poll: Poll) -> None:
+        def event(poll_id: int) -> str:
+            return json.dumps(
+                {
+                    "poll_id": poll_id,
+                    "event_type": DistributionEvent.LINK_OPEN,
+                    "timestamp": "2026-01-01T12:00:00+00:00",
+                    "ip_address": None,
+                    "user_agent": "",
+                    "referrer": "",
+                    "metadata": {},
+                }
+            )
+
+        client = mocker.Mock()
+        client.lrange.side_effect = [[event(poll.id), event(poll.id), event(99999)], []]
+        mocker.patch("apps.distribution.ingest.get_redis", return_value=client)
+
+        written = drain_events(batch_size=3, max_batches=5)
+
+        assert written == 2  # Event for the missing poll is discarded
+        assert client.lrange.call_count == 2
+        client.ltrim.assert_called_once_with(EVENT_BUFFER_KEY, 3, -1)
+        timestamps = DistributionAnalytics.objects.values_list("timestamp", flat=True)
+        assert {ts.isoformat() for ts in timestamps} == {"2026-01-01T12:00:00+00:00"}
+        assert get_distribution_summary(poll)["total_link_opens"] == 2
+
+    def test_failed_batches_stay_buffered(self, mocker: Any, poll: Poll) -> None:
+        client = mocker.Mock()
+        client.lrange.return_value = [
+            json.dumps(
+                {
+                    "poll_id": poll.id,
+                    "event_type": DistributionEvent.LINK_OPEN,
+                    "timestamp": "2026-01-01T12:00:00+00:00",
+                    "ip_address": None,
+                    "user_agent": "",
+                    "referrer": "",
+                    "metadata": {},
+                }
+            )
+        ]
+        mocker.patch("apps.distribution.ingest.get_redis", return_value=client)
+        mocker.patch(
+            "apps.distribution.ingest.record_rollups", side_effect=DatabaseError("disk full")
+        )
+
+        with pytest.raises(DatabaseError):
+            drain_events(batch_size=3, max_batches=5)
+
+        # Rolled back and left in the buffer for the next run
+        assert not DistributionAnalytics.objects.exists()
+        client.ltrim.assert_not_called()
+
+    def test_drains_do_not_overlap(self, mocker: Any) -> None:
+        drain = mocker.patch("apps.distribution.tasks.drain_events", return_value=4)
+        cache.add(DRAIN_LOCK_KEY, 1)
+        try:
+            assert drain_distribution_events_task() == 0
+        finally:
+            cache.delete(DRAIN_LOCK_KEY)
+
+        assert drain_distribution_events_task() == 4
+        drain.assert_called_once()
+        assert cache.get(DRAIN_LOCK_KEY) is None
@@ -0,0 +1,109 @@
+from datetime import UTC, datetime
+from typing import Any
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from apps.distribution.models import (
+    DistributionAnalytics,
+    DistributionEvent,
+    DistributionRollup,
+    RollupGranularity,
+)
+from apps.distribution.rollups import get_distribution_summary, is_rolled_up, record_rollups
+from apps.polls.models import Poll
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestDistributionRollups:
+    @pytest.fixture
+    def poll(self) -> Poll:
+        user = User.objects.create_user(
+            email="rollups@example.com",
+            password="password",  # pragma: allowlist secret  # noqa: S106
+        )
+        return Poll.objects.create(title="Test Poll", created_by=user, slug="testpoll")
+
+    def event(self, poll: Poll, event_type: str, hour: int) -> DistributionAnalytics:
+        return DistributionAnalytics(
+            poll=poll,
+            event_type=event_type,
+            timestamp=datetime(2026, 1, 1, hour, 30, tzinfo=UTC),
+        )
+
+    def test_record_rollups_buckets_by_hour_and_day(self, poll: Poll) -> None:
+        record_rollups(
+            [
+                self.event(poll, DistributionEvent.LINK_OPEN, hour=9),
+                self.event(poll, DistributionEvent.LINK_OPEN, hour=9),
+                self.event(poll, DistributionEvent.LINK_OPEN, hour=10),
+            ]
+        )
+        record_rollups([self.event(poll, DistributionEvent.LINK_OPEN, hour=10)])
+
+        hourly = DistributionRollup.objects.filter(granularity=RollupGranularity.HOUR)
+        assert sorted(hourly.values_list("bucket__hour", "count")) == [(9, 2), (10, 2)]
+        daily = DistributionRollup.objects.get(granularity=RollupGranularity.DAY)
+        assert daily.bucket == datetime(2026, 1, 1, tzinfo=UTC)
+        assert daily.count == 4
+
+    def test_summary_reads_rollups_in_one_query(
+        self, poll: Poll, django_assert_num_queries: Any
+    ) -> None:
+        record_rollups(
+            [
+                self.event(poll, DistributionEvent.LINK_OPEN, hour=9),
+                self.event(poll, DistributionEvent.QR_SCAN, hour=9),
+                self.event(poll, DistributionEvent.QR_SCAN, hour=11),
+            ]
+        )
+
+        with django_assert_num_queries(1):
+            summary = get_distribution_summary(poll)
+
+        assert summary == {"total_link_opens": 1, "total_qr_scans": 2, "total_embed_loads": 0}
+
+    def test_saved_event_is_rolled_up(self, poll: Poll) -> None:
+        DistributionAnalytics.objects.create(poll=poll, event_type=DistributionEvent.EMBED_LOAD)
+        assert get_distribution_summary(poll)["total_embed_loads"] == 1
+
+    def test_rebuild_command(self, poll: Poll) -> None:
+        DistributionAnalytics.objects.bulk_create(
+            [self.event(poll, DistributionEvent.QR_SCAN, hour=hour) for hour in (1, 2, 2)]
+        )
+
+        call_command("rebuild_distribution_rollups", poll="testpoll")
+
+        assert DistributionRollup.objects.filter(granularity=RollupGranularity.HOUR).count() == 2
+        assert get_distribution_summary(poll)["total_qr_scans"] == 3
+
+    def test_rebuild_keeps_rollups_of_dropped_partitions(self, poll: Poll, mocker: Any) -> None:
+        mocker.patch(
+            "apps.distribution.management.commands.rebuild_distribution_rollups.retained_since",
+            return_value=datetime(2026, 2, 1, tzinfo=UTC),
+        )
+        # January's raw events are gone, only their rollups remain
+        record_rollups([self.event(poll, DistributionEvent.QR_SCAN, hour=1)])
+        DistributionAnalytics.objects.create(
+            poll=poll,
+            event_type=DistributionEvent.QR_SCAN,
+            timestamp=datetime(2026, 2, 3, tzinfo=UTC),
+        )
+
+        call_command("rebuild_distribution_rollups")
+
+        assert get_distribution_summary(poll)["total_qr_scans"] == 2
+
+    def test_is_rolled_up(self, poll: Poll) -> None:
+        start, end = datetime(2026, 1, 1, tzinfo=UTC), datetime(2026, 2, 1, tzinfo=UTC)
+        DistributionAnalytics.objects.bulk_create(
+            [self.event(poll, DistributionEvent.QR_SCAN, hour=hour) for hour in (1, 2)]
+        )
+        assert not is_rolled_up(start, end)
+
+        call_command("rebuild_distribution_rollups")
+
+        assert is_rolled_up(start, end)
@@ -1,8 +1,12 @@
+import io
+import zipfile
 from typing import Any
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.management import call_command
 
 from apps.distribution.services import DistributionService
 from apps.polls.models import Poll
@@ -28,77 +32,102 @@ class TestDistributionService:
         url = DistributionService.get_public_url(poll)
         assert url == f"http://testserver/polls/{poll.slug}/"
 
-    @patch("apps.distribution.services.qrcode.make")
-    @patch("apps.distribution.services.io.BytesIO")
-    @patch("apps.distribution.services.cache")
-    def test_generate_qr_code_png(
-        self,
-        mock_cache: MagicMock,
-        mock_bytes_io: MagicMock,
-        mock_make: MagicMock,
-        poll: Poll,
-    ) -> None:
-        # Setup mocks
-        mock_img = MagicMock()
-        mock_make.return_value = mock_img
-
-        mock_buffer = MagicMock()
-        mock_buffer.getvalue.return_value = b"fake_png_content"
-        mock_bytes_io.return_value = mock_buffer
-
-        # Cache miss
-        mock_cache.get.return_value = None
-
-        # Execute
+    @pytest.fixture
+    def storage(self, settings: Any, tmp_path: Any) -> Any:
+        settings.MEDIA_ROOT = tmp_path
+        return tmp_path
+
+    def test_render_qr_code_png(self, poll: Poll) -> None:
+        content = DistributionService.render_qr_code(poll, img_format="png")
+        assert content.startswith(b"\x89PNG")
+
+    def test_render_qr_code_size(self, poll: Poll) -> None:
+        small = DistributionService.render_qr_code(poll, img_format="svg", size=2)
+        large = DistributionService.render_qr_code(poll, img_format="svg", size=20)
+        assert small.startswith(b"<?xml")
+        assert small != large
+
+    def test_generate_qr_code_stores_asset(self, poll: Poll, storage: Any) -> None:
         content = DistributionService.generate_qr_code(poll, img_format="png")
 
-        # Verify
-        assert content == b"fake_png_content"
-        mock_make.assert_called_once()
-        mock_img.save.assert_called_once()
-        mock_cache.set.assert_called_once()
-
-    @patch("apps.distribution.services.qrcode.make")
-    @patch("apps.distribution.services.io.BytesIO")
-    @patch("apps.distribution.services.cache")
-    def test_generate_qr_code_svg(
-        self,
-        mock_cache: MagicMock,
-        mock_bytes_io: MagicMock,
-        mock_make: MagicMock,
-        poll: Poll,
-    ) -> None:
-        # Setup mocks
-        mock_img = MagicMock()
-        mock_make.return_value = mock_img
-
-        mock_buffer = MagicMock()
-        mock_buffer.getvalue.return_value = b"fake_svg_content"
-        mock_bytes_io.return_value = mock_buffer
-
-        # Cache miss
-        mock_cache.get.return_value = None
-
-        # Execute
+        path = DistributionService.get_qr_code_path(poll, "png")
+        assert (storage / path).read_bytes() == content
+
+        with patch.object(DistributionService, "render_qr_code") as mock_render:
+            assert DistributionService.generate_qr_code(poll, img_format="png") == content
+        mock_render.assert_not_called()
+
+    def test_concurrent_stores_leave_one_asset(self, poll: Poll, storage: Any) -> None:
+        path = DistributionService.get_qr_code_path(poll, "png")
+        stored = default_storage.exists
+
+        # Another process stores the asset between our check and our save
+        def exists(name: str) -> bool:
+            found = stored(name)
+            if not found:
+                (storage / path).parent.mkdir(parents=True, exist_ok=True)
+                (storage / path).write_bytes(b"stored concurrently")
+            return found
+
+        with patch("apps.distribution.services.default_storage.exists", side_effect=exists):
+            assert DistributionService.get_qr_code_asset(poll, "png") == path
+
+        assert [file.name for file in (storage / "qr").iterdir()] == [path.split("/")[1]]
+
+    def test_generate_qr_code_svg(self, poll: Poll, storage: Any) -> None:
         content = DistributionService.generate_qr_code(poll, img_format="svg")
+        assert isinstance(content, str)
+        assert "<svg" in content
+
+    def test_qr_code_path_is_content_addressed(self, poll: Poll, settings: Any) -> None:
+        path = DistributionService.get_qr_code_path(poll, "png")
+        assert path.startswith("qr/")
+        assert path.endswith(".png")
+        assert path == DistributionService.get_qr_code_path(poll, "png")
+        assert path != DistributionService.get_qr_code_path(poll, "png", error_correction="H")
+        assert path != DistributionService.get_qr_code_path(poll, "png", size=4)
+
+        settings.BASE_URL = "https://polls.example.com"
+        assert path != DistributionService.get_qr_code_path(poll, "png")
+
+    def test_generate_qr_codes_command(self, poll: Poll, storage: Any) -> None:
+        call_command("generate_qr_codes", poll=poll.slug, ec="H")
+
+        for img_format in ("png", "svg"):
+            path = DistributionService.get_qr_code_path(poll, img_format, error_correction="H")
+            assert (storage / path).exists()
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_export_qr_codes(self, poll: Poll, user: Any, max_workers: int) -> None:
+        other = Poll.objects.create(title="Other Poll", created_by=user)
+
+        archive = b"".join(
+            DistributionService.export_qr_codes(
+                [poll, other], img_formats=["png", "svg"], max_workers=max_workers
+            )
+        )
 
-        # Verify
-        assert content == "fake_svg_content"  # decode() is called in service
-        mock_make.assert_called_once()
-        mock_img.save.assert_called_once()
-        mock_cache.set.assert_called_once()
+        with zipfile.ZipFile(io.BytesIO(archive)) as zf:
+            assert zf.namelist() == [
+                f"{poll.slug}.png",
+                f"{poll.slug}.svg",
+                f"{other.slug}.png",
+                f"{other.slug}.svg",
+            ]
+            assert zf.read(f"{other.slug}.png") == DistributionService.render_qr_code(other)
 
-    @patch("apps.distribution.services.cache")
-    def test_generate_qr_code_cached(self, mock_cache: MagicMock, poll: Poll) -> None:
-        # Cache hit
-        mock_cache.get.return_value = b"cached_content"
+    def test_export_qr_codes_command(self, poll: Poll, user: Any, tmp_path: Any) -> None:
+        output = tmp_path / "codes.zip"
+        call_command("export_qr_codes", str(output), creator=user.email, workers=1)
 
-        content = DistributionService.generate_qr_code(poll, img_format="png")
-        assert content == b"cached_content"
+        with zipfile.ZipFile(output) as zf:
+            assert zf.namelist() == [f"{poll.slug}.png"]
 
     def test_get_embed_code(self, poll: Poll, settings: Any) -> None:
         settings.BASE_URL = "http://testserver"
         embed_code = DistributionService.get_embed_code(poll)
         expected_url = f"http://testserver/polls/{poll.slug}/"
-        assert f'src="{expected_url}"' in embed_code
-        assert "<iframe" in embed_code
+        assert f'data-poll-embed="{poll.slug}"' in embed_code
+        assert 'src="http://testserver/api/v1/distribution/embed/v1.js"' in embed_code
+        # Fallback for pages without JavaScript
+        assert f'<noscript><iframe src="{expected_url}"' in embed_code
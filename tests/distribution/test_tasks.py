@@ -4,7 +4,12 @@ import pytest
 from django.contrib.auth import get_user_model
 
 from apps.distribution.models import DistributionAnalytics, DistributionEvent
-from apps.distribution.tasks import log_distribution_event_task
+from apps.distribution.services import DistributionService
+from apps.distribution.tasks import (
+    generate_qr_codes_task,
+    log_distribution_event_task,
+    purge_poll_cache_task,
+)
 from apps.polls.models import Poll
 
 User = get_user_model()
@@ -49,3 +54,57 @@ class TestDistributionTasks:
         # Should not raise exception
         log_distribution_event_task(poll_id=99999, event_type=DistributionEvent.LINK_OPEN)
         assert DistributionAnalytics.objects.count() == 0
+
+    def test_purge_poll_cache_task(self, mocker: Any, settings: Any) -> None:
+        settings.DISTRIBUTION_PURGE_URL = "https://cdn.example.com/purge/{key}"
+        settings.DISTRIBUTION_PURGE_TOKEN = "token"  # pragma: allowlist secret  # noqa: S105
+        mock_post = mocker.patch("apps.distribution.tasks.requests.post")
+
+        purge_poll_cache_task("testpoll")
+
+        mock_post.assert_called_once_with(
+            "https://cdn.example.com/purge/poll-testpoll",
+            headers={"Surrogate-Key": "poll-testpoll", "Authorization": "Bearer token"},
+            timeout=10,
+        )
+
+    def test_poll_change_triggers_purge(
+        self, mocker: Any, poll: Poll, django_capture_on_commit_callbacks: Any
+    ) -> None:
+        mock_task = mocker.patch("apps.distribution.signals.purge_poll_cache_task")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            poll.title = "Updated"
+            poll.save()
+
+        mock_task.delay.assert_called_once_with("testpoll")
+
+    def test_new_poll_pre_renders_qr_codes(
+        self,
+        user: Any,
+        settings: Any,
+        tmp_path: Any,
+        django_capture_on_commit_callbacks: Any,
+    ) -> None:
+        settings.MEDIA_ROOT = tmp_path
+
+        with django_capture_on_commit_callbacks(execute=True):
+            poll = Poll.objects.create(title="New Poll", created_by=user)
+
+        for img_format in ("png", "svg"):
+            assert (tmp_path / DistributionService.get_qr_code_path(poll, img_format)).exists()
+
+    def test_pre_rendering_can_be_disabled(
+        self, user: Any, settings: Any, mocker: Any, django_capture_on_commit_callbacks: Any
+    ) -> None:
+        settings.QR_PRERENDER = False
+        task = mocker.patch("apps.distribution.signals.generate_qr_codes_task")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Poll.objects.create(title="New Poll", created_by=user)
+
+        task.delay.assert_not_called()
+
+    def test_generate_qr_codes_task_missing_poll(self) -> None:
+        # Should not raise exception
+        generate_qr_codes_task(99999)
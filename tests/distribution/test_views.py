@@ -1,12 +1,21 @@
+import gzip
+import io
+import zipfile
+from datetime import timedelta
 from typing import Any
 from unittest.mock import ANY, MagicMock, patch
 
 import pytest
+from asgiref.sync import async_to_sync
 from django.contrib.auth import get_user_model
+from django.template.loader import render_to_string
+from django.test import AsyncClient
 from django.urls import reverse
+from django.utils import timezone
 
 from apps.distribution.models import DistributionAnalytics, DistributionEvent
-from apps.polls.models import Poll
+from apps.distribution.services import acquire_export_slot, release_export_slot
+from apps.polls.models import Option, Poll, Question, Vote
 
 User = get_user_model()
 
@@ -41,15 +50,15 @@ class TestDistributionViews:
             poll=poll, event_type=DistributionEvent.LINK_OPEN
         ).exists()
 
-    @patch("apps.distribution.views.log_distribution_event_task")
+    @patch("apps.distribution.views.enqueue_event")
     def test_public_poll_detail_view(
-        self, mock_task: MagicMock, poll: Poll, api_client: Any
+        self, mock_enqueue: MagicMock, poll: Poll, api_client: Any
     ) -> None:
         url = reverse("distribution:public-poll", kwargs={"slug": poll.slug})
         response = api_client.get(url)
         assert response.status_code == 200
         assert response.data["title"] == poll.title
-        mock_task.delay.assert_called_once_with(
+        mock_enqueue.assert_called_once_with(
             poll.id,
             DistributionEvent.LINK_OPEN,
             ip_address=ANY,
@@ -57,11 +66,24 @@ class TestDistributionViews:
             referrer=ANY,
         )
 
+    @patch("apps.distribution.views.enqueue_event")
+    def test_events_record_the_forwarded_client_ip(
+        self, mock_enqueue: MagicMock, poll: Poll, api_client: Any, settings: Any
+    ) -> None:
+        settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK, "NUM_PROXIES": 1}
+        url = reverse("distribution:public-poll", kwargs={"slug": poll.slug})
+
+        for forwarded in ("203.0.113.7", "198.51.100.9"):
+            api_client.get(url, REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR=forwarded)
+
+        ips = [call.kwargs["ip_address"] for call in mock_enqueue.call_args_list]
+        assert ips == ["203.0.113.7", "198.51.100.9"]
+
     @patch("apps.distribution.views.DistributionService.generate_qr_code")
-    @patch("apps.distribution.views.log_distribution_event_task")
+    @patch("apps.distribution.views.enqueue_event")
     def test_poll_qr_code_view(
         self,
-        mock_task: MagicMock,
+        mock_enqueue: MagicMock,
         mock_generate: MagicMock,
         poll: Poll,
         api_client: Any,
@@ -72,7 +94,7 @@ class TestDistributionViews:
         assert response.status_code == 200
         assert response.content == b"fake_qr_png"
         assert response["Content-Type"] == "image/png"
-        mock_task.delay.assert_called_once_with(
+        mock_enqueue.assert_called_once_with(
             poll.id,
             DistributionEvent.QR_SCAN,
             ip_address=ANY,
@@ -80,14 +102,104 @@ class TestDistributionViews:
             referrer=ANY,
         )
 
-    @patch("apps.distribution.views.log_distribution_event_task")
-    def test_poll_embed_view(self, mock_task: MagicMock, poll: Poll, api_client: Any) -> None:
+    def test_poll_qr_code_asset_is_immutable(
+        self, poll: Poll, api_client: Any, settings: Any, tmp_path: Any
+    ) -> None:
+        settings.MEDIA_ROOT = tmp_path
+        url = reverse("distribution:poll-qr", kwargs={"slug": poll.slug})
+        response = api_client.get(url, {"format": "svg", "size": 4, "ec": "H"})
+        assert response.status_code == 200
+        assert response["Content-Type"] == "image/svg+xml"
+
+        asset = api_client.get(response["Content-Location"])
+        assert asset.status_code == 200
+        assert b"".join(asset.streaming_content) == response.content
+        assert "immutable" in asset["Cache-Control"]
+
+    def test_missing_qr_code_asset_is_re_rendered(
+        self, poll: Poll, api_client: Any, settings: Any, tmp_path: Any
+    ) -> None:
+        settings.MEDIA_ROOT = tmp_path / "web"
+        url = reverse("distribution:poll-qr", kwargs={"slug": poll.slug})
+        response = api_client.get(url, {"format": "png", "size": 6})
+        # Served by another process, whose storage never had the file
+        settings.MEDIA_ROOT = tmp_path / "other"
+
+        asset = api_client.get(response["Content-Location"])
+
+        assert asset.status_code == 200
+        assert b"".join(asset.streaming_content) == response.content
+        unknown = response["Content-Location"].replace(".png", ".svg")
+        assert api_client.get(unknown).status_code == 404
+
+    def test_poll_qr_code_invalid_params(self, poll: Poll, api_client: Any) -> None:
+        url = reverse("distribution:poll-qr", kwargs={"slug": poll.slug})
+        assert api_client.get(url, {"size": 0}).status_code == 400
+        assert api_client.get(url, {"ec": "X"}).status_code == 400
+
+    def post_export(self, user: Any, data: dict[str, Any]) -> tuple[Any, bytes]:
+        """
+        Requests a QR export as the ASGI app serves it, returning the response and its body.
+        """
+
+        async def _read() -> tuple[Any, bytes]:
+            client = AsyncClient()
+            await client.aforce_login(user)
+            response: Any = await client.post(
+                reverse("distribution:qr-export"), data, content_type="application/json"
+            )
+            if not response.streaming:
+                return response, b""
+            return response, b"".join([chunk async for chunk in response])
+
+        return async_to_sync(_read)()
+
+    def test_qr_code_export(self, poll: Poll, user: Any, settings: Any) -> None:
+        settings.QR_EXPORT_WORKERS = 1
+        Poll.objects.create(title="Not Mine", created_by=User.objects.create_user(email="x@y.z"))
+
+        response, content = self.post_export(user, {"formats": ["svg"], "size": 2})
+
+        assert response.status_code == 200
+        assert response["Content-Type"] == "application/zip"
+        # Streamed asynchronously, not read in full by Django first
+        assert response.is_async
+        with zipfile.ZipFile(io.BytesIO(content)) as zf:
+            assert zf.namelist() == ["testpoll.svg"]
+        # The export's slot is free again
+        slot = acquire_export_slot()
+        assert slot is not None
+        release_export_slot(slot)
+
+    def test_qr_code_exports_are_bounded(self, poll: Poll, user: Any, settings: Any) -> None:
+        settings.QR_EXPORT_MAX_CONCURRENT = 1
+        slot = acquire_export_slot()
+        assert slot is not None
+
+        try:
+            response, _ = self.post_export(user, {"formats": ["svg"]})
+        finally:
+            release_export_slot(slot)
+
+        assert response.status_code == 503
+        assert response["Retry-After"] == "30"
+
+    def test_qr_code_export_limit(
+        self, poll: Poll, api_client: Any, user: Any, settings: Any
+    ) -> None:
+        settings.QR_EXPORT_MAX_POLLS = 0
+        api_client.force_authenticate(user=user)
+        response = api_client.post(reverse("distribution:qr-export"), {}, format="json")
+        assert response.status_code == 400
+
+    @patch("apps.distribution.views.enqueue_event")
+    def test_poll_embed_view(self, mock_enqueue: MagicMock, poll: Poll, api_client: Any) -> None:
         url = reverse("distribution:poll-embed", kwargs={"slug": poll.slug})
         response = api_client.get(url)
         assert response.status_code == 200
         assert "embed_code" in response.data
         assert "public_url" in response.data
-        mock_task.delay.assert_called_once_with(
+        mock_enqueue.assert_called_once_with(
             poll.id,
             DistributionEvent.EMBED_LOAD,
             ip_address=ANY,
@@ -95,6 +207,157 @@ class TestDistributionViews:
             referrer=ANY,
         )
 
+    @patch("apps.distribution.views.enqueue_event")
+    def test_poll_embed_data_view(
+        self,
+        mock_enqueue: MagicMock,
+        poll: Poll,
+        user: Any,
+        api_client: Any,
+        django_assert_num_queries: Any,
+    ) -> None:
+        question = Question.objects.create(poll=poll, text="Q1", question_type="single")
+        option = Option.objects.create(question=question, text="O1")
+        Option.objects.create(question=question, text="O2")
+        Vote.objects.create(user=user, question=question, option=option)
+        url = reverse("distribution:poll-embed-data", kwargs={"slug": poll.slug})
+
+        response = api_client.get(url)
+        with django_assert_num_queries(0):
+            cached = api_client.get(url)
+
+        data = response.json()
+        assert cached.json() == data
+        assert response["Access-Control-Allow-Origin"] == "*"
+        assert (data["slug"], data["open"]) == (poll.slug, True)
+        assert [(o["text"], o["votes"]) for o in data["questions"][0]["options"]] == [
+            ("O1", 1),
+            ("O2", 0),
+        ]
+        assert mock_enqueue.call_count == 2
+        assert mock_enqueue.call_args.args == (poll.id, DistributionEvent.EMBED_LOAD)
+
+    def test_embed_script_is_immutable(self, api_client: Any) -> None:
+        response = api_client.get(reverse("distribution:embed-script", kwargs={"version": "v1"}))
+        assert response.status_code == 200
+        assert response["Content-Type"] == "text/javascript"
+        assert "immutable" in response["Cache-Control"]
+        assert b"data-poll-embed" in b"".join(response.streaming_content)
+
+        missing = api_client.get(reverse("distribution:embed-script", kwargs={"version": "v99"}))
+        assert missing.status_code == 404
+
+    def test_public_endpoints_send_cache_headers(self, poll: Poll, api_client: Any) -> None:
+        for name in ("public-poll-page", "public-poll", "poll-embed"):
+            response = api_client.get(reverse(f"distribution:{name}", kwargs={"slug": poll.slug}))
+            assert response["Surrogate-Key"] == "poll-testpoll"
+            assert "public" in response["Cache-Control"]
+            assert "s-maxage=0" in response["Cache-Control"]
+            assert "Accept-Encoding" in response["Vary"]
+
+    @patch("apps.distribution.views.enqueue_event")
+    def test_edge_cached_page_logs_via_beacon(
+        self, mock_enqueue: MagicMock, poll: Poll, api_client: Any, settings: Any
+    ) -> None:
+        settings.DISTRIBUTION_EDGE_CACHE_SECONDS = 300
+        url = reverse("distribution:public-poll-page", kwargs={"slug": poll.slug})
+        response = api_client.get(url)
+
+        assert "s-maxage=300" in response["Cache-Control"]
+        assert b"sendBeacon" in response.content
+        mock_enqueue.assert_not_called()
+
+    @patch("apps.distribution.views.DistributionService.generate_qr_code")
+    @patch("apps.distribution.views.enqueue_event")
+    def test_endpoints_without_beacon_log_on_the_origin(
+        self,
+        mock_enqueue: MagicMock,
+        mock_generate: MagicMock,
+        poll: Poll,
+        api_client: Any,
+        settings: Any,
+    ) -> None:
+        settings.DISTRIBUTION_EDGE_CACHE_SECONDS = 300
+        mock_generate.return_value = b"fake_qr_png"
+
+        for name in ("public-poll", "poll-qr", "poll-embed"):
+            url = reverse(f"distribution:{name}", kwargs={"slug": poll.slug})
+            # A browser's Accept header, which would select the browsable API
+            response = api_client.get(url, HTTP_ACCEPT="text/html,*/*;q=0.8")
+            assert response.status_code == 200
+            # Served by the origin every time, so each hit is logged
+            assert "s-maxage=0" in response["Cache-Control"]
+            if name != "poll-qr":
+                assert response["Content-Type"] == "application/json"
+
+        assert [c.args[1] for c in mock_enqueue.call_args_list] == [
+            DistributionEvent.LINK_OPEN,
+            DistributionEvent.QR_SCAN,
+            DistributionEvent.EMBED_LOAD,
+        ]
+
+    @patch("apps.distribution.views.enqueue_event")
+    def test_edge_cached_embed_data(
+        self, mock_enqueue: MagicMock, poll: Poll, api_client: Any, settings: Any
+    ) -> None:
+        settings.DISTRIBUTION_EDGE_CACHE_SECONDS = 300
+        settings.DISTRIBUTION_EMBED_CACHE_SECONDS = 15
+        settings.BASE_URL = "https://api.example.com"
+        url = reverse("distribution:poll-embed-data", kwargs={"slug": poll.slug})
+
+        response = api_client.get(url)
+
+        # Posted to from the embedding page, so absolute
+        assert response.json()["beacon"] == (
+            "https://api.example.com/api/v1/distribution/polls/testpoll/beacon"
+        )
+        # Live tallies are never purged from the edge
+        assert "s-maxage=15" in response["Cache-Control"]
+        mock_enqueue.assert_not_called()
+
+    @patch("apps.distribution.views.enqueue_event")
+    def test_public_poll_page_is_cached(
+        self, mock_enqueue: MagicMock, poll: Poll, api_client: Any
+    ) -> None:
+        url = reverse("distribution:public-poll-page", kwargs={"slug": poll.slug})
+        with patch(
+            "apps.distribution.views.render_to_string", wraps=render_to_string
+        ) as mock_render:
+            first = api_client.get(url, HTTP_ACCEPT_ENCODING="gzip, br")
+            second = api_client.get(url)
+            assert mock_render.call_count == 1
+
+            poll.end_date = timezone.now() - timedelta(minutes=1)  # Closing bumps the version
+            poll.save()
+            closed = api_client.get(url)
+            assert mock_render.call_count == 2
+
+        assert first["Content-Encoding"] == "gzip"
+        assert gzip.decompress(first.content) == second.content
+        assert "Content-Encoding" not in second
+        assert b"Status:</strong> Open" in second.content
+        assert b"Status:</strong> Closed" in closed.content
+        assert mock_enqueue.call_count == 3  # Every hit is still logged
+
+    @patch("apps.distribution.views.enqueue_event")
+    def test_beacon_logs_event(self, mock_enqueue: MagicMock, poll: Poll, api_client: Any) -> None:
+        url = reverse("distribution:poll-beacon", kwargs={"slug": poll.slug})
+        response = api_client.generic("POST", url, "QR_SCAN", content_type="text/plain")
+
+        assert response.status_code == 204
+        mock_enqueue.assert_called_once_with(
+            poll.id,
+            DistributionEvent.QR_SCAN,
+            ip_address=ANY,
+            user_agent=ANY,
+            referrer=ANY,
+        )
+
+    def test_beacon_rejects_unknown_event(self, poll: Poll, api_client: Any) -> None:
+        url = reverse("distribution:poll-beacon", kwargs={"slug": poll.slug})
+        response = api_client.generic("POST", url, "VOTE", content_type="text/plain")
+        assert response.status_code == 400
+
     def test_poll_distribution_analytics_view_owner(
         self, poll: Poll, api_client: Any, user: Any
     ) -> None:
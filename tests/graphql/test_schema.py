@@ -226,3 +226,66 @@ class TestGraphQLMutations:
         data = response.json()
         assert "errors" in data
         assert "Authentication required" in data["errors"][0]["message"]
+
+
+@pytest.mark.django_db
+class TestGraphQLResponseCache:
+    """
+    Tests for caching public GraphQL operations.
+    """
+
+    query = """
+        query PublicPoll($slug: String!) {
+            publicPoll(slug: $slug) {
+                title
+                questions { text }
+            }
+        }
+    """
+
+    def test_public_poll_served_from_cache(
+        self, graphql_client: Any, poll_with_data: Any, django_assert_num_queries: Any
+    ) -> None:
+        """
+        Test that a repeated public query skips the resolvers.
+        """
+        first = graphql_client(self.query, {"slug": poll_with_data.slug}).json()
+        assert first["data"]["publicPoll"]["title"] == poll_with_data.title
+
+        with django_assert_num_queries(0):
+            second = graphql_client(self.query, {"slug": poll_with_data.slug}).json()
+        assert second == first
+
+    def test_poll_change_invalidates_cache(self, graphql_client: Any, poll_with_data: Any) -> None:
+        """
+        Test that editing a poll or its questions bumps its cached responses.
+        """
+        graphql_client(self.query, {"slug": poll_with_data.slug})
+
+        poll_with_data.title = "Renamed Poll"
+        poll_with_data.save()
+        data = graphql_client(self.query, {"slug": poll_with_data.slug}).json()
+        assert data["data"]["publicPoll"]["title"] == "Renamed Poll"
+
+        question = poll_with_data.questions.first()
+        question.text = "Edited question?"
+        question.save()
+        data = graphql_client(self.query, {"slug": poll_with_data.slug}).json()
+        assert "Edited question?" in [q["text"] for q in data["data"]["publicPoll"]["questions"]]
+
+    def test_private_fields_not_cached(self, graphql_client: Any, poll: Any) -> None:
+        """
+        Test that operations mixing in non-cacheable fields always execute.
+        """
+        query = """
+            query Mixed($slug: String!) {
+                publicPoll(slug: $slug) { title }
+                polls { edges { node { title } } }
+            }
+        """
+        graphql_client(query, {"slug": poll.slug})
+        type(poll).objects.filter(pk=poll.pk).update(title="Changed Directly")
+
+        data = graphql_client(query, {"slug": poll.slug}).json()
+        titles = [edge["node"]["title"] for edge in data["data"]["polls"]["edges"]]
+        assert "Changed Directly" in titles
@@ -0,0 +1,43 @@
+from typing import Any
+
+import pytest
+
+from apps.polls.cache import get_public_poll
+
+
+@pytest.mark.django_db
+class TestPublicPollCache:
+    """
+    Tests for the read-through public poll cache.
+    """
+
+    def test_lookup_served_from_cache(self, poll: Any, django_assert_num_queries: Any) -> None:
+        with django_assert_num_queries(1):
+            get_public_poll(poll.slug)
+
+        with django_assert_num_queries(0):
+            cached = get_public_poll(poll.slug)
+            assert cached is not None
+            assert (cached.created_at, cached.updated_at) == (poll.created_at, poll.updated_at)
+
+        assert cached.pk == poll.pk
+        assert cached.title == poll.title
+        assert cached.is_open
+
+    def test_save_invalidates_cache(self, poll: Any) -> None:
+        get_public_poll(poll.slug)
+
+        poll.title = "Renamed"
+        poll.save()
+
+        cached = get_public_poll(poll.slug)
+        assert cached is not None
+        assert cached.title == "Renamed"
+
+    def test_inactive_poll_is_not_public(self, poll: Any) -> None:
+        get_public_poll(poll.slug)
+
+        poll.is_active = False
+        poll.save()
+
+        assert get_public_poll(poll.slug) is None
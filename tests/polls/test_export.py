@@ -0,0 +1,100 @@
+import csv
+import io
+import json
+import warnings
+from typing import Any
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+
+from apps.polls.exports import COLUMNS, export_votes
+from apps.polls.models import Option, Vote
+
+
+@pytest.mark.django_db
+class TestPollExport:
+    def export(self, user: Any, slug: str, **params: str) -> tuple[Any, str]:
+        """
+        Requests an export as the ASGI app serves it, returning the response and its body.
+        """
+
+        async def _read() -> tuple[Any, str]:
+            client = AsyncClient()
+            await client.aforce_login(user)
+            response: Any = await client.get(
+                reverse("polls:poll-export", kwargs={"slug": slug}), params
+            )
+            if not response.streaming:
+                return response, ""
+            return response, "".join([chunk.decode() async for chunk in response])
+
+        return async_to_sync(_read)()
+
+    def test_csv_export(self, test_user: Any, poll_with_data: Any) -> None:
+        response, content = self.export(test_user, poll_with_data.slug)
+
+        assert response.status_code == 200
+        assert response["Content-Type"] == "text/csv; charset=utf-8"
+        assert f'filename="{poll_with_data.slug}.csv"' in response["Content-Disposition"]
+        rows = list(csv.reader(io.StringIO(content)))
+        assert tuple(rows[0]) == COLUMNS
+        assert len(rows) == 7
+        vote = Vote.objects.order_by("pk").select_related("question", "option").first()
+        assert vote is not None
+        assert rows[1] == [
+            vote.slug,
+            vote.created_at.isoformat(),
+            str(vote.user_id),
+            vote.question.slug,
+            vote.question.text,
+            vote.option.slug,
+            vote.option.text,
+        ]
+
+    def test_ndjson_export(self, test_user: Any, poll_with_data: Any) -> None:
+        response, content = self.export(test_user, poll_with_data.slug, format="ndjson")
+
+        assert response.status_code == 200
+        assert response["Content-Type"] == "application/x-ndjson"
+        records = [json.loads(line) for line in content.splitlines()]
+        assert len(records) == 6
+        assert {record["option_text"] for record in records} == {
+            "Very concerned",
+            "Somewhat concerned",
+            "Yes",
+        }
+
+    def test_export_is_chunked(self, poll_with_data: Any) -> None:
+        chunks = list(export_votes(poll_with_data.id, "ndjson", chunk_size=4))
+
+        assert [chunk.count("\n") for chunk in chunks] == [4, 2]
+
+    def test_export_streams_asynchronously(self, test_user: Any, poll_with_data: Any) -> None:
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            response, content = self.export(test_user, poll_with_data.slug)
+
+        assert response.is_async
+        assert content.count("\n") == 7
+        # Django warns when it has to read a synchronous iterator in full first
+        assert not [w for w in caught if "must consume synchronous iterators" in str(w.message)]
+
+    def test_csv_formulas_are_escaped(self, poll: Any, question: Any, test_user: Any) -> None:
+        option = Option.objects.create(question=question, text="=HYPERLINK(1)")
+        Vote.objects.create(user=test_user, question=question, option=option)
+
+        _, content = self.export(test_user, poll.slug)
+        rows = list(csv.reader(io.StringIO(content)))
+
+        assert rows[1][-1] == "'=HYPERLINK(1)"
+
+    def test_only_the_creator_can_export(self, other_user: Any, poll_with_data: Any) -> None:
+        response, _ = self.export(other_user, poll_with_data.slug)
+
+        assert response.status_code == 403
+
+    def test_unknown_poll_and_format(self, test_user: Any, poll: Any) -> None:
+        assert self.export(test_user, "missing")[0].status_code == 404
+        assert self.export(test_user, poll.slug, format="xml")[0].status_code == 400
@@ -0,0 +1,381 @@
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from typing import Any
+
+import pytest
+import redis
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+
+from apps.polls.broadcaster import ResultsBroadcaster, SlowConsumerError
+from apps.polls.models import Vote
+from apps.polls.realtime import publish_tally_delta
+from config.schema import schema
+
+
+@pytest.mark.django_db
+class TestLiveResults:
+    """
+    Tests for publishing and subscribing to live poll results.
+    """
+
+    def test_publish_tally_delta(self, mocker: Any) -> None:
+        """
+        Test that a delta is published as a sequenced frame on the poll channel.
+        """
+        client = mocker.Mock()
+        client.incr.return_value = 7
+        mocker.patch("apps.polls.realtime.get_redis", return_value=client)
+
+        publish_tally_delta(poll_id=1, question_id=2, option_id=3, delta=1)
+
+        client.incr.assert_called_once_with("poll_results:1:seq")
+        channel, payload = client.publish.call_args.args
+        assert channel == "poll_results:1"
+        assert json.loads(payload) == {
+            "seq": 7,
+            "changes": [{"question_id": 2, "option_id": 3, "delta": 1}],
+        }
+
+    def test_publish_without_redis_is_noop(self) -> None:
+        """
+        Test that publishing degrades gracefully when the cache is not Redis.
+        """
+        publish_tally_delta(poll_id=1, question_id=2, option_id=3, delta=1)
+
+    def test_vote_publishes_after_commit(
+        self,
+        mocker: Any,
+        other_user: Any,
+        question: Any,
+        option: Any,
+        django_capture_on_commit_callbacks: Any,
+    ) -> None:
+        """
+        Test that recording a vote publishes its tally delta on commit.
+        """
+        mock_publish = mocker.patch("apps.polls.signals.publish_vote")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            vote = Vote.objects.create(user=other_user, question=question, option=option)
+
+        mock_publish.assert_called_once_with(vote, delta=1)
+
+    def test_poll_results_subscription(self, mocker: Any, poll: Any) -> None:
+        """
+        Test that the pollResults subscription relays published frames.
+        """
+
+        async def fake_feed(poll_id: int) -> AsyncIterator[dict[str, Any]]:
+            assert poll_id == poll.id
+            yield {"seq": 1, "changes": [{"question_id": 5, "option_id": 9, "delta": 1}]}
+
+        mocker.patch("apps.polls.schema.subscribe_poll_results", fake_feed)
+
+        query = """
+            subscription Results($slug: String!) {
+                pollResults(slug: $slug) {
+                    pollSlug
+                    sequence
+                    changes { questionId optionId delta }
+                }
+            }
+        """
+
+        async def first_frame() -> Any:
+            results = await schema.subscribe(query, variable_values={"slug": poll.slug})
+            async for result in results:
+                return result
+
+        result = async_to_sync(first_frame)()
+        assert result.errors is None
+        assert result.data["pollResults"] == {
+            "pollSlug": poll.slug,
+            "sequence": 1,
+            "changes": [{"questionId": "5", "optionId": "9", "delta": 1}],
+        }
+
+
+class FakeFeed:
+    """
+    Stand-in for PollResultsFeed that replays a fixed list of frames.
+    """
+
+    available = True
+
+    def __init__(self, poll_id: int) -> None:
+        self.frames = [{"seq": 5, "changes": [{"question_id": 1, "option_id": 2, "delta": 1}]}]
+
+    async def __aenter__(self) -> "FakeFeed":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        return None
+
+    async def sequence(self) -> int:
+        return 4
+
+    async def next_frames(self, timeout: float) -> list[dict[str, Any]]:
+        frames, self.frames = self.frames, []
+        return frames
+
+
+def read_events(url: str, count: int, **headers: Any) -> tuple[Any, list[str]]:
+    """
+    Requests an SSE endpoint and returns the response with its first `count` chunks.
+    """
+
+    async def _read() -> tuple[Any, list[str]]:
+        response: Any = await AsyncClient().get(url, headers=headers)
+        chunks: list[str] = []
+        if response.status_code != 200:
+            return response, chunks
+        async for chunk in response.streaming_content:
+            chunks.append(chunk.decode())
+            if len(chunks) == count:
+                break
+        return response, chunks
+
+    return async_to_sync(_read)()
+
+
+@pytest.mark.django_db
+class TestResultsStream:
+    """
+    Tests for the Server-Sent Events results stream.
+    """
+
+    def test_stream_sends_snapshot(self, poll_with_data: Any) -> None:
+        """
+        Test that the stream opens with a snapshot of every option count.
+        """
+        url = f"/api/v1/polls/{poll_with_data.slug}/results/stream"
+        response, chunks = read_events(url, count=2)
+
+        assert response.status_code == 200
+        assert response["Content-Type"] == "text/event-stream"
+        assert chunks[0].startswith("retry:")
+        header, data = chunks[1].rsplit("data: ", 1)
+        assert "event: snapshot" in header
+        questions = json.loads(data)["questions"]
+        q1 = poll_with_data.questions.get(order=1)
+        assert sum(questions[str(q1.id)].values()) == 3
+        assert len(questions[str(q1.id)]) == 3  # Unvoted option included as 0
+
+    def test_stream_unknown_poll(self, db: Any) -> None:
+        response, _ = read_events("/api/v1/polls/missing/results/stream", count=1)
+        assert response.status_code == 404
+
+    def test_stream_resume_skips_snapshot(self, mocker: Any, poll: Any) -> None:
+        """
+        Test that resuming at the current sequence only sends subsequent updates.
+        """
+        mocker.patch("apps.polls.views.PollResultsFeed", FakeFeed)
+        mocker.patch("apps.polls.views.PollResultsStreamView.coalesce_interval", 0)
+
+        url = f"/api/v1/polls/{poll.slug}/results/stream"
+        _, chunks = read_events(url, count=2, **{"Last-Event-ID": "4"})
+
+        assert chunks[1] == 'id: 5\nevent: update\ndata: {"questions": {"1": {"2": 1}}}\n\n'
+
+    def test_frames_published_during_the_snapshot_are_skipped(self, mocker: Any, poll: Any) -> None:
+        """
+        Test that a vote landing while the snapshot is read is not counted twice.
+        """
+
+        class RacingFeed(FakeFeed):
+            # Frame 5 is published while the first snapshot is read
+            sequences = iter([4, 5, 5, 5])
+
+            async def sequence(self) -> int:
+                return next(self.sequences)
+
+        snapshot = mocker.patch("apps.polls.views.get_results_snapshot", return_value={1: {2: 1}})
+        mocker.patch("apps.polls.views.PollResultsFeed", RacingFeed)
+
+        url = f"/api/v1/polls/{poll.slug}/results/stream"
+        _, chunks = read_events(url, count=3)
+
+        assert snapshot.call_count == 2
+        assert chunks[1] == 'id: 5\nevent: snapshot\ndata: {"questions": {"1": {"2": 1}}}\n\n'
+        assert chunks[2] == ": keep-alive\n\n"
+
+
+class TestResultsBroadcaster:
+    """
+    Tests for tick-based merging and fan-out of result frames.
+    """
+
+    def test_flush_merges_deltas_into_one_frame(self) -> None:
+        async def run() -> tuple[list[dict[str, Any]], dict[str, Any]]:
+            broadcaster = ResultsBroadcaster(tick=60, queue_size=4)
+            subscriber = await broadcaster.subscribe(1)
+            broadcaster.ingest(
+                1, {"seq": 1, "changes": [{"question_id": 1, "option_id": 1, "delta": 1}]}
+            )
+            broadcaster.ingest(
+                1,
+                {
+                    "seq": 2,
+                    "changes": [
+                        {"question_id": 1, "option_id": 1, "delta": 1},
+                        {"question_id": 1, "option_id": 2, "delta": 1},
+                    ],
+                },
+            )
+            broadcaster.flush()
+            frames = await subscriber.next_frames(timeout=0.01)
+            metrics = broadcaster.metrics()
+            await broadcaster.unsubscribe(subscriber)
+            return frames, metrics
+
+        frames, metrics = async_to_sync(run)()
+
+        assert frames == [
+            {
+                "seq": 2,
+                "changes": [
+                    {"question_id": 1, "option_id": 1, "delta": 2},
+                    {"question_id": 1, "option_id": 2, "delta": 1},
+                ],
+            }
+        ]
+        assert metrics["subscribers"] == 1
+        assert metrics["frames_published"] == 1
+        assert metrics["messages_delivered"] == 1
+
+    def test_slow_consumer_is_dropped(self) -> None:
+        async def run() -> dict[str, Any]:
+            broadcaster = ResultsBroadcaster(tick=60, queue_size=1)
+            subscriber = await broadcaster.subscribe(1)
+            for seq in (1, 2):
+                broadcaster.ingest(
+                    1, {"seq": seq, "changes": [{"question_id": 1, "option_id": 1, "delta": 1}]}
+                )
+                broadcaster.flush()
+
+            with pytest.raises(SlowConsumerError):
+                await subscriber.next_frames(timeout=0.01)
+            await broadcaster.unsubscribe(subscriber)
+            return broadcaster.metrics()
+
+        metrics = async_to_sync(run)()
+
+        assert metrics["dropped_consumers"] == 1
+        assert metrics["subscribers"] == 0
+
+
+class FakePubSub:
+    """
+    Stand-in for a Redis pub/sub connection failing its first `failures` reads.
+    """
+
+    def __init__(self, failures: int = 0) -> None:
+        self.failures = failures
+        self.channels: set[str] = set()
+        self.messages: list[dict[str, Any]] = []
+
+    async def subscribe(self, *channels: str) -> None:
+        self.channels.update(channels)
+
+    async def unsubscribe(self, *channels: str) -> None:
+        self.channels.difference_update(channels)
+
+    async def aclose(self) -> None:
+        return None
+
+    async def get_message(self, **kwargs: Any) -> dict[str, Any] | None:
+        await asyncio.sleep(0)
+        if self.failures:
+            self.failures -= 1
+            raise redis.ConnectionError("Connection reset by peer")
+        return self.messages.pop(0) if self.messages else None
+
+
+async def wait_until(condition: Any, timeout: float = 2.0) -> None:
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.001)
+
+
+class FakeRedis:
+    """
+    Creates FakePubSub connections, each failing its first `failures` reads.
+    """
+
+    def __init__(self) -> None:
+        self.failures = 1
+        self.pubsubs: list[FakePubSub] = []
+
+    def pubsub(self) -> FakePubSub:
+        self.pubsubs.append(FakePubSub(self.failures))
+        return self.pubsubs[-1]
+
+
+class TestResultsFeedErrors:
+    """
+    Tests for recovering from Redis failures in the broadcaster's listener.
+    """
+
+    @pytest.fixture
+    def fake_redis(self, mocker: Any) -> FakeRedis:
+        client = FakeRedis()
+        mocker.patch("apps.polls.broadcaster.get_async_redis", return_value=client)
+        return client
+
+    def test_resubscribes_after_an_error(self, fake_redis: FakeRedis) -> None:
+        async def run() -> list[dict[str, Any]]:
+            broadcaster = ResultsBroadcaster(tick=60, queue_size=4)
+            broadcaster.reconnect_backoff = 0
+            stale = await broadcaster.subscribe(1)
+            fake_redis.failures = 0
+            await wait_until(lambda: stale.dropped)
+
+            # Frames may have been missed: the subscriber must resync
+            with pytest.raises(SlowConsumerError):
+                await stale.next_frames(timeout=0.01)
+            current = fake_redis.pubsubs[-1]
+            assert current.channels == {"poll_results:1"}
+
+            fresh = await broadcaster.subscribe(1)
+            current.messages.append(
+                {
+                    "type": "message",
+                    "channel": b"poll_results:1",
+                    "data": json.dumps(
+                        {"seq": 3, "changes": [{"question_id": 1, "option_id": 1, "delta": 1}]}
+                    ),
+                }
+            )
+            await wait_until(lambda: 1 in broadcaster._pending_seq)
+            broadcaster.flush()
+            frames = await fresh.next_frames(timeout=0.01)
+            await broadcaster.unsubscribe(stale)
+            await broadcaster.unsubscribe(fresh)
+            return frames
+
+        frames = async_to_sync(run)()
+
+        assert [frame["seq"] for frame in frames] == [3]
+
+    def test_drops_subscribers_when_redis_stays_down(self, fake_redis: FakeRedis) -> None:
+        async def run() -> dict[str, Any]:
+            fake_redis.failures = 100
+            broadcaster = ResultsBroadcaster(tick=60, queue_size=4)
+            broadcaster.reconnect_backoff = 0
+            broadcaster.reconnect_attempts = 2
+            subscriber = await broadcaster.subscribe(1)
+            listener = broadcaster._listener
+            assert listener is not None
+            await wait_until(listener.done)
+
+            with pytest.raises(SlowConsumerError):
+                await subscriber.next_frames(timeout=0.01)
+            await broadcaster.unsubscribe(subscriber)
+            return broadcaster.metrics()
+
+        metrics = async_to_sync(run)()
+
+        assert metrics["feed_errors"] == 3
+        assert metrics["subscribers"] == 0